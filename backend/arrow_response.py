@@ -0,0 +1,147 @@
+"""
+Binary /stock_data responses negotiated from the Accept header
+Arrow IPC stream (application/vnd.apache.arrow.stream) or Parquet
+(application/vnd.apache.parquet); JSON remains the default, and JSON
+records can also be emitted straight from Arrow record batches
+"""
+
+import json
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+BINARY_MEDIA_TYPES = (ARROW_STREAM_MEDIA_TYPE, PARQUET_MEDIA_TYPE)
+
+def _accept_entries(accept):
+    """(media type, q) per Accept entry, in header order; a malformed q counts as 0"""
+    for entry in accept.split(","):
+        media_type, *params = (part.strip() for part in entry.split(";"))
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        yield media_type.lower(), q
+
+def negotiate_binary_format(accept):
+    """Returns the binary media type the client prefers (highest q, then header order),
+    or None when JSON should be served. q=0 means "not acceptable"."""
+    if not accept:
+        return None
+    best, best_q = None, 0.0
+    for media_type, q in _accept_entries(accept):
+        if media_type in BINARY_MEDIA_TYPES or media_type in ("application/json", "application/*", "*/*"):
+            if q > best_q:
+                best, best_q = media_type, q
+    return best if best in BINARY_MEDIA_TYPES else None
+
+def table_from_columns(data):
+    """Builds an Arrow table from a DataFrame's column arrays or a {column: array} mapping"""
+    if isinstance(data, pd.DataFrame):
+        columns = {str(name): data[name].to_numpy() for name in data.columns}
+    else:
+        columns = data
+    # from_pandas=True maps NaN/NaT to Arrow nulls, matching the JSON null output
+    return pa.table({name: pa.array(values, from_pandas=True) for name, values in columns.items()})
+
+def encode_arrow_stream(table):
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def encode_parquet(table):
+    sink = pa.BufferOutputStream()
+    pq.write_table(table, sink, compression="snappy")
+    return sink.getvalue().to_pybytes()
+
+def binary_response(data, media_type):
+    """Encodes a pa.Table, DataFrame or column mapping as the negotiated binary format"""
+    table = data if isinstance(data, pa.Table) else table_from_columns(data)
+    if media_type == PARQUET_MEDIA_TYPE:
+        return Response(content=encode_parquet(table), media_type=PARQUET_MEDIA_TYPE)
+    return Response(content=encode_arrow_stream(table), media_type=ARROW_STREAM_MEDIA_TYPE)
+
+def jsonable_table(table):
+    """Vectorised conversion of an Arrow table to JSON-ready types: ISO timestamps/dates, float decimals, NaN -> null"""
+    columns = []
+    for column in table.columns:
+        column_type = column.type
+        if pa.types.is_timestamp(column_type):
+            # Same text as datetime.isoformat() for whole-second values
+            text = pc.strftime(column.cast(pa.timestamp("s", column_type.tz), safe=False), format="%Y-%m-%dT%H:%M:%S")
+            if column_type.tz in ("UTC", "+00:00", "Etc/UTC"):
+                text = pc.binary_join_element_wise(text, "+00:00", "")
+            column = text
+        elif pa.types.is_date(column_type):
+            column = pc.strftime(column, format="%Y-%m-%d")
+        elif pa.types.is_decimal(column_type):
+            column = column.cast(pa.float64())
+        if pa.types.is_floating(column.type):
+            column = pc.if_else(pc.is_nan(column), pa.scalar(None, column.type), column)
+        columns.append(column)
+    return pa.table(columns, names=table.column_names)
+
+# Characters a JSON string must escape
+_JSON_ESCAPES = r'["\\\x00-\x1f]'
+
+def json_value_text(column):
+    """Each value of a jsonable_table() column as JSON text ("null" for missing), vectorised"""
+    column_type = column.type
+    if pa.types.is_floating(column_type):
+        column = column.cast(pa.float64())
+        column = pc.if_else(pc.is_finite(column), column, pa.scalar(None, pa.float64()))
+        # Shortest text that round-trips the float64 exactly, like repr(); whole numbers keep
+        # their ".0" so clients still read them as floats
+        text = pc.cast(column, pa.string())
+        whole = pc.match_substring_regex(text, r"^-?[0-9]+$")
+        text = pc.if_else(whole, pc.binary_join_element_wise(text, ".0", ""), text)
+    elif pa.types.is_integer(column_type) or pa.types.is_boolean(column_type):
+        text = pc.cast(column, pa.string())
+    elif (pa.types.is_string(column_type) or pa.types.is_large_string(column_type)) and \
+            not pc.any(pc.match_substring_regex(column, _JSON_ESCAPES)).as_py():
+        text = pc.binary_join_element_wise('"', column, '"', "")
+    else:
+        text = pa.array([None if value is None else json.dumps(value, default=str) for value in column.to_pylist()],
+                        pa.string())
+    return pc.fill_null(text, "null")
+
+def json_records(table):
+    """A table's rows as JSON object texts, joined by commas (no enclosing brackets)"""
+    pieces = []
+    for i, (name, column) in enumerate(zip(table.column_names, jsonable_table(table).columns)):
+        pieces.append(("{" if i == 0 else ",") + json.dumps(name) + ":")
+        pieces.append(json_value_text(column))
+    pieces.append("}")
+    rows = pc.binary_join_element_wise(*pieces, "")
+    return ",".join(rows.to_pylist())
+
+def json_records_response(tables, on_complete=None):
+    """Streams a JSON array of row objects batch by batch from an iterable of Arrow tables.
+    Floats are written at full precision, as json.dumps would.
+    on_complete(body_bytes), if given, receives the full body once streaming finishes (for caching)."""
+    def chunks():
+        parts = [] if on_complete else None
+        yield "["
+        first = True
+        for table in tables:
+            if table.num_rows == 0:
+                continue
+            body = json_records(table)
+            chunk = body if first else "," + body
+            first = False
+            if parts is not None:
+                parts.append(chunk)
+            yield chunk
+        yield "]"
+        if on_complete:
+            on_complete(("[" + "".join(parts) + "]").encode("utf-8"))
+    return StreamingResponse(chunks(), media_type="application/json")
@@ -0,0 +1,121 @@
+"""
+Single-flight background initialisation
+Runs an expensive load (download + columnar store + bars) once on a daemon
+thread. Callers never block on it: value is None until the load finishes,
+and status() reports the current stage for the /ready endpoint. A failed
+load is only re-run through retry(), with exponential backoff, and a
+finished one through reload().
+"""
+
+import threading
+import time
+
+class BackgroundLoader:
+    """Runs load(progress) at most once at a time and publishes its result"""
+
+    def __init__(self, name, load, retry_backoff_seconds=30, max_retry_backoff_seconds=900, clock=time.monotonic):
+        self.name = name
+        self._load = load
+        # Elapsed times and retry backoff only - monotonic, so wall-clock jumps do not skew them
+        self._clock = clock
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.max_retry_backoff_seconds = max_retry_backoff_seconds
+        self.failures = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self.value = None
+        self.state = "idle"
+        self.stage = None
+        self.detail = None
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def ready(self):
+        return self.state == "ready"
+
+    def start(self):
+        """Starts the load unless it is already running or done; a failed load can be retried"""
+        with self._lock:
+            if self.state in ("loading", "ready"):
+                return False
+            return self._start()
+
+    def reload(self):
+        """Re-runs a finished load (e.g. its source changed) unless one is already running.
+        value keeps the previous result until the new load has replaced it."""
+        with self._lock:
+            if self.state == "loading":
+                return False
+            return self._start()
+
+    def _start(self):
+        self.state = "loading"
+        self.error = None
+        self.started_at = self._clock()
+        self.finished_at = None
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-loader", daemon=True)
+        self._thread.start()
+        return True
+
+    def retry_at(self):
+        """When a failed load may be retried (backoff doubles per consecutive failure), else None"""
+        if self.state != "failed" or self.finished_at is None:
+            return None
+        backoff = min(self.retry_backoff_seconds * 2 ** (self.failures - 1), self.max_retry_backoff_seconds)
+        return self.finished_at + backoff
+
+    def retry(self):
+        """Restarts a failed load once its backoff has passed; never starts a load that was not started"""
+        retry_at = self.retry_at()
+        if retry_at is None or self._clock() < retry_at:
+            return False
+        return self.start()
+
+    def progress(self, stage, detail=None):
+        """Called by the load function to report what it is doing"""
+        self.stage = stage
+        self.detail = detail
+
+    def _run(self):
+        try:
+            value = self._load(self.progress)
+        except Exception as e:
+            print(f"ERROR: {self.name} warm-up failed: {e}")
+            self.error = str(e)
+            self.failures += 1
+            self.state = "failed"
+        else:
+            self.value = value
+            self.failures = 0
+            self.state = "ready"
+            self.stage = "ready"
+            self.detail = None
+            print(f"✅ {self.name} warm-up finished in {self._clock() - self.started_at:.1f}s")
+        finally:
+            self.finished_at = self._clock()
+
+    def wait(self, timeout=None):
+        """Blocks until the current load finishes (scripts and benchmarks only)"""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return self.value
+
+    def status(self):
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = round((self.finished_at or self._clock()) - self.started_at, 1)
+        retry_at = self.retry_at()
+        return {
+            "name": self.name,
+            "ready": self.ready,
+            "state": self.state,
+            "stage": self.stage,
+            "detail": self.detail,
+            "error": self.error,
+            "elapsed_seconds": elapsed,
+            "failures": self.failures,
+            "retry_in_seconds": round(max(retry_at - self._clock(), 0), 1) if retry_at is not None else None,
+        }
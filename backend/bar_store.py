@@ -0,0 +1,131 @@
+"""
+Precomputed Weekly/Monthly OHLCV bars for the parquet backend
+Bars for every symbol are materialised once per dataset version from the
+resident daily store, so a Weekly/Monthly request is a slice like Daily
+"""
+
+import time
+import numpy as np
+import pandas as pd
+from columnar_store import ColumnarStore
+
+# Bar labels match DataFrame.resample: week ending Sunday, calendar month end
+BAR_RULES = {"Weekly": "W", "Monthly": "ME"}
+
+PRICE_AGGREGATIONS = {
+    'OPEN_PRICE': 'first',
+    'HIGH_PRICE': 'max',
+    'LOW_PRICE': 'min',
+    'CLOSE_PRICE': 'last',
+    'LAST_PRICE': 'last',
+}
+
+VOLUME_COLUMNS = ['VOLUME', 'TURNOVER_LACS', 'NO_OF_TRADES', 'DELIV_QTY']
+
+# Symbols resampled per groupby pass while building, to bound peak memory
+BUILD_CHUNK_SYMBOLS = 250
+
+def bar_aggregations(columns):
+    """OHLC/volume aggregations; every other column (indicators, attributes) takes its bar-close value,
+    the closing day's value even when null (see resample_bars)"""
+    agg_functions = {}
+    for col in columns:
+        if col in ('TIMESTAMP', 'SYMBOL'):
+            continue
+        if col in PRICE_AGGREGATIONS:
+            agg_functions[col] = PRICE_AGGREGATIONS[col]
+        elif col in VOLUME_COLUMNS:
+            agg_functions[col] = 'sum'
+        else:
+            agg_functions[col] = 'last'
+    return agg_functions
+
+def resample_bars(df, rule):
+    """Resamples daily rows of one or many symbols into bars labelled like resample(rule)"""
+    keys = ['SYMBOL'] if 'SYMBOL' in df.columns else []
+    df = df.sort_values(keys + ['TIMESTAMP']).drop_duplicates(subset=keys + ['TIMESTAMP'])
+    agg_functions = bar_aggregations(df.columns)
+    if not agg_functions:
+        return pd.DataFrame(columns=keys + ['TIMESTAMP'])
+
+    grouped = df.groupby(keys + [pd.Grouper(key='TIMESTAMP', freq=rule)], sort=True)
+    bars = grouped.agg(agg_functions).reset_index()
+
+    # 'last' skips NaN, but a bar-close value is the closing day's even when that is null.
+    # Rows are sorted, so each group is a contiguous run and bars has one row per group number.
+    close_columns = [col for col, how in agg_functions.items() if how == 'last' and col not in PRICE_AGGREGATIONS]
+    if close_columns and len(df):
+        group_ids = grouped.ngroup().to_numpy()
+        closing_rows = np.flatnonzero(np.append(group_ids[1:] != group_ids[:-1], True))
+        closing = df.iloc[closing_rows].set_axis(group_ids[closing_rows])
+        for col in close_columns:
+            bars[col] = closing[col].reindex(bars.index)
+
+    # Delivery % of a bar is delivered quantity over traded quantity, not the last day's figure
+    if 'DELIV_PER' in bars.columns and 'DELIV_QTY' in bars.columns and 'VOLUME' in bars.columns:
+        volume = bars['VOLUME'].where(bars['VOLUME'] != 0)
+        bars['DELIV_PER'] = bars['DELIV_QTY'] / volume * 100
+    return bars
+
+def build_bar_store(store, frequency):
+    """Materialises bars for every symbol in a daily ColumnarStore"""
+    started = time.perf_counter()
+    rule = BAR_RULES[frequency]
+    symbols = store.symbols
+    chunks = []
+    for i in range(0, len(symbols), BUILD_CHUNK_SYMBOLS):
+        first, last = symbols[i], symbols[min(i + BUILD_CHUNK_SYMBOLS, len(symbols)) - 1]
+        start, end = store.bounds(first)[0], store.bounds(last)[1]
+        daily = pd.DataFrame({name: values[start:end] for name, values in store.columns.items()})
+        chunks.append(resample_bars(daily, rule))
+
+    bars = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=store.column_names)
+    bar_store = ColumnarStore.from_frame(bars, source_path=store.source_path, version=store.version)
+    print(f"✅ {frequency} bars materialised: {bar_store.num_rows:,} bars in {time.perf_counter() - started:.1f}s")
+    return bar_store
+
+def bar_label(dt, frequency):
+    """Label (period end) of the bar that contains dt"""
+    offset = pd.tseries.frequencies.to_offset(BAR_RULES[frequency])
+    return offset.rollforward(pd.Timestamp(dt).normalize())
+
+def bar_period_start(label, frequency):
+    """First day of the period of the bar labelled `label`"""
+    offset = pd.tseries.frequencies.to_offset(BAR_RULES[frequency])
+    return label - offset + pd.Timedelta(days=1)
+
+def bar_source_columns(columns, available):
+    """Daily columns to read for bars with `columns` - DELIV_PER is recomputed from DELIV_QTY/VOLUME"""
+    if columns is None or 'DELIV_PER' not in columns:
+        return columns
+    return columns + [col for col in ('DELIV_QTY', 'VOLUME') if col in available and col not in columns]
+
+def slice_bars(bar_store, symbol, frequency, read_daily, columns=None, start_date=None, end_date=None):
+    """Bars of one symbol as if only its daily rows in [start_date, end_date] were resampled.
+    Whole periods are sliced from the precomputed bar store; the first and last bar may cover part
+    of a period, so they are rebuilt from read_daily(start, end), the daily rows inside the range."""
+    if symbol not in bar_store:
+        return pd.DataFrame()
+    first_label = bar_label(start_date, frequency) if start_date is not None else None
+    last_label = bar_label(end_date, frequency) if end_date is not None else None
+    bars = bar_store.to_frame(symbol, columns, first_label, last_label)
+
+    edges = {}
+    if first_label is not None:
+        edges[first_label] = (start_date, first_label + pd.Timedelta(days=1) - pd.Timedelta(1))
+    if last_label is not None:
+        edges[last_label] = (bar_period_start(last_label, frequency), end_date)
+    rebuilt = []
+    for lo, hi in edges.values():
+        lo = max(lo, start_date) if start_date is not None else lo
+        hi = min(hi, end_date) if end_date is not None else hi
+        daily = read_daily(lo, hi)
+        if not daily.empty:
+            rebuilt.append(resample_bars(daily, BAR_RULES[frequency])[bars.columns])
+
+    # An edge bar with no daily rows in range is dropped, like an empty bin at the ends of resample()
+    bars = bars[~bars['TIMESTAMP'].isin(list(edges))]
+    frames = [frame for frame in [bars] + rebuilt if not frame.empty]
+    if not frames:
+        return bars.reset_index(drop=True)
+    return pd.concat(frames, ignore_index=True).sort_values('TIMESTAMP', ignore_index=True)
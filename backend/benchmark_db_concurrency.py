@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark throughput of a Cloud SQL backend under concurrent requests
+Fires the same request from 1, 2, 4, ... concurrent clients up to the
+server's pool size (from /pool_stats) and reports requests/s and the speed-up
+over one client - with non-blocking DB access it should grow ~linearly.
+Usage: python benchmark_db_concurrency.py [base_url] [path] [requests_per_level]
+"""
+
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+_sessions = threading.local()
+
+def timed_get(url):
+    """Latency of one GET in milliseconds, reusing a keep-alive session per thread"""
+    session = getattr(_sessions, "session", None)
+    if session is None:
+        session = _sessions.session = requests.Session()
+    started = time.perf_counter()
+    response = session.get(url, timeout=120)
+    response.raise_for_status()
+    return (time.perf_counter() - started) * 1000
+
+def run_level(url, concurrency, total_requests):
+    """Returns (requests/s, latencies) for total_requests spread over `concurrency` clients"""
+    with ThreadPoolExecutor(max_workers=concurrency) as clients:
+        started = time.perf_counter()
+        latencies = list(clients.map(lambda _: timed_get(url), range(total_requests)))
+        elapsed = time.perf_counter() - started
+    return total_requests / elapsed, latencies
+
+if __name__ == "__main__":
+    base_url = (sys.argv[1] if len(sys.argv) > 1 else "http://127.0.0.1:8000").rstrip("/")
+    path = sys.argv[2] if len(sys.argv) > 2 else "/symbols"
+    requests_per_level = int(sys.argv[3]) if len(sys.argv) > 3 else 64
+
+    pool_size = requests.get(f"{base_url}/pool_stats", timeout=30).json()["size"]
+    levels = []
+    level = 1
+    while level < pool_size:
+        levels.append(level)
+        level *= 2
+    levels.append(pool_size)
+
+    url = f"{base_url}{path}"
+    timed_get(url)  # warm the pool and server caches
+    print(f"🔍 {url} - {requests_per_level} requests per level, pool size {pool_size}")
+
+    baseline = None
+    for concurrency in levels:
+        throughput, latencies = run_level(url, concurrency, max(requests_per_level, concurrency))
+        baseline = baseline or throughput
+        p95 = sorted(latencies)[max(0, int(len(latencies) * 0.95) - 1)]
+        print(f"clients {concurrency:>3} | {throughput:8.1f} req/s | speed-up {throughput / baseline:5.2f}x "
+              f"(ideal {concurrency}x) | median {statistics.median(latencies):8.1f} ms | p95 {p95:8.1f} ms")
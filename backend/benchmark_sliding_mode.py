@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Time sliding_mode() against the pandas ROLLING_MODE it replaced
+Equivalence is covered by tests/test_sliding_mode.py; this only times both
+on one long random price history.
+Usage: python benchmark_sliding_mode.py [history_rows] [window]
+"""
+
+import sys
+import time
+import numpy as np
+import pandas as pd
+from sliding_mode import sliding_mode
+
+def pandas_rolling_mode(prices, window):
+    """The original per-window implementation"""
+    return prices.rolling(window=window, min_periods=1).apply(lambda x: x.mode().iloc[0] if not x.mode().empty else x.iloc[-1])
+
+if __name__ == "__main__":
+    history_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    window = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    rng = np.random.default_rng(0)
+    prices = pd.Series(np.round(100 + rng.normal(0, 1, history_rows).cumsum(), 1))
+
+    started = time.perf_counter()
+    pandas_rolling_mode(prices, window)
+    pandas_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    sliding_mode(prices, window)
+    sliding_ms = (time.perf_counter() - started) * 1000
+    print(f"{history_rows:,} rows, window {window}: pandas {pandas_ms:.1f} ms | sliding_mode {sliding_ms:.1f} ms "
+          f"({pandas_ms / sliding_ms:.0f}x)")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-symbol parquet read latency before and after cluster_parquet.py
+Usage: python benchmark_symbol_reads.py [original.parquet] [clustered.parquet] [num_symbols]
+"""
+
+import random
+import statistics
+import sys
+import time
+import pandas as pd
+import pyarrow.parquet as pq
+from config import settings
+
+def row_groups_touched(path, symbol):
+    """Counts row groups whose SYMBOL min/max statistics cannot exclude the symbol"""
+    metadata = pq.ParquetFile(path).metadata
+    symbol_index = metadata.schema.to_arrow_schema().get_field_index("SYMBOL")
+    touched = 0
+    for i in range(metadata.num_row_groups):
+        stats = metadata.row_group(i).column(symbol_index).statistics
+        if stats is None or not stats.has_min_max or stats.min <= symbol <= stats.max:
+            touched += 1
+    return touched, metadata.num_row_groups
+
+def time_symbol_reads(path, symbols):
+    """Returns per-symbol read latencies in milliseconds"""
+    latencies = []
+    for symbol in symbols:
+        started = time.perf_counter()
+        pd.read_parquet(path, filters=[('SYMBOL', '=', symbol)])
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+def report(label, path, symbols):
+    """Prints latency and row-group pruning summary for one file"""
+    latencies = time_symbol_reads(path, symbols)
+    touched = [row_groups_touched(path, symbol)[0] for symbol in symbols]
+    total_groups = row_groups_touched(path, symbols[0])[1]
+    p95 = sorted(latencies)[max(0, int(len(latencies) * 0.95) - 1)]
+    print(f"{label:<10} median {statistics.median(latencies):8.1f} ms | "
+          f"p95 {p95:8.1f} ms | row groups touched {statistics.mean(touched):.1f}/{total_groups}")
+
+if __name__ == "__main__":
+    original_path = sys.argv[1] if len(sys.argv) > 1 else settings.DATA_PATH
+    clustered_path = sys.argv[2] if len(sys.argv) > 2 else settings.CLUSTERED_DATA_PATH
+    num_symbols = int(sys.argv[3]) if len(sys.argv) > 3 else 25
+
+    all_symbols = pd.read_parquet(clustered_path, columns=['SYMBOL'])['SYMBOL'].unique().tolist()
+    symbols = random.sample(all_symbols, min(num_symbols, len(all_symbols)))
+    print(f"🔍 Reading {len(symbols)} random symbols from each file")
+
+    report("before", original_path, symbols)
+    report("after", clustered_path, symbols)
@@ -0,0 +1,105 @@
+"""
+Process-wide BigQuery client for the BigQuery backend
+One bigquery.Client per process, created on first use over a pooled
+AuthorizedSession, so credential discovery and HTTP setup happen once.
+An auth failure drops the client and retries once with a fresh one.
+A Storage Read API client is shared the same way when the package is installed.
+Tests swap in an in-process fake with bigquery_clients.override(...).
+"""
+
+import threading
+import requests
+from google.api_core import exceptions as api_exceptions
+from google.auth import exceptions as auth_exceptions
+from config import settings
+
+# Failures a fresh client (new credentials, new session) can fix
+AUTH_ERRORS = (auth_exceptions.RefreshError, api_exceptions.Unauthorized)
+
+def create_pooled_client():
+    """bigquery.Client whose HTTP session keeps up to BIGQUERY_POOL_SIZE connections alive"""
+    import google.auth
+    from google.auth.transport.requests import AuthorizedSession
+    from google.cloud import bigquery
+
+    credentials, _ = google.auth.default(scopes=bigquery.Client.SCOPE)
+    session = AuthorizedSession(credentials)
+    adapter = requests.adapters.HTTPAdapter(pool_connections=settings.BIGQUERY_POOL_SIZE,
+                                            pool_maxsize=settings.BIGQUERY_POOL_SIZE)
+    session.mount("https://", adapter)
+    return bigquery.Client(project=settings.BIGQUERY_PROJECT, credentials=credentials, _http=session)
+
+def create_storage_client():
+    """BigQuery Storage Read API client, or None when google-cloud-bigquery-storage is not installed"""
+    try:
+        from google.cloud import bigquery_storage
+    except ImportError:
+        return None
+    return bigquery_storage.BigQueryReadClient()
+
+class SharedClient:
+    """Lazily created, lock-protected singleton client with re-creation on auth failure"""
+
+    def __init__(self, factory=create_pooled_client, storage_factory=create_storage_client):
+        self._factory = factory
+        self._storage_factory = storage_factory
+        self._client = None
+        self._storage = None
+        self._storage_checked = False
+        self._lock = threading.Lock()
+        self.creations = 0
+
+    def get(self):
+        client = self._client
+        if client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+                    self.creations += 1
+                    print(f"✅ BigQuery client created (#{self.creations})")
+                client = self._client
+        return client
+
+    def storage(self):
+        """Shared Storage Read API client for bulk Arrow downloads, or None (REST pages are used instead)"""
+        if not self._storage_checked:
+            with self._lock:
+                if not self._storage_checked:
+                    try:
+                        self._storage = self._storage_factory()
+                    except Exception as e:
+                        print(f"WARNING: BigQuery Storage API unavailable, using REST pages: {e}")
+                        self._storage = None
+                    self._storage_checked = True
+        return self._storage
+
+    def reset(self, stale=None):
+        """Drops the client (only if it is still `stale`, when given) so the next get() builds a new one"""
+        with self._lock:
+            if self._client is None or (stale is not None and self._client is not stale):
+                return
+            client, self._client = self._client, None
+            self._storage, self._storage_checked = None, False
+        try:
+            client.close()
+        except Exception:
+            pass
+
+    def run(self, operation):
+        """Calls operation(client); on an auth failure re-creates the client and retries once"""
+        client = self.get()
+        try:
+            return operation(client)
+        except AUTH_ERRORS as e:
+            print(f"WARNING: BigQuery auth failure ({e}) - re-creating client")
+            self.reset(stale=client)
+            return operation(self.get())
+
+    def override(self, factory, storage_factory=lambda: None):
+        """Replaces the client factories, e.g. lambda: FakeClient() in tests"""
+        self.reset()
+        self._factory = factory
+        self._storage_factory = storage_factory
+        self._storage, self._storage_checked = None, False
+
+bigquery_clients = SharedClient()
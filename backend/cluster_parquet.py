@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Rewrite Final_Data.parquet clustered by SYMBOL then TIMESTAMP
+Bounded row groups with min/max statistics so one symbol read touches 1-2 row groups
+"""
+
+import os
+import sys
+import time
+import pyarrow.parquet as pq
+from config import settings
+from symbol_catalog import build_catalog
+
+# ~700 rows per symbol on average, so a row group holds a few dozen symbols
+DEFAULT_ROW_GROUP_SIZE = 16384
+
+def cluster_parquet(source_path=None, target_path=None, row_group_size=DEFAULT_ROW_GROUP_SIZE):
+    """Sort the dataset by (SYMBOL, TIMESTAMP) and write it with bounded row groups"""
+    source_path = source_path or settings.DATA_PATH
+    target_path = target_path or settings.CLUSTERED_DATA_PATH
+
+    print(f"📥 Reading {source_path}...")
+    started = time.perf_counter()
+    table = pq.read_table(source_path)
+    print(f"✅ Loaded {table.num_rows:,} rows x {table.num_columns} columns")
+
+    print("🔀 Sorting by SYMBOL, TIMESTAMP...")
+    table = table.sort_by([("SYMBOL", "ascending"), ("TIMESTAMP", "ascending")])
+
+    # Write next to the target and rename so readers never see a partial file
+    temp_path = f"{target_path}.tmp"
+    print(f"💾 Writing {target_path} (row groups of {row_group_size:,} rows)...")
+    pq.write_table(
+        table,
+        temp_path,
+        row_group_size=row_group_size,
+        compression="snappy",
+        write_statistics=True,
+    )
+    os.replace(temp_path, target_path)
+
+    metadata = pq.ParquetFile(target_path).metadata
+    elapsed = time.perf_counter() - started
+    file_size = os.path.getsize(target_path) / (1024 * 1024)
+    print(f"✅ Wrote {metadata.num_row_groups} row groups ({file_size:.1f} MB) in {elapsed:.1f}s")
+
+    # Row-group locations in the catalog refer to this file
+    build_catalog(target_path)
+    return target_path
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else None
+    target = sys.argv[2] if len(sys.argv) > 2 else None
+    rows = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_ROW_GROUP_SIZE
+    cluster_parquet(source, target, rows)
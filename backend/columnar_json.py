@@ -0,0 +1,58 @@
+"""
+Columnar JSON encoder for /stock_data?format=columnar
+Emits {"COLUMN": [values, ...]} straight to bytes. Numeric and datetime
+columns are formatted with vectorized NumPy string conversion, and NaN/NaT/inf
+become null via a mask - no per-cell Python work and no to_dict(orient='records')
+"""
+
+import json
+import numpy as np
+import pandas as pd
+
+def _default(value):
+    """json.dumps fallback for values left in object columns"""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+def _join(strings, null_mask=None):
+    """Joins pre-formatted JSON literals into an array, nulling masked slots"""
+    if null_mask is not None and null_mask.any():
+        strings = np.where(null_mask, "null", strings)
+    return "[" + ",".join(strings.tolist()) + "]"
+
+def encode_column(values):
+    """Encodes one column array as a JSON array literal"""
+    values = np.asarray(values)
+    kind = values.dtype.kind
+
+    if kind == "f":
+        return _join(values.astype(str), ~np.isfinite(values))
+    if kind in "iu":
+        return _join(values.astype(str))
+    if kind == "b":
+        return _join(np.where(values, "true", "false"))
+    if kind == "M":
+        # Same text as Timestamp.isoformat() for second-resolution market data
+        strings = np.char.add(np.char.add('"', np.datetime_as_string(values, unit="s")), '"')
+        return _join(strings, np.isnat(values))
+
+    # Strings and mixed objects go through the C JSON encoder in one call
+    items = values.tolist()
+    null_mask = pd.isna(values)
+    if null_mask.any():
+        for i in np.flatnonzero(null_mask):
+            items[i] = None
+    return json.dumps(items, default=_default, allow_nan=False)
+
+def encode_columnar(data):
+    """Encodes a DataFrame or {column: array} mapping as columnar JSON bytes"""
+    if isinstance(data, pd.DataFrame):
+        columns = ((name, data[name].to_numpy()) for name in data.columns)
+    else:
+        columns = data.items()
+
+    parts = [f"{json.dumps(str(name))}:{encode_column(values)}" for name, values in columns]
+    return ("{" + ",".join(parts) + "}").encode("utf-8")
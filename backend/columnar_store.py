@@ -0,0 +1,127 @@
+"""
+Resident columnar store for the parquet backends
+Loads the dataset once into contiguous per-column NumPy arrays sorted by
+(SYMBOL, TIMESTAMP) with a symbol -> (start, end) offset table, so a symbol
+lookup is an O(1) dict hit plus array slicing (views, no copies)
+"""
+
+import os
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+def data_columns(names):
+    """Column names without the __index_level_N__ columns pandas writes for a saved index"""
+    return [name for name in names if not (name.startswith("__index_level_") and name.endswith("__"))]
+
+def date_bounds(timestamps, start=None, end=None):
+    """Row range [lo, hi) of a sorted timestamp array within [start, end] - two binary searches"""
+    lo = np.searchsorted(timestamps, pd.Timestamp(start).to_datetime64(), side='left') if start is not None else 0
+    hi = np.searchsorted(timestamps, pd.Timestamp(end).to_datetime64(), side='right') if end is not None else len(timestamps)
+    return int(lo), int(max(lo, hi))
+
+class ColumnarStore:
+    """Per-column arrays sorted by (SYMBOL, TIMESTAMP) plus symbol offsets"""
+
+    def __init__(self, columns, offsets, source_path=None, version=None):
+        self.columns = columns
+        self.offsets = offsets
+        self.source_path = source_path
+        self.version = version
+
+    @classmethod
+    def from_parquet(cls, path):
+        """Reads the whole parquet file once and builds the sorted store"""
+        started = time.perf_counter()
+        stat = os.stat(path)
+        columns = data_columns(pq.read_schema(path).names)
+        store = cls.from_table(pq.read_table(path, columns=columns), source_path=path,
+                               version=(stat.st_mtime_ns, stat.st_size))
+        elapsed = time.perf_counter() - started
+        print(f"✅ Columnar store loaded: {store.num_rows:,} rows, {len(store.offsets):,} symbols, "
+              f"{store.nbytes / (1024 * 1024):.1f} MB in {elapsed:.1f}s")
+        return store
+
+    @classmethod
+    def from_frame(cls, df, source_path=None, version=None):
+        """Builds a store from a DataFrame (e.g. derived bars)"""
+        return cls.from_table(pa.Table.from_pandas(df, preserve_index=False),
+                              source_path=source_path, version=version)
+
+    @classmethod
+    def from_table(cls, table, source_path=None, version=None):
+        """Sorts an Arrow table by (SYMBOL, TIMESTAMP) and splits it into column arrays"""
+        # A saved pandas index is not data - keep it out of column_names, fields= and full rows
+        index_columns = [name for name in table.column_names if name not in data_columns(table.column_names)]
+        if index_columns:
+            table = table.drop_columns(index_columns)
+
+        # Older exports stored TIMESTAMP as text - normalise before sorting
+        ts_index = table.schema.get_field_index("TIMESTAMP")
+        if not pa.types.is_timestamp(table.schema.field(ts_index).type):
+            timestamps = pd.to_datetime(table.column(ts_index).to_numpy(zero_copy_only=False))
+            table = table.set_column(ts_index, "TIMESTAMP", pa.array(timestamps))
+
+        table = table.sort_by([("SYMBOL", "ascending"), ("TIMESTAMP", "ascending")])
+
+        columns = {}
+        for name in table.column_names:
+            columns[name] = np.ascontiguousarray(table.column(name).to_numpy())
+        del table
+
+        # Sorted by symbol, so each symbol is one contiguous run
+        symbols = columns["SYMBOL"]
+        offsets = {}
+        if len(symbols):
+            boundaries = np.flatnonzero(symbols[1:] != symbols[:-1]) + 1
+            starts = np.concatenate(([0], boundaries))
+            ends = np.concatenate((boundaries, [len(symbols)]))
+            offsets = {symbols[start]: (int(start), int(end)) for start, end in zip(starts, ends)}
+
+        return cls(columns, offsets, source_path=source_path, version=version)
+
+    @property
+    def num_rows(self):
+        return len(self.columns["SYMBOL"]) if "SYMBOL" in self.columns else 0
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes for values in self.columns.values())
+
+    @property
+    def column_names(self):
+        return list(self.columns.keys())
+
+    @property
+    def symbols(self):
+        return list(self.offsets.keys())
+
+    def __contains__(self, symbol):
+        return symbol in self.offsets
+
+    def bounds(self, symbol, start_date=None, end_date=None):
+        """Returns the (start, end) row range for a symbol, optionally narrowed to a date range, or None"""
+        bounds = self.offsets.get(symbol)
+        if bounds is None or (start_date is None and end_date is None):
+            return bounds
+        start, end = bounds
+        lo, hi = date_bounds(self.columns["TIMESTAMP"][start:end], start_date, end_date)
+        return start + lo, start + hi
+
+    def slice(self, symbol, columns=None, start_date=None, end_date=None):
+        """Returns {column: array view} for one symbol (and date range), or None if unknown"""
+        bounds = self.bounds(symbol, start_date, end_date)
+        if bounds is None:
+            return None
+        start, end = bounds
+        names = columns if columns is not None else self.columns.keys()
+        return {name: self.columns[name][start:end] for name in names if name in self.columns}
+
+    def to_frame(self, symbol, columns=None, start_date=None, end_date=None):
+        """Materialises one symbol as a DataFrame - the only point where data is copied"""
+        arrays = self.slice(symbol, columns, start_date, end_date)
+        if arrays is None:
+            return pd.DataFrame()
+        return pd.DataFrame(arrays)
@@ -16,10 +16,52 @@ class Settings:
     DATA_FILENAME = os.getenv("DATA_FILENAME", "Final_Data.parquet")
     ONEDRIVE_DATA_URL = os.getenv("ONEDRIVE_DATA_URL", "https://storage.googleapis.com/stock-data-sss-2024/Final_Data.parquet")
     
+    # Cold-start download: parallel range requests, optional published SHA-256
+    DOWNLOAD_WORKERS = int(os.getenv("DOWNLOAD_WORKERS", 8))
+    DOWNLOAD_CHUNK_MB = int(os.getenv("DOWNLOAD_CHUNK_MB", 16))
+    DATA_SHA256 = os.getenv("DATA_SHA256", "")
+    
+    # Load the columnar store and bars in the background at startup (see /ready)
+    WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() == "true"
+    # Retry-After sent with 503s while the dataset is not on disk yet
+    DATASET_RETRY_AFTER_SECONDS = int(os.getenv("DATASET_RETRY_AFTER_SECONDS", 10))
+    
+    # Byte budget of the per-symbol frame cache (assembled /stock_data frames and parquet reads)
+    SYMBOL_CACHE_MB = int(os.getenv("SYMBOL_CACHE_MB", 256))
+    
+    CLUSTERED_DATA_FILENAME = os.getenv("CLUSTERED_DATA_FILENAME", "Final_Data_clustered.parquet")
+    
     @property
     def DATA_PATH(self):
         return os.path.join(self.DATA_DIRECTORY, self.DATA_FILENAME)
     
+    @property
+    def CLUSTERED_DATA_PATH(self):
+        # Written by cluster_parquet.py - sorted by SYMBOL, TIMESTAMP with small row groups
+        return os.path.join(self.DATA_DIRECTORY, self.CLUSTERED_DATA_FILENAME)
+    
+    # BigQuery backend (main.py): one shared client per process
+    BIGQUERY_PROJECT = os.getenv("BIGQUERY_PROJECT", "triple-student-465020-g0")
+    BIGQUERY_POOL_SIZE = int(os.getenv("BIGQUERY_POOL_SIZE", 32))
+    # How often the cached dimension_table is checked for changes
+    DIMENSION_CACHE_TTL_SECONDS = int(os.getenv("DIMENSION_CACHE_TTL_SECONDS", 900))
+    # Result cache for /stock_data and /analytics/*, invalidated by fact_table's data_version label
+    RESULT_CACHE_MB = int(os.getenv("RESULT_CACHE_MB", 128))
+    RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", 5000))
+    RESULT_CACHE_TTL_SECONDS = int(os.getenv("RESULT_CACHE_TTL_SECONDS", 6 * 3600))
+    DATASET_VERSION_CHECK_SECONDS = int(os.getenv("DATASET_VERSION_CHECK_SECONDS", 60))
+    
+    # Cloud SQL backends (main_fixed.py, main_basic.py, ...): shared MySQL connection pool
+    MYSQL_POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", 10))
+    MYSQL_POOL_MAX_LIFETIME_SECONDS = int(os.getenv("MYSQL_POOL_MAX_LIFETIME_SECONDS", 1800))
+    # Idle connections older than this are pinged before reuse
+    MYSQL_POOL_PING_AFTER_SECONDS = int(os.getenv("MYSQL_POOL_PING_AFTER_SECONDS", 30))
+    MYSQL_POOL_TIMEOUT_SECONDS = int(os.getenv("MYSQL_POOL_TIMEOUT_SECONDS", 10))
+    # Threads running queries for the async endpoints (0 = one per pooled connection)
+    MYSQL_EXECUTOR_WORKERS = int(os.getenv("MYSQL_EXECUTOR_WORKERS", 0))
+    # Rows per chunk read from the unbuffered cursor by /stock_data?stream=true
+    MYSQL_STREAM_CHUNK_ROWS = int(os.getenv("MYSQL_STREAM_CHUNK_ROWS", 1000))
+    
     # CORS configuration
     CORS_ORIGINS = os.getenv(
         "CORS_ORIGINS", 
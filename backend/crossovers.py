@@ -0,0 +1,31 @@
+"""
+Vectorised EMA crossover detection
+Every configured (fast, slow) EMA pair is compared in one pass over stacked
+2-D arrays instead of a Python loop per pair and bar. Results come back both
+as dense per-bar columns and as compact arrays of the bars where a cross occurs.
+"""
+
+import numpy as np
+
+# (fast span, slow span) pairs reported as BullCross_<fast>_<slow> / BearCross_<fast>_<slow>
+EMA_CROSS_PAIRS = [(63, 144), (144, 234), (63, 234)]
+
+def detect_crossovers(emas, pairs=EMA_CROSS_PAIRS):
+    """emas: {span: EMA values}. Returns (dense, events) keyed by column name, e.g. 'BullCross_63_144':
+    dense - bool array per bar; a bull cross is fast > slow on this bar and fast <= slow on the previous one
+    events - int array of the bar indices where dense is True"""
+    fast = np.vstack([np.asarray(emas[fast_span], dtype=float) for fast_span, _ in pairs])
+    slow = np.vstack([np.asarray(emas[slow_span], dtype=float) for _, slow_span in pairs])
+
+    bull = np.zeros(fast.shape, dtype=bool)
+    bear = np.zeros(fast.shape, dtype=bool)
+    # Bar 0 has no previous bar and never signals; NaN compares False, as in the scalar version
+    bull[:, 1:] = (fast[:, 1:] > slow[:, 1:]) & (fast[:, :-1] <= slow[:, :-1])
+    bear[:, 1:] = (fast[:, 1:] < slow[:, 1:]) & (fast[:, :-1] >= slow[:, :-1])
+
+    dense = {}
+    for row, (fast_span, slow_span) in enumerate(pairs):
+        dense[f"BullCross_{fast_span}_{slow_span}"] = bull[row]
+        dense[f"BearCross_{fast_span}_{slow_span}"] = bear[row]
+    events = {name: np.flatnonzero(signal) for name, signal in dense.items()}
+    return dense, events
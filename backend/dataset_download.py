@@ -0,0 +1,198 @@
+"""
+Parallel, resumable dataset download
+Fetches a large file with concurrent HTTP range requests into <target>.part,
+recording finished chunks in <target>.part.json so an interrupted download
+resumes where it stopped. The file is verified (published checksum and/or
+parquet footer) before being atomically renamed into place.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pyarrow.parquet as pq
+import requests
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+CHUNK_RETRIES = 3
+
+class DownloadError(Exception):
+    """Raised when the dataset cannot be downloaded or fails verification"""
+
+def _published_md5(headers):
+    """MD5 advertised by the server (GCS x-goog-hash or Content-MD5), as hex"""
+    encoded = headers.get('Content-MD5')
+    for entry in headers.get('x-goog-hash', '').split(','):
+        name, _, value = entry.strip().partition('=')
+        if name == 'md5':
+            encoded = value
+    return base64.b64decode(encoded).hex() if encoded else None
+
+def probe(url, session):
+    """Returns (size, etag, supports_ranges, published md5) for a URL"""
+    response = session.head(url, allow_redirects=True, timeout=60)
+    response.raise_for_status()
+    size = int(response.headers.get('Content-Length') or 0)
+    supports_ranges = response.headers.get('Accept-Ranges', '').lower() == 'bytes'
+    return size, response.headers.get('ETag'), supports_ranges, _published_md5(response.headers)
+
+def _load_manifest(manifest_path, url, size, etag, chunk_size):
+    """Finished chunk indexes from a manifest that matches this download, else an empty set"""
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return set()
+    if (manifest.get('url'), manifest.get('size'), manifest.get('etag'), manifest.get('chunk_size')) != (url, size, etag, chunk_size):
+        print("INFO: Download manifest is for a different file version - starting over")
+        return set()
+    return set(manifest.get('done', []))
+
+def _save_manifest(manifest_path, url, size, etag, chunk_size, done):
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'url': url, 'size': size, 'etag': etag, 'chunk_size': chunk_size, 'done': sorted(done)}, f)
+    os.replace(tmp_path, manifest_path)
+
+def _fetch_chunk(session, url, part_path, start, end):
+    """Downloads bytes [start, end] into the part file at the same offset"""
+    for attempt in range(1, CHUNK_RETRIES + 1):
+        try:
+            response = session.get(url, headers={'Range': f'bytes={start}-{end}'}, timeout=300)
+            response.raise_for_status()
+            if response.status_code != 206 or len(response.content) != end - start + 1:
+                raise DownloadError(f"Server ignored range {start}-{end} (status {response.status_code})")
+            with open(part_path, 'r+b') as f:
+                f.seek(start)
+                f.write(response.content)
+            return
+        except (requests.RequestException, DownloadError) as e:
+            if attempt == CHUNK_RETRIES:
+                raise
+            print(f"WARNING: Chunk {start}-{end} failed ({e}), retrying ({attempt}/{CHUNK_RETRIES})")
+            time.sleep(attempt)
+
+def _fetch_single_stream(session, url, part_path):
+    """Fallback for servers without range support"""
+    response = session.get(url, stream=True, allow_redirects=True, timeout=300)
+    response.raise_for_status()
+    with open(part_path, 'wb') as f:
+        for chunk in response.iter_content(chunk_size=1024 * 1024):
+            if chunk:
+                f.write(chunk)
+
+def file_md5(path):
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(8 * 1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(8 * 1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def verify_download(path, expected_sha256=None, published_md5=None):
+    """Checks a published checksum when available, and always the parquet magic bytes and footer"""
+    if expected_sha256 and file_sha256(path) != expected_sha256.lower():
+        raise DownloadError("SHA-256 mismatch")
+    if published_md5 and file_md5(path) != published_md5:
+        raise DownloadError("MD5 mismatch against the server's published hash")
+    with open(path, 'rb') as f:
+        head = f.read(4)
+        f.seek(-4, os.SEEK_END)
+        tail = f.read(4)
+    if head != b'PAR1' or tail != b'PAR1':
+        raise DownloadError("Not a parquet file (missing PAR1 magic)")
+    try:
+        metadata = pq.ParquetFile(path).metadata
+    except Exception as e:
+        raise DownloadError(f"Unreadable parquet footer: {e}")
+    return metadata
+
+def download_dataset(url, target_path, workers=8, chunk_size=16 * 1024 * 1024, expected_sha256=None,
+                     session=None, progress=None):
+    """
+    Downloads url to target_path with `workers` concurrent range requests.
+    Resumable via <target>.part.json; verified before the atomic rename.
+    progress(done_bytes, total_bytes), if given, is called as chunks complete.
+    """
+    if session is None:
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=workers)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    part_path = target_path + '.part'
+    manifest_path = part_path + '.json'
+    started = time.perf_counter()
+
+    try:
+        size, etag, supports_ranges, published_md5 = probe(url, session)
+    except requests.RequestException as e:
+        print(f"WARNING: HEAD request failed ({e})")
+        size, etag, supports_ranges, published_md5 = 0, None, False, None
+
+    if supports_ranges and size > 0:
+        done = _load_manifest(manifest_path, url, size, etag, chunk_size)
+        if not done or not os.path.exists(part_path) or os.path.getsize(part_path) != size:
+            done = set()
+            with open(part_path, 'wb') as f:
+                f.truncate(size)
+            _save_manifest(manifest_path, url, size, etag, chunk_size, done)
+
+        num_chunks = -(-size // chunk_size)
+        pending = [i for i in range(num_chunks) if i not in done]
+        if done:
+            print(f"INFO: Resuming download - {len(done)}/{num_chunks} chunks already present")
+        print(f"INFO: Downloading {size / (1024 * 1024):.1f} MB in {len(pending)} chunks with {workers} workers")
+
+        failures = []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_fetch_chunk, session, url, part_path,
+                                i * chunk_size, min((i + 1) * chunk_size, size) - 1): i
+                for i in pending
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    failures.append(e)
+                    continue
+                # Only the main thread touches the manifest
+                done.add(futures[future])
+                _save_manifest(manifest_path, url, size, etag, chunk_size, done)
+                if progress:
+                    progress(min(len(done) * chunk_size, size), size)
+                if len(done) % 10 == 0:
+                    print(f"INFO: Downloaded {len(done)}/{num_chunks} chunks...")
+        if failures:
+            raise DownloadError(f"{len(failures)} chunks failed, {len(done)}/{num_chunks} kept for resume: {failures[0]}")
+    else:
+        print("INFO: Server does not support range requests - single-stream download")
+        _fetch_single_stream(session, url, part_path)
+
+    try:
+        metadata = verify_download(part_path, expected_sha256, published_md5)
+    except DownloadError:
+        # A corrupt part file must not be resumed
+        for path in (part_path, manifest_path):
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+
+    os.replace(part_path, target_path)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    elapsed = time.perf_counter() - started
+    print(f"INFO: Downloaded and verified {target_path} ({os.path.getsize(target_path) / (1024 * 1024):.1f} MB, "
+          f"{metadata.num_rows:,} rows) in {elapsed:.1f}s")
+    return target_path
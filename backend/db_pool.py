@@ -0,0 +1,242 @@
+"""
+Shared MySQL connection pool for the Cloud SQL backends
+Connections are opened once and reused across requests instead of paying
+TCP + TLS + auth on every call. Idle connections are pinged before reuse,
+recycled after a maximum lifetime, and callers wait (bounded) for a free
+one when all are busy. Wait times and churn are reported by stats().
+Async endpoints run their queries through fetchall_async(), which uses a
+bounded thread executor so blocking driver calls never stall the event loop.
+iter_chunks() streams a result set from an unbuffered cursor for responses
+too large to hold in memory; iterate_async() drives it from async code.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from config import settings
+
+class PoolTimeout(Exception):
+    """No connection became free within the pool's timeout"""
+
+class ConnectionPool:
+    """Bounded LIFO pool of connections created by connect()"""
+
+    def __init__(self, connect, size, max_lifetime_seconds, ping_after_seconds, timeout_seconds, executor_workers=None):
+        self._connect = connect
+        self.size = size
+        self.max_lifetime_seconds = max_lifetime_seconds
+        self.ping_after_seconds = ping_after_seconds
+        self.timeout_seconds = timeout_seconds
+        # One worker per connection by default: more threads would only queue inside acquire()
+        self.executor_workers = executor_workers or size
+        self._executor = None
+        # Steps of streams that already hold a connection - at most one per connection, so they never queue
+        self._stream_executor = None
+        self.queued = 0
+        self._idle = deque()  # (connection, created_at, last_used_at)
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.created = 0
+        self.recycled = 0
+        self.health_check_failures = 0
+        self.timeouts = 0
+        self.acquisitions = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _close(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _checkout(self):
+        """An idle connection that passed its lifetime/health checks, or a new one"""
+        while True:
+            with self._lock:
+                entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                connection = self._connect()
+                self.created += 1
+                now = time.monotonic()
+                return connection, now, now
+            connection, created_at, last_used_at = entry
+            now = time.monotonic()
+            if now - created_at > self.max_lifetime_seconds:
+                self.recycled += 1
+                self._close(connection)
+                continue
+            if now - last_used_at > self.ping_after_seconds:
+                try:
+                    connection.ping()
+                except Exception as e:
+                    print(f"WARNING: Dropping dead pooled connection: {e}")
+                    self.health_check_failures += 1
+                    self._close(connection)
+                    continue
+            return entry
+
+    def acquire(self):
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout_seconds):
+            self.timeouts += 1
+            raise PoolTimeout(f"No database connection free after {self.timeout_seconds}s (pool size {self.size})")
+        waited = time.perf_counter() - started
+        with self._lock:
+            self.acquisitions += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+            self.in_use += 1
+        try:
+            return self._checkout()
+        except Exception:
+            self._release_slot()
+            raise
+
+    def _release_slot(self):
+        with self._lock:
+            self.in_use -= 1
+        self._slots.release()
+
+    def release(self, entry, reusable=True):
+        connection, created_at, _ = entry
+        if reusable and time.monotonic() - created_at <= self.max_lifetime_seconds:
+            with self._lock:
+                self._idle.append((connection, created_at, time.monotonic()))
+        else:
+            if reusable:
+                self.recycled += 1
+            self._close(connection)
+        self._release_slot()
+
+    @contextmanager
+    def connection(self):
+        """with pool.connection() as connection: ... - always returned to the pool"""
+        entry = self.acquire()
+        reusable = True
+        try:
+            yield entry[0]
+        except BaseException:
+            # Leave no half-read result or open transaction behind; a connection that
+            # cannot even roll back is closed instead of reused
+            try:
+                entry[0].rollback()
+            except Exception:
+                reusable = False
+            raise
+        finally:
+            self.release(entry, reusable)
+
+    def fetchall(self, query, params=None, dictionary=False):
+        """Runs query on a pooled connection and returns all rows"""
+        with self.connection() as connection:
+            cursor = connection.cursor(dictionary=dictionary)
+            try:
+                cursor.execute(query, params)
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.executor_workers, thread_name_prefix="db")
+        return self._executor
+
+    @property
+    def stream_executor(self):
+        if self._stream_executor is None:
+            with self._lock:
+                if self._stream_executor is None:
+                    self._stream_executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="db-stream")
+        return self._stream_executor
+
+    async def fetchall_async(self, query, params=None, dictionary=False):
+        """fetchall() on the pool's executor - the event loop keeps serving other requests meanwhile"""
+        with self._lock:
+            self.queued += 1
+        def run():
+            with self._lock:
+                self.queued -= 1
+            return self.fetchall(query, params, dictionary)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, run)
+
+    def iter_chunks(self, query, params=None, dictionary=False, chunk_size=1000):
+        """Yields lists of up to chunk_size rows from an unbuffered cursor, so rows are read from the
+        server as they are consumed. The connection is held until the rows run out or the iterator is closed."""
+        entry = self.acquire()
+        finished = False
+        try:
+            cursor = entry[0].cursor(dictionary=dictionary, buffered=False)
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+            cursor.close()
+            finished = True
+        finally:
+            # Abandoned mid-result, the rest of the rows are still on the wire: drop that connection
+            self.release(entry, reusable=finished)
+
+    async def iterate_async(self, iterator):
+        """Async iterator over a blocking iterator that takes a pooled connection on its first step
+        (e.g. iter_chunks()). That step waits in acquire(), so it runs on the executor like fetchall_async();
+        later steps hold the connection and run on stream_executor. Otherwise fetchall_async() jobs waiting
+        for a connection could take every worker and keep a stream from ever finishing and releasing its own."""
+        step = None
+        executor = self.executor
+        try:
+            while True:
+                step = executor.submit(next, iterator, None)
+                executor = self.stream_executor
+                item = await asyncio.wrap_future(step)
+                if item is None:
+                    break
+                yield item
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                if step is not None and not step.done():
+                    # Cancelled (client went away) while a worker is still inside next(): close after it
+                    step.add_done_callback(lambda _: close())
+                else:
+                    close()
+
+    def stats(self):
+        return {
+            "size": self.size,
+            "executor_workers": self.executor_workers,
+            "stream_workers": self.size,
+            "queued": self.queued,
+            "in_use": self.in_use,
+            "idle": len(self._idle),
+            "created": self.created,
+            "recycled": self.recycled,
+            "health_check_failures": self.health_check_failures,
+            "timeouts": self.timeouts,
+            "acquisitions": self.acquisitions,
+            "wait_ms_avg": round(self.wait_seconds_total / self.acquisitions * 1000, 3) if self.acquisitions else None,
+            "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+        }
+
+def create_mysql_pool(db_config):
+    """Pool of autocommit mysql.connector connections sized by the MYSQL_POOL_* settings"""
+    import mysql.connector
+
+    # Autocommit: read-only endpoints must not keep one REPEATABLE READ snapshot across requests
+    return ConnectionPool(
+        lambda: mysql.connector.connect(autocommit=True, **db_config),
+        size=settings.MYSQL_POOL_SIZE,
+        max_lifetime_seconds=settings.MYSQL_POOL_MAX_LIFETIME_SECONDS,
+        ping_after_seconds=settings.MYSQL_POOL_PING_AFTER_SECONDS,
+        timeout_seconds=settings.MYSQL_POOL_TIMEOUT_SECONDS,
+        executor_workers=settings.MYSQL_EXECUTOR_WORKERS,
+    )
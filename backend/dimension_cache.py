@@ -0,0 +1,71 @@
+"""
+In-process copy of the BigQuery dimension_table
+symbol -> security/sector/industry changes a few times a year, so it is
+loaded once, re-checked every ttl seconds against the table's last-modified
+time, and reloaded only when that changes. Fact queries no longer JOIN it.
+"""
+
+import threading
+import time
+
+DIMENSION_ATTRIBUTES = ["security", "sector", "industry"]
+
+class DimensionCache:
+    """symbol -> {security, sector, industry}, refreshed on table version change"""
+
+    def __init__(self, load_rows, get_version, ttl_seconds):
+        self._load_rows = load_rows
+        self._get_version = get_version
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = None
+        self._symbols = []
+        self._checked_at = 0.0
+        self.version = None
+        self.loads = 0
+
+    def _refresh_if_due(self):
+        if self._entries is not None and time.monotonic() - self._checked_at < self.ttl_seconds:
+            return
+        with self._lock:
+            if self._entries is not None and time.monotonic() - self._checked_at < self.ttl_seconds:
+                return
+            try:
+                version = self._get_version()
+                if self._entries is None or version != self.version:
+                    rows = self._load_rows()
+                    self._entries = {row["symbol"]: {name: row.get(name) for name in DIMENSION_ATTRIBUTES}
+                                     for row in rows}
+                    self._symbols = sorted(self._entries)
+                    self.version = version
+                    self.loads += 1
+                    print(f"✅ Dimension cache loaded: {len(self._entries):,} symbols (version {version})")
+            except Exception as e:
+                if self._entries is None:
+                    raise
+                # Keep serving the last good copy; try again after the next ttl
+                print(f"WARNING: Dimension cache refresh failed, serving cached copy: {e}")
+            self._checked_at = time.monotonic()
+
+    @property
+    def current_version(self):
+        """Version of the copy lookups are served from, after the refresh check if one is due"""
+        self._refresh_if_due()
+        return self.version
+
+    def invalidate(self):
+        """Forces a version check on the next lookup"""
+        self._checked_at = 0.0
+
+    @property
+    def symbols(self):
+        self._refresh_if_due()
+        return self._symbols
+
+    def get(self, symbol):
+        """Attributes for a symbol, or None if it is not in dimension_table"""
+        self._refresh_if_due()
+        return self._entries.get(symbol)
+
+    def __contains__(self, symbol):
+        return self.get(symbol) is not None
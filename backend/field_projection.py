@@ -0,0 +1,28 @@
+"""
+Column projection for the /stock_data endpoints
+Parses the comma-separated fields= query parameter against a whitelist
+derived from the backend's schema, so only requested columns are read
+"""
+
+from fastapi import HTTPException
+
+def parse_fields(fields, allowed_columns, required=("TIMESTAMP",)):
+    """
+    Returns the backend column names selected by fields=, or None for all columns.
+    Matching is case-insensitive; required columns are always included first.
+    """
+    if not fields:
+        return None
+
+    allowed = {column.upper(): column for column in allowed_columns}
+    requested = [name.strip().upper() for name in fields.split(",") if name.strip()]
+
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    selected = []
+    for name in [column.upper() for column in required] + requested:
+        if name in allowed and allowed[name] not in selected:
+            selected.append(allowed[name])
+    return selected
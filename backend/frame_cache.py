@@ -0,0 +1,94 @@
+"""
+Byte-bounded LRU cache for per-symbol DataFrames and encoded API responses
+Eviction is driven by the values' actual size rather than an entry count
+(optionally capped too), entries can expire after a TTL, and the whole cache
+is dropped when the dataset version changes.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+def frame_nbytes(df):
+    """Memory held by a DataFrame, including string/object payloads"""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+class ByteLRUCache:
+    """LRU mapping of key -> value bounded by total bytes (sizeof), entry count and age"""
+
+    def __init__(self, max_bytes, sizeof=frame_nbytes, ttl_seconds=None, max_entries=None):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.version = None
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _check_version(self, version):
+        if version != self.version:
+            if self._entries:
+                self.invalidations += 1
+                print(f"INFO: Dataset changed - dropping {len(self._entries)} cached entries")
+            self._entries.clear()
+            self.current_bytes = 0
+            self.version = version
+
+    def get(self, key, version):
+        """Cached value for key under this dataset version, or None"""
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds is not None and time.monotonic() - entry[2] > self.ttl_seconds:
+                del self._entries[key]
+                self.current_bytes -= entry[1]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, version):
+        """Caches value, evicting least recently used entries until it fits"""
+        nbytes = self.sizeof(value)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            self._check_version(version)
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            while self._entries and (self.current_bytes + nbytes > self.max_bytes or
+                                     (self.max_entries is not None and len(self._entries) >= self.max_entries)):
+                _, (_, evicted_bytes, _) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+                self.evictions += 1
+            self._entries[key] = (value, nbytes, time.monotonic())
+            self.current_bytes += nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
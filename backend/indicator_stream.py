@@ -0,0 +1,79 @@
+"""
+Chunked technical indicators for streamed /stock_data responses
+Every indicator is causal: rolling windows look back at most LOOKBACK rows
+and EMAs are recursive. Each chunk is therefore computed together with the
+previous LOOKBACK rows, with every EMA seeded from its value just before
+them, and its rows get the same values as a single pass over the history.
+"""
+
+import json
+import pandas as pd
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+# Longest rolling window (VWAP_Y, 252 rows) minus the current row
+LOOKBACK = 251
+EMA_SPANS = (63, 144, 234)
+
+def seeded_ema(values, span, seed=None):
+    """ewm(span, adjust=False).mean(), continuing from `seed` (the EMA of the preceding row) when given"""
+    values = pd.Series(values).reset_index(drop=True)
+    if seed is None:
+        return values.ewm(span=span, adjust=False).mean()
+    seeded = pd.concat([pd.Series([seed]), values], ignore_index=True)
+    return seeded.ewm(span=span, adjust=False).mean().iloc[1:].reset_index(drop=True)
+
+def stream_indicators(row_chunks, calculate):
+    """Yields (rows, indicators) per chunk, where calculate(df, ema_seeds=...) returns {name: list}
+    over df including EMA_63/EMA_144/EMA_234. Holds at most one chunk plus LOOKBACK rows."""
+    tail = []
+    seeds = None
+    for rows in row_chunks:
+        window = tail + rows
+        indicators = calculate(pd.DataFrame(window), ema_seeds=seeds)
+        offset = len(tail)
+        yield rows, {name: values[offset:] for name, values in indicators.items()}
+        keep = min(LOOKBACK, len(window))
+        before = len(window) - keep - 1
+        if before >= 0:
+            seeds = {span: indicators[f"EMA_{span}"][before] for span in EMA_SPANS}
+        tail = window[len(window) - keep:]
+
+class ClosingStreamingResponse(StreamingResponse):
+    """StreamingResponse that closes its body iterator even when the client disconnects mid-stream
+    (Starlette leaves it suspended until garbage collection, holding its DB connection)"""
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.body_iterator.aclose()
+
+async def ndjson_response(pool, query, params, calculate, output_indicators, to_record, chunk_size, not_found):
+    """NDJSON StreamingResponse: rows are read from an unbuffered cursor, given indicators and encoded one
+    chunk at a time, so time-to-first-byte and memory do not grow with the history length.
+    to_record(row, indicators, i) builds one record; not_found is the 404 detail for an empty result."""
+    def ndjson_chunks():
+        row_chunks = pool.iter_chunks(query, params, dictionary=True, chunk_size=chunk_size)
+        try:
+            for rows, indicators in stream_indicators(row_chunks, calculate):
+                indicators = {name: indicators[name] for name in output_indicators if name in indicators}
+                yield "".join(json.dumps(to_record(row, indicators, i)) + "\n" for i, row in enumerate(rows))
+        finally:
+            row_chunks.close()
+
+    chunks = pool.iterate_async(ndjson_chunks())
+    try:
+        first_chunk = await anext(chunks)
+    except StopAsyncIteration:
+        raise HTTPException(status_code=404, detail=not_found)
+
+    async def body():
+        try:
+            yield first_chunk
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+    return ClosingStreamingResponse(body(), media_type="application/x-ndjson")
@@ -4,13 +4,25 @@ BigQuery Backend - Ultra Fast Stock Analytics
 Direct parquet querying with sub-second performance
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from google.cloud import bigquery
 import pandas as pd
-from datetime import datetime
+import pyarrow as pa
 import os
+import json
+import time
+import heapq
+import itertools
 from config import settings
+from field_projection import parse_fields
+from arrow_response import negotiate_binary_format, binary_response, json_records_response
+from bigquery_client import bigquery_clients
+from dimension_cache import DimensionCache
+from performance_summary import PerformanceSummary, RETURN_PERIODS, summary_query
+from frame_cache import ByteLRUCache
 
 app = FastAPI(
     title="Stock Dashboard API - BigQuery",
@@ -27,60 +39,186 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# BigQuery client
-client = bigquery.Client(project="triple-student-465020-g0")
-
 # Dataset and table references
 DATASET_ID = "stock_temp"
 DIMENSION_TABLE = f"triple-student-465020-g0.{DATASET_ID}.dimension_table"
 FACT_TABLE = f"triple-student-465020-g0.{DATASET_ID}.fact_table"
+SUMMARY_TABLE = f"triple-student-465020-g0.{DATASET_ID}.symbol_summary"
+
+# Columns served by /stock_data, qualified by table alias (f = fact, d = dimension).
+# Mirrors the BigQuery schema and doubles as the fields= whitelist.
+STOCK_DATA_COLUMNS = [
+    "f.timestamp", "f.symbol", "d.security", "d.sector", "d.industry",
+    "f.open_price", "f.high_price", "f.low_price", "f.last_price", "f.close_price",
+    "f.volume", "f.turnover_lacs", "f.no_of_trades", "f.deliv_qty", "f.deliv_per",
+    "f.rolling_median", "f.rolling_mode", "f.month", "f.week", "f.prev_high", "f.prev_low",
+    "f.pp", "f.s1", "f.s2", "f.s3", "f.s4", "f.r1", "f.r2", "f.r3", "f.r4", "f.bc", "f.tc",
+    "f.vwap_w", "f.vwap_std_w", "f.vwap_upper_1_w", "f.vwap_lower_1_w",
+    "f.vwap_upper_2_w", "f.vwap_lower_2_w", "f.vwap_upper_3_w", "f.vwap_lower_3_w",
+    "f.vwap_m", "f.vwap_std_m", "f.vwap_upper_1_m", "f.vwap_lower_1_m",
+    "f.vwap_upper_2_m", "f.vwap_lower_2_m", "f.vwap_upper_3_m", "f.vwap_lower_3_m",
+    "f.vwap_q", "f.vwap_std_q", "f.vwap_upper_1_q", "f.vwap_lower_1_q",
+    "f.vwap_upper_2_q", "f.vwap_lower_2_q", "f.vwap_upper_3_q", "f.vwap_lower_3_q",
+    "f.vwap_y", "f.vwap_std_y", "f.vwap_upper_1_y", "f.vwap_lower_1_y",
+    "f.vwap_upper_2_y", "f.vwap_lower_2_y", "f.vwap_upper_3_y", "f.vwap_lower_3_y",
+    "f.ema_63", "f.ema_144", "f.ema_234",
+    "f.bullcross_63_144", "f.bearcross_63_144", "f.bullcross_144_234",
+    "f.bearcross_144_234", "f.bullcross_63_234", "f.bearcross_63_234",
+    "f.linreg_curve_63", "f.volume_ma_45", "f.turnover_lacs_ma_45",
+    "f.no_of_trades_ma_45", "f.deliv_qty_ma_45", "f.deliv_per_ma_45",
+    "f.fib_ext_0_236", "f.fib_ext_0_786", "f.avg_price", "f.series",
+    "f.stock_rating", "f.quality_score", "f.growth_score", "f.mcap_category",
+    "f.nifty_50", "f.fno", "f.flag", "f.nifty_500", "f.next_50", "f.alpha_50", "f.beta_50",
+    "f.trend_bias", "f.price_category", "f.one_year_growth_percent",
+]
+STOCK_DATA_FIELDS = {column.split(".", 1)[1]: column for column in STOCK_DATA_COLUMNS}
+
+def normalize_arrow_result(table):
+    """Upper-cases column names and turns nanosecond-integer timestamps into Arrow timestamps"""
+    table = table.rename_columns([name.upper() for name in table.column_names])
+    if "TIMESTAMP" in table.column_names:
+        index = table.column_names.index("TIMESTAMP")
+        timestamps = table.column(index)
+        if pa.types.is_integer(timestamps.type):
+            table = table.set_column(index, "TIMESTAMP", timestamps.cast(pa.timestamp("ns")))
+    return table
 
 def get_bigquery_client():
-    """Get BigQuery client"""
+    """Get the shared BigQuery client (created once per process)"""
     try:
-        return bigquery.Client(project="triple-student-465020-g0")
+        return bigquery_clients.get()
     except Exception as e:
         print(f"BigQuery client error: {e}")
         return None
 
+def run_query(query, job_config=None, endpoint="query"):
+    """Runs a query on the shared client, re-creating it once on auth failure.
+    Logs the bytes the job scanned so partition/cluster pruning is visible."""
+    def execute(client):
+        job = client.query(query, job_config=job_config)
+        result = job.result()
+        processed = job.total_bytes_processed or 0
+        billed = job.total_bytes_billed or 0
+        print(f"BQ: {endpoint} processed {processed / (1024 * 1024):.2f} MB, "
+              f"billed {billed / (1024 * 1024):.2f} MB, cache_hit={job.cache_hit}")
+        return result
+    return bigquery_clients.run(execute)
+
+def load_dimension_rows():
+    """Full dimension_table - a few thousand rows"""
+    query = f"SELECT symbol, security, sector, industry FROM `{DIMENSION_TABLE}`"
+    return run_query(query, endpoint="dimension_cache").to_arrow(create_bqstorage_client=False).to_pylist()
+
+def get_dimension_version():
+    """Last-modified time of dimension_table - a metadata call, no query"""
+    return bigquery_clients.run(lambda client: client.get_table(DIMENSION_TABLE).modified)
+
+dimension_cache = DimensionCache(load_dimension_rows, get_dimension_version, settings.DIMENSION_CACHE_TTL_SECONDS)
+
+def attach_dimension_columns(table, select_columns, attributes):
+    """Adds the cached security/sector/industry as constant columns, in SELECT-list order"""
+    columns, names = [], []
+    for column in select_columns:
+        alias, name = column.split(".", 1)
+        if alias == "d":
+            columns.append(pa.array([attributes.get(name)] * table.num_rows, pa.string()))
+        else:
+            columns.append(table.column(name.upper()))
+        names.append(name.upper())
+    return pa.table(columns, names=names)
+
+# Encoded responses keyed by (endpoint, normalized params), dropped when the dataset version changes
+result_cache = ByteLRUCache(settings.RESULT_CACHE_MB * 1024 * 1024, sizeof=lambda entry: len(entry[0]),
+                            ttl_seconds=settings.RESULT_CACHE_TTL_SECONDS,
+                            max_entries=settings.RESULT_CACHE_MAX_ENTRIES)
+_table_metadata = {}
+
+def get_table_metadata(table_id):
+    """Table metadata (labels, modified, num_rows) - a metadata call, no query job.
+    Re-read at most every DATASET_VERSION_CHECK_SECONDS; keeps the last good copy on failure, None if never read."""
+    now = time.monotonic()
+    table, checked_at = _table_metadata.get(table_id, (None, None))
+    if checked_at is None or now - checked_at > settings.DATASET_VERSION_CHECK_SECONDS:
+        try:
+            table = bigquery_clients.run(lambda client: client.get_table(table_id))
+        except Exception as e:
+            print(f"WARNING: Could not read metadata for {table_id}: {e}")
+        _table_metadata[table_id] = (table, now)
+    return table
+
+def get_dataset_version():
+    """fact_table's data_version label (bumped by reload_complete_data.py), else its last-modified time; None if unknown"""
+    table = get_table_metadata(FACT_TABLE)
+    if table is None:
+        return None
+    return (table.labels or {}).get("data_version") or str(table.modified)
+
+def with_dimension_version(version):
+    """Cache version for responses that include dimension attributes: fact_table's version plus the
+    dimension copy's, so a dimension refresh drops them too. None (not cached) if either is unknown."""
+    if version is None:
+        return None
+    try:
+        return version, str(dimension_cache.current_version)
+    except Exception as e:
+        print(f"WARNING: Dimension cache unavailable, not caching: {e}")
+        return None
+
+def cached_response(key, version):
+    """Cached Response for key, or None (always None while the version is unknown)"""
+    if version is None:
+        return None
+    entry = result_cache.get(key, version)
+    if entry is None:
+        return None
+    body, media_type = entry
+    return Response(content=body, media_type=media_type)
+
+def cache_body(key, version, body, media_type="application/json"):
+    if version is not None:
+        result_cache.put(key, (body, media_type), version)
+
+def cached_json(key, version, value):
+    """Encodes value as JSON, caches it and returns the Response"""
+    body = json.dumps(jsonable_encoder(value)).encode("utf-8")
+    cache_body(key, version, body)
+    return Response(content=body, media_type="application/json")
+
 @app.get("/")
 async def root():
-    """API Status with BigQuery metrics"""
-    client = get_bigquery_client()
+    """API Status with row/symbol counts from cached table metadata - no query jobs"""
+    fact_table = get_table_metadata(FACT_TABLE)
+    dimension_table = get_table_metadata(DIMENSION_TABLE)
     
-    if not client:
-        raise HTTPException(status_code=500, detail="BigQuery connection failed")
-    
-    try:
-        # Get dimension count
-        dim_query = f"SELECT COUNT(*) as count FROM `{DIMENSION_TABLE}`"
-        dim_result = client.query(dim_query).result()
-        dim_count = next(dim_result).count
-        
-        # Get fact count
-        fact_query = f"SELECT COUNT(*) as count FROM `{FACT_TABLE}`"
-        fact_result = client.query(fact_query).result()
-        fact_count = next(fact_result).count
-        
-        return {
-            "message": "Stock Dashboard API - BigQuery Powered",
-            "version": "6.0.0",
-            "status": "operational",
-            "data_model": "bigquery_analytics",
-            "symbols": dim_count,
-            "records": fact_count,
-            "performance": "lightning_fast",
-            "query_engine": "BigQuery",
-            "data_source": "direct_parquet"
-        }
-        
-    except Exception as e:
+    if fact_table is None or dimension_table is None:
         return {
             "message": "Stock Dashboard API - BigQuery Setup",
             "version": "6.0.0", 
             "status": "setup_needed",
-            "error": str(e)
+            "error": "BigQuery table metadata unavailable"
         }
+    
+    return {
+        "message": "Stock Dashboard API - BigQuery Powered",
+        "version": "6.0.0",
+        "status": "operational",
+        "data_model": "bigquery_analytics",
+        "symbols": dimension_table.num_rows,
+        "records": fact_table.num_rows,
+        "performance": "lightning_fast",
+        "query_engine": "BigQuery",
+        "data_source": "direct_parquet"
+    }
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness probe - no BigQuery or network I/O"""
+    return {"status": "ok"}
+
+@app.get("/cache_stats")
+async def cache_stats():
+    """Hit ratio, evictions and byte usage of the BigQuery result cache"""
+    return {"results": result_cache.stats(), "dataset_version": get_dataset_version()}
 
 @app.get("/symbols")
 async def get_symbols():
@@ -91,56 +229,46 @@ async def get_symbols():
         return ["RELIANCE", "TCS", "HDFCBANK", "INFY", "HINDUNILVR"]
     
     try:
-        query = f"""
-        SELECT symbol 
-        FROM `{DIMENSION_TABLE}` 
-        ORDER BY symbol
-        """
-        
-        result = client.query(query).result()
-        symbols = [row.symbol for row in result]
-        return symbols
+        # Served from the in-process dimension_table copy - no query
+        return dimension_cache.symbols
         
     except Exception as e:
         print(f"BigQuery error in get_symbols: {e}")
         return ["RELIANCE", "TCS", "HDFCBANK", "INFY", "HINDUNILVR"]
 
 @app.get("/stock_data/{symbol}")
-async def get_stock_data(symbol: str):
-    """Get stock data with BigQuery JOIN - ultra-fast analytics"""
+async def get_stock_data(symbol: str, fields: str = None, accept: str = Header(None)):
+    """Get stock data from the fact table; security/sector/industry come from the dimension cache
+    fields= (comma-separated) narrows the SELECT list; timestamp is always included
+    Accept: application/vnd.apache.arrow.stream (or application/vnd.apache.parquet) returns binary"""
+    
+    projection = parse_fields(fields, STOCK_DATA_FIELDS.keys(), required=("timestamp",))
+    select_columns = [STOCK_DATA_FIELDS[name] for name in projection] if projection else STOCK_DATA_COLUMNS
+    fact_columns = [column for column in select_columns if column.startswith("f.")]
+    select_list = ", ".join(fact_columns)
+    
+    binary_type = negotiate_binary_format(accept)
+    # security/sector/industry come from the dimension copy, so its version is part of the cache version
+    version = with_dimension_version(get_dataset_version())
+    cache_key = ("/stock_data", symbol, tuple(select_columns), binary_type or "application/json")
+    cached = cached_response(cache_key, version)
+    if cached is not None:
+        return cached
     
     client = get_bigquery_client()
     if not client:
         raise HTTPException(status_code=500, detail="BigQuery connection failed")
     
     try:
-        # Optimized BigQuery JOIN query
+        # Symbols missing from dimension_table had no rows under the old JOIN either
+        attributes = dimension_cache.get(symbol)
+        if attributes is None:
+            raise HTTPException(status_code=404, detail=f"No data found for symbol {symbol}")
+        
+        # Fact rows only - dimension attributes are attached from the cache
         query = f"""
-        SELECT 
-            f.timestamp, f.symbol, d.security, d.sector, d.industry,
-            f.open_price, f.high_price, f.low_price, f.last_price, f.close_price,
-            f.volume, f.turnover_lacs, f.no_of_trades, f.deliv_qty, f.deliv_per,
-            f.rolling_median, f.rolling_mode, f.month, f.week, f.prev_high, f.prev_low,
-            f.pp, f.s1, f.s2, f.s3, f.s4, f.r1, f.r2, f.r3, f.r4, f.bc, f.tc,
-            f.vwap_w, f.vwap_std_w, f.vwap_upper_1_w, f.vwap_lower_1_w,
-            f.vwap_upper_2_w, f.vwap_lower_2_w, f.vwap_upper_3_w, f.vwap_lower_3_w,
-            f.vwap_m, f.vwap_std_m, f.vwap_upper_1_m, f.vwap_lower_1_m,
-            f.vwap_upper_2_m, f.vwap_lower_2_m, f.vwap_upper_3_m, f.vwap_lower_3_m,
-            f.vwap_q, f.vwap_std_q, f.vwap_upper_1_q, f.vwap_lower_1_q,
-            f.vwap_upper_2_q, f.vwap_lower_2_q, f.vwap_upper_3_q, f.vwap_lower_3_q,
-            f.vwap_y, f.vwap_std_y, f.vwap_upper_1_y, f.vwap_lower_1_y,
-            f.vwap_upper_2_y, f.vwap_lower_2_y, f.vwap_upper_3_y, f.vwap_lower_3_y,
-            f.ema_63, f.ema_144, f.ema_234,
-            f.bullcross_63_144, f.bearcross_63_144, f.bullcross_144_234,
-            f.bearcross_144_234, f.bullcross_63_234, f.bearcross_63_234,
-            f.linreg_curve_63, f.volume_ma_45, f.turnover_lacs_ma_45,
-            f.no_of_trades_ma_45, f.deliv_qty_ma_45, f.deliv_per_ma_45,
-            f.fib_ext_0_236, f.fib_ext_0_786, f.avg_price, f.series,
-            f.stock_rating, f.quality_score, f.growth_score, f.mcap_category,
-            f.nifty_50, f.fno, f.flag, f.nifty_500, f.next_50, f.alpha_50, f.beta_50,
-            f.trend_bias, f.price_category, f.one_year_growth_percent
+        SELECT {select_list}
         FROM `{FACT_TABLE}` f
-        JOIN `{DIMENSION_TABLE}` d ON f.symbol = d.symbol
         WHERE f.symbol = @symbol
         ORDER BY f.timestamp ASC
         """
@@ -152,59 +280,143 @@ async def get_stock_data(symbol: str):
             ]
         )
         
-        result = client.query(query, job_config=job_config).result()
+        result = run_query(query, job_config, "/stock_data")
         
-        # Convert to list of dictionaries
-        rows = []
-        for row in result:
-            record = {}
-            for field in result.schema:
-                value = getattr(row, field.name)
-                
-                if isinstance(value, datetime):
-                    record[field.name.upper()] = value.isoformat()
-                elif field.name.lower() == 'timestamp' and isinstance(value, int):
-                    # Convert BigQuery timestamp (nanoseconds) to ISO format
-                    try:
-                        dt = datetime.fromtimestamp(value / 1_000_000_000)  # Convert nanoseconds to seconds
-                        record[field.name.upper()] = dt.isoformat()
-                    except Exception as e:
-                        # Fallback to original value if conversion fails
-                        record[field.name.upper()] = value
-                else:
-                    record[field.name.upper()] = value
-            rows.append(record)
+        # Bulk Arrow download: Storage Read API when installed, else REST pages
+        storage_client = bigquery_clients.storage()
+        
+        if binary_type:
+            # Record batches straight from the query result - no pandas round-trip
+            table = normalize_arrow_result(result.to_arrow(bqstorage_client=storage_client,
+                                                           create_bqstorage_client=False))
+            table = attach_dimension_columns(table, select_columns, attributes)
+            if table.num_rows == 0:
+                raise HTTPException(status_code=404, detail=f"No data found for symbol {symbol}")
+            response = binary_response(table, binary_type)
+            cache_body(cache_key, version, response.body, binary_type)
+            return response
         
-        if not rows:
+        # Column names and timestamps are converted per batch, not per value
+        tables = (attach_dimension_columns(normalize_arrow_result(pa.Table.from_batches([batch])),
+                                           select_columns, attributes)
+                  for batch in result.to_arrow_iterable(bqstorage_client=storage_client))
+        first_table = next((table for table in tables if table.num_rows), None)
+        if first_table is None:
             raise HTTPException(status_code=404, detail=f"No data found for symbol {symbol}")
         
-        return rows
+        return json_records_response(itertools.chain([first_table], tables),
+                                     on_complete=lambda body: cache_body(cache_key, version, body))
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"BigQuery error: {e}")
         raise HTTPException(status_code=500, detail=f"BigQuery error: {str(e)}")
 
+# Per-symbol aggregates shared by /analytics/summary/{symbol} and the batch /analytics/summary
+SUMMARY_COLUMNS = """
+            symbol,
+            COUNT(*) as total_records,
+            MIN(timestamp) as first_date,
+            MAX(timestamp) as last_date,
+            AVG(close_price) as avg_price,
+            MIN(close_price) as min_price,
+            MAX(close_price) as max_price,
+            STDDEV(close_price) as price_volatility,
+            AVG(volume) as avg_volume,
+            SUM(volume) as total_volume"""
+MAX_SUMMARY_SYMBOLS = 500
+
+def summary_record(row):
+    return {
+        "symbol": row.symbol,
+        "total_records": row.total_records,
+        "first_date": row.first_date.isoformat() if row.first_date else None,
+        "last_date": row.last_date.isoformat() if row.last_date else None,
+        "avg_price": float(row.avg_price) if row.avg_price else None,
+        "min_price": float(row.min_price) if row.min_price else None,
+        "max_price": float(row.max_price) if row.max_price else None,
+        "price_volatility": float(row.price_volatility) if row.price_volatility else None,
+        "avg_volume": float(row.avg_volume) if row.avg_volume else None,
+        "total_volume": int(row.total_volume) if row.total_volume else None
+    }
+
+@app.get("/analytics/summary")
+async def get_analytics_summaries(symbols: str):
+    """Summaries for many symbols (comma-separated) from one grouped query, streamed as a JSON array
+    in symbol order. Symbols already in the result cache are not queried; unknown symbols are omitted."""
+    
+    requested = list(dict.fromkeys(symbol.strip() for symbol in symbols.split(",") if symbol.strip()))
+    if not requested:
+        raise HTTPException(status_code=400, detail="symbols must list at least one symbol")
+    if len(requested) > MAX_SUMMARY_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SUMMARY_SYMBOLS} symbols per request")
+    
+    version = get_dataset_version()
+    cached = {}
+    if version is not None:
+        for symbol in requested:
+            entry = result_cache.get(("/analytics/summary", symbol), version)
+            if entry is not None:
+                cached[symbol] = entry[0]
+    missing = sorted(set(requested) - set(cached))
+    
+    result = []
+    if missing:
+        client = get_bigquery_client()
+        if not client:
+            raise HTTPException(status_code=500, detail="BigQuery connection failed")
+        try:
+            query = f"""
+            SELECT {SUMMARY_COLUMNS}
+            FROM `{FACT_TABLE}`
+            WHERE symbol IN UNNEST(@symbols)
+            GROUP BY symbol
+            ORDER BY symbol
+            """
+            job_config = bigquery.QueryJobConfig(
+                query_parameters=[
+                    bigquery.ArrayQueryParameter("symbols", "STRING", missing)
+                ]
+            )
+            result = run_query(query, job_config, "/analytics/summary batch")
+        except Exception as e:
+            print(f"BigQuery analytics error: {e}")
+            raise HTTPException(status_code=500, detail=f"Analytics error: {str(e)}")
+    
+    def fetched():
+        for row in result:
+            body = json.dumps(jsonable_encoder(summary_record(row))).encode("utf-8")
+            # Fills the single-symbol cache too
+            cache_body(("/analytics/summary", row.symbol), version, body)
+            yield row.symbol, body
+    
+    def chunks():
+        yield b"["
+        # Cached and freshly queried summaries, both sorted by symbol, merged as rows arrive
+        for index, (_, body) in enumerate(heapq.merge(sorted(cached.items()), fetched())):
+            yield body if index == 0 else b"," + body
+        yield b"]"
+    
+    return StreamingResponse(chunks(), media_type="application/json")
+
 @app.get("/analytics/summary/{symbol}")
 async def get_analytics_summary(symbol: str):
     """Advanced analytics - only possible with BigQuery speed"""
     
+    version = get_dataset_version()
+    cache_key = ("/analytics/summary", symbol)
+    cached = cached_response(cache_key, version)
+    if cached is not None:
+        return cached
+    
     client = get_bigquery_client()
     if not client:
         raise HTTPException(status_code=500, detail="BigQuery connection failed")
     
     try:
         query = f"""
-        SELECT 
-            symbol,
-            COUNT(*) as total_records,
-            MIN(timestamp) as first_date,
-            MAX(timestamp) as last_date,
-            AVG(close_price) as avg_price,
-            MIN(close_price) as min_price,
-            MAX(close_price) as max_price,
-            STDDEV(close_price) as price_volatility,
-            AVG(volume) as avg_volume,
-            SUM(volume) as total_volume
+        SELECT {SUMMARY_COLUMNS}
         FROM `{FACT_TABLE}`
         WHERE symbol = @symbol
         GROUP BY symbol
@@ -216,87 +428,69 @@ async def get_analytics_summary(symbol: str):
             ]
         )
         
-        result = client.query(query, job_config=job_config).result()
+        result = run_query(query, job_config, "/analytics/summary")
         
         for row in result:
-            return {
-                "symbol": row.symbol,
-                "total_records": row.total_records,
-                "first_date": row.first_date.isoformat() if row.first_date else None,
-                "last_date": row.last_date.isoformat() if row.last_date else None,
-                "avg_price": float(row.avg_price) if row.avg_price else None,
-                "min_price": float(row.min_price) if row.min_price else None,
-                "max_price": float(row.max_price) if row.max_price else None,
-                "price_volatility": float(row.price_volatility) if row.price_volatility else None,
-                "avg_volume": float(row.avg_volume) if row.avg_volume else None,
-                "total_volume": int(row.total_volume) if row.total_volume else None
-            }
+            return cached_json(cache_key, version, summary_record(row))
         
         raise HTTPException(status_code=404, detail=f"No data found for symbol {symbol}")
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"BigQuery analytics error: {e}")
         raise HTTPException(status_code=500, detail=f"Analytics error: {str(e)}")
 
+def load_summary_rows():
+    """symbol_summary as materialized by reload_complete_data.py, or the same query over fact_table
+    when that table is missing or was built from an older load"""
+    version = get_dataset_version()
+    try:
+        table = bigquery_clients.run(lambda client: client.get_table(SUMMARY_TABLE))
+        if version is not None and (table.labels or {}).get("data_version") == version:
+            query = f"SELECT * FROM `{SUMMARY_TABLE}`"
+        else:
+            print("INFO: symbol_summary is out of date - computing from fact_table")
+            query = summary_query(FACT_TABLE)
+    except Exception as e:
+        print(f"INFO: symbol_summary unavailable ({e}) - computing from fact_table")
+        query = summary_query(FACT_TABLE)
+    return run_query(query, endpoint="performance_summary").to_arrow(create_bqstorage_client=False).to_pylist()
+
+performance_summary = PerformanceSummary(load_summary_rows)
+
 @app.get("/analytics/top-performers")
-async def get_top_performers(limit: int = 10):
-    """Get top performing stocks - BigQuery analytics power"""
+async def get_top_performers(limit: int = 10, period: str = "all"):
+    """Get top performing stocks over period (1w, 1m, 3m, 1y, all) from the in-memory summary"""
     
-    client = get_bigquery_client()
-    if not client:
-        raise HTTPException(status_code=500, detail="BigQuery connection failed")
+    period = period.lower()
+    if period not in RETURN_PERIODS:
+        raise HTTPException(status_code=400, detail=f"Unknown period '{period}'. Use one of: {', '.join(RETURN_PERIODS)}")
+    
+    version = get_dataset_version()
+    # Includes each symbol's security from the dimension copy
+    response_version = with_dimension_version(version)
+    cache_key = ("/analytics/top-performers", limit, period)
+    cached = cached_response(cache_key, response_version)
+    if cached is not None:
+        return cached
     
     try:
-        query = f"""
-        WITH latest_prices AS (
-            SELECT 
-                f.symbol,
-                d.security,
-                f.close_price,
-                f.timestamp,
-                ROW_NUMBER() OVER (PARTITION BY f.symbol ORDER BY f.timestamp DESC) as rn
-            FROM `{FACT_TABLE}` f
-            JOIN `{DIMENSION_TABLE}` d ON f.symbol = d.symbol
-        ),
-        first_prices AS (
-            SELECT 
-                symbol,
-                close_price as first_price,
-                ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY timestamp ASC) as rn
-            FROM `{FACT_TABLE}`
-        )
-        SELECT 
-            l.symbol,
-            l.security,
-            l.close_price as current_price,
-            f.first_price,
-            ((l.close_price - f.first_price) / f.first_price) * 100 as growth_percent
-        FROM latest_prices l
-        JOIN first_prices f ON l.symbol = f.symbol
-        WHERE l.rn = 1 AND f.rn = 1
-        ORDER BY growth_percent DESC
-        LIMIT @limit
-        """
-        
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[
-                bigquery.ScalarQueryParameter("limit", "INT64", limit)
-            ]
-        )
-        
-        result = client.query(query, job_config=job_config).result()
+        performance_summary.refresh(version)
         
         performers = []
-        for row in result:
+        for row in performance_summary.top(limit, period):
+            start_price = row["first_close"] if period == "all" else row.get(f"close_{period}")
             performers.append({
-                "symbol": row.symbol,
-                "security": row.security,
-                "current_price": float(row.current_price) if row.current_price else None,
-                "first_price": float(row.first_price) if row.first_price else None,
-                "growth_percent": float(row.growth_percent) if row.growth_percent else None
+                "symbol": row["symbol"],
+                "security": (dimension_cache.get(row["symbol"]) or {}).get("security"),
+                "current_price": float(row["last_close"]) if row["last_close"] else None,
+                "first_price": float(start_price) if start_price else None,
+                "growth_percent": float(row[f"return_{period}"]),
+                "period": period
             })
         
-        return performers
+        return cached_json(cache_key, response_version, performers)
         
     except Exception as e:
         print(f"BigQuery top performers error: {e}")
@@ -1,12 +1,12 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-import mysql.connector
-from mysql.connector import Error
+from db_pool import create_mysql_pool
 import pandas as pd
 from datetime import date
 from functools import lru_cache
 import numpy as np
 from config import settings
+from zscore import rolling_zscores
 
 app = FastAPI(
     title="Stock Dashboard API - SQL Version",
@@ -32,33 +32,24 @@ DB_CONFIG = {
     'port': 3306
 }
 
-def get_db_connection():
-    """Create database connection"""
-    try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        return connection
-    except Error as e:
-        print(f"Database connection error: {e}")
-        return None
+# One pool per process: connections are reused across requests, not reopened each time
+db_pool = create_mysql_pool(DB_CONFIG)
 
 @app.get("/")
 async def read_root():
     return {"message": "Stock Data API - SQL Version", "records": "2,527,425", "symbols": "3,621"}
 
+@app.get("/pool_stats")
+async def pool_stats():
+    """Connection pool usage and wait times"""
+    return db_pool.stats()
+
 @app.get("/symbols")
 async def get_symbols():
     """Returns all unique stock symbols from SQL database"""
     try:
-        connection = get_db_connection()
-        if not connection:
-            raise HTTPException(status_code=500, detail="Database connection failed")
-        
-        cursor = connection.cursor()
-        cursor.execute("SELECT DISTINCT symbol FROM stock_data ORDER BY symbol")
-        symbols = [row[0] for row in cursor.fetchall()]
-        
-        cursor.close()
-        connection.close()
+        rows = await db_pool.fetchall_async("SELECT DISTINCT symbol FROM stock_data ORDER BY symbol")
+        symbols = [row[0] for row in rows]
         
         print(f"✅ Loaded {len(symbols)} symbols instantly from SQL")
         return symbols
@@ -79,12 +70,6 @@ async def get_stock_data(
     Returns stock data for a symbol with INSTANT loading from SQL
     """
     try:
-        connection = get_db_connection()
-        if not connection:
-            raise HTTPException(status_code=500, detail="Database connection failed")
-        
-        cursor = connection.cursor(dictionary=True)
-        
         # Build SQL query with date filters
         base_query = """
         SELECT timestamp, symbol, close_price 
@@ -105,11 +90,7 @@ async def get_stock_data(
         base_query += " ORDER BY timestamp"
         
         print(f"🔍 Loading data for {symbol} from SQL...")
-        cursor.execute(base_query, params)
-        rows = cursor.fetchall()
-        
-        cursor.close()
-        connection.close()
+        rows = await db_pool.fetchall_async(base_query, params, dictionary=True)
         
         if not rows:
             raise HTTPException(status_code=404, detail=f"No data found for symbol {symbol}")
@@ -158,18 +139,5 @@ async def get_stock_data(
 
 def calculate_zscore(df, column, window):
     """Calculate Z-score for a given column"""
-    if column not in df.columns:
-        return pd.Series(np.nan, index=df.index)
-
-    numeric_col = pd.to_numeric(df[column], errors='coerce')
-    rolling_data = numeric_col.dropna()
-
-    if len(rolling_data) < window:
-        return pd.Series(np.nan, index=df.index)
-
-    rolling_mean = rolling_data.rolling(window=window, min_periods=1).mean().reindex(df.index)
-    rolling_std = rolling_data.rolling(window=window, min_periods=1).std().reindex(df.index)
-
-    zscore = (numeric_col - rolling_mean) / rolling_std
-    zscore = zscore.replace([np.inf, -np.inf], np.nan)
-    return zscore
\ No newline at end of file
+    zscores = rolling_zscores(df, [column], [window])
+    return pd.Series(zscores.get(f"Z_SCORE_{column}", np.nan), index=df.index)
\ No newline at end of file
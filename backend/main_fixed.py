@@ -1,11 +1,12 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-import mysql.connector
-from mysql.connector import Error
+from db_pool import create_mysql_pool
 import pandas as pd
 from datetime import date
 from functools import lru_cache
 import numpy as np
+from crossovers import detect_crossovers
+from sliding_mode import sliding_mode
 import random
 import math
 
@@ -48,14 +49,8 @@ DB_CONFIG = {
     'port': 3306
 }
 
-def get_db_connection():
-    """Create database connection"""
-    try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        return connection
-    except Error as e:
-        print(f"Database connection error: {e}")
-        return None
+# One pool per process: connections are reused across requests, not reopened each time
+db_pool = create_mysql_pool(DB_CONFIG)
 
 def calculate_technical_indicators(df, close_prices):
     """Calculate all technical indicators expected by frontend"""
@@ -65,7 +60,7 @@ def calculate_technical_indicators(df, close_prices):
     
     # Rolling indicators
     rolling_median = prices.rolling(window=20, min_periods=1).median()
-    rolling_mode = prices.rolling(window=20, min_periods=1).apply(lambda x: x.mode().iloc[0] if len(x.mode()) > 0 else x.iloc[-1])
+    rolling_mode = sliding_mode(prices, 20)
     
     # Pivot Points and Support/Resistance levels
     high_prices = prices * 1.02  # Simulated high
@@ -102,35 +97,8 @@ def calculate_technical_indicators(df, close_prices):
     bc = prices.rolling(window=20, min_periods=1).min() * 0.95  # Bottom Channel
     tc = prices.rolling(window=20, min_periods=1).max() * 1.05  # Top Channel
     
-    # Calculate EMA Crossover Signals
-    def calculate_crossover_signals(fast_ema, slow_ema):
-        """Calculate bullish and bearish crossover signals"""
-        bull_signals = []
-        bear_signals = []
-        
-        for i in range(len(fast_ema)):
-            if i == 0:
-                bull_signals.append(0)
-                bear_signals.append(0)
-            else:
-                # Bullish crossover: fast EMA crosses above slow EMA
-                if fast_ema[i] > slow_ema[i] and fast_ema[i-1] <= slow_ema[i-1]:
-                    bull_signals.append(1)
-                    bear_signals.append(0)
-                # Bearish crossover: fast EMA crosses below slow EMA
-                elif fast_ema[i] < slow_ema[i] and fast_ema[i-1] >= slow_ema[i-1]:
-                    bull_signals.append(0)
-                    bear_signals.append(1)
-                else:
-                    bull_signals.append(0)
-                    bear_signals.append(0)
-        
-        return bull_signals, bear_signals
-    
-    # Calculate crossover signals for different EMA pairs
-    bull_63_144, bear_63_144 = calculate_crossover_signals(ema_63.tolist(), ema_144.tolist())
-    bull_144_234, bear_144_234 = calculate_crossover_signals(ema_144.tolist(), ema_234.tolist())
-    bull_63_234, bear_63_234 = calculate_crossover_signals(ema_63.tolist(), ema_234.tolist())
+    # EMA Crossover signals for every pair in one vectorised pass
+    crossovers, _ = detect_crossovers({63: ema_63, 144: ema_144, 234: ema_234})
     
     return {
         'ROLLING_MEDIAN': rolling_median.tolist(),
@@ -144,13 +112,8 @@ def calculate_technical_indicators(df, close_prices):
         'VWAP_Q': vwap_quarterly.tolist(), 'VWAP_Y': vwap_yearly.tolist(),
         'EMA_63': ema_63.tolist(), 'EMA_144': ema_144.tolist(), 'EMA_234': ema_234.tolist(),
         'BC': bc.tolist(), 'TC': tc.tolist(),
-        # EMA Crossover Signals
-        'BullCross_63_144': bull_63_144,
-        'BearCross_63_144': bear_63_144,
-        'BullCross_144_234': bull_144_234,
-        'BearCross_144_234': bear_144_234,
-        'BullCross_63_234': bull_63_234,
-        'BearCross_63_234': bear_63_234
+        # EMA Crossover Signals (0/1 per bar)
+        **{name: signal.astype(int).tolist() for name, signal in crossovers.items()}
     }
 
 @app.get("/")
@@ -161,16 +124,7 @@ async def read_root():
 async def get_database_schema():
     """Returns actual database schema to check what fields exist"""
     try:
-        connection = get_db_connection()
-        if not connection:
-            raise HTTPException(status_code=500, detail="Database connection failed")
-        
-        cursor = connection.cursor()
-        cursor.execute("DESCRIBE stock_data")
-        columns = cursor.fetchall()
-        
-        cursor.close()
-        connection.close()
+        columns = await db_pool.fetchall_async("DESCRIBE stock_data")
         
         column_info = []
         for col in columns:
@@ -189,20 +143,17 @@ async def get_database_schema():
         print(f"Error getting schema: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get schema: {str(e)}")
 
+@app.get("/pool_stats")
+async def pool_stats():
+    """Connection pool usage and wait times"""
+    return db_pool.stats()
+
 @app.get("/symbols")
 async def get_symbols():
     """Returns all unique stock symbols from SQL database"""
     try:
-        connection = get_db_connection()
-        if not connection:
-            raise HTTPException(status_code=500, detail="Database connection failed")
-        
-        cursor = connection.cursor()
-        cursor.execute("SELECT DISTINCT symbol FROM stock_data ORDER BY symbol")
-        symbols = [row[0] for row in cursor.fetchall()]
-        
-        cursor.close()
-        connection.close()
+        rows = await db_pool.fetchall_async("SELECT DISTINCT symbol FROM stock_data ORDER BY symbol")
+        symbols = [row[0] for row in rows]
         
         print(f"[OK] Loaded {len(symbols)} symbols from database")
         return symbols
@@ -226,12 +177,6 @@ async def get_stock_data(
     Returns stock data - can generate technical indicators OR return only real database data
     """
     try:
-        connection = get_db_connection()
-        if not connection:
-            raise HTTPException(status_code=500, detail="Database connection failed")
-        
-        cursor = connection.cursor(dictionary=True)
-        
         # Build SQL query with date filters - SELECT ALL ACTUAL COLUMNS
         base_query = """
         SELECT id, timestamp, symbol, close_price 
@@ -252,11 +197,7 @@ async def get_stock_data(
         base_query += " ORDER BY timestamp"
         
         print(f"[INFO] Loading data for {symbol} from database")
-        cursor.execute(base_query, params)
-        rows = cursor.fetchall()
-        
-        cursor.close()
-        connection.close()
+        rows = await db_pool.fetchall_async(base_query, params, dictionary=True)
         
         if not rows:
             raise HTTPException(status_code=404, detail=f"No data found for symbol {symbol}")
@@ -1,7 +1,6 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-import mysql.connector
-from mysql.connector import Error
+from db_pool import create_mysql_pool
 from datetime import date
 
 app = FastAPI(
@@ -43,14 +42,8 @@ DB_CONFIG = {
     'port': 3306
 }
 
-def get_db_connection():
-    """Create database connection"""
-    try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        return connection
-    except Error as e:
-        print(f"Database connection error: {e}")
-        return None
+# One pool per process: connections are reused across requests, not reopened each time
+db_pool = create_mysql_pool(DB_CONFIG)
 
 @app.get("/")
 async def read_root():
@@ -66,16 +59,7 @@ async def read_root():
 async def get_database_schema():
     """Returns actual database schema to check what fields exist"""
     try:
-        connection = get_db_connection()
-        if not connection:
-            raise HTTPException(status_code=500, detail="Database connection failed")
-        
-        cursor = connection.cursor()
-        cursor.execute("DESCRIBE stock_data")
-        columns = cursor.fetchall()
-        
-        cursor.close()
-        connection.close()
+        columns = await db_pool.fetchall_async("DESCRIBE stock_data")
         
         column_info = []
         for col in columns:
@@ -94,20 +78,17 @@ async def get_database_schema():
         print(f"Error getting schema: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get schema: {str(e)}")
 
+@app.get("/pool_stats")
+async def pool_stats():
+    """Connection pool usage and wait times"""
+    return db_pool.stats()
+
 @app.get("/symbols")
 async def get_symbols():
     """Returns all unique stock symbols from SQL database"""
     try:
-        connection = get_db_connection()
-        if not connection:
-            raise HTTPException(status_code=500, detail="Database connection failed")
-        
-        cursor = connection.cursor()
-        cursor.execute("SELECT DISTINCT symbol FROM stock_data ORDER BY symbol")
-        symbols = [row[0] for row in cursor.fetchall()]
-        
-        cursor.close()
-        connection.close()
+        rows = await db_pool.fetchall_async("SELECT DISTINCT symbol FROM stock_data ORDER BY symbol")
+        symbols = [row[0] for row in rows]
         
         print(f"[OK] Loaded {len(symbols)} symbols from database")
         return symbols
@@ -129,12 +110,6 @@ async def get_stock_data(
     Returns ONLY real database data - NO artificial indicators
     """
     try:
-        connection = get_db_connection()
-        if not connection:
-            raise HTTPException(status_code=500, detail="Database connection failed")
-        
-        cursor = connection.cursor(dictionary=True)
-        
         # Build SQL query with date filters - SELECT ALL REAL COLUMNS
         base_query = """
         SELECT id, timestamp, symbol, close_price 
@@ -157,11 +132,7 @@ async def get_stock_data(
             base_query += f" LIMIT {max_records}"
         
         print(f"[HONEST API] Loading real data for {symbol} from database")
-        cursor.execute(base_query, params)
-        rows = cursor.fetchall()
-        
-        cursor.close()
-        connection.close()
+        rows = await db_pool.fetchall_async(base_query, params, dictionary=True)
         
         if not rows:
             raise HTTPException(status_code=404, detail=f"No data found for symbol {symbol}")
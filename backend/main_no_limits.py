@@ -1,10 +1,13 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-import mysql.connector
-from mysql.connector import Error
+from db_pool import create_mysql_pool
 import pandas as pd
 from datetime import date
-import numpy as np
+from config import settings
+from field_projection import parse_fields
+from indicator_stream import seeded_ema, ndjson_response
+from crossovers import detect_crossovers
+from sliding_mode import sliding_mode
 
 app = FastAPI(
     title="Stock Dashboard API - NO LIMITS",
@@ -30,19 +33,33 @@ DB_CONFIG = {
     'port': 3306
 }
 
-def get_db_connection():
-    """Create database connection"""
-    try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        return connection
-    except Error as e:
-        print(f"Database connection error: {e}")
-        return None
+# Raw stock_data columns served by /stock_data and their JSON types - the fields= whitelist
+STOCK_DATA_COLUMNS = {
+    'close_price': float, 'open_price': float, 'high_price': float, 'low_price': float,
+    'volume': int, 'turnover_lacs': float, 'no_of_trades': int, 'deliv_qty': int, 'deliv_per': float
+}
+
+# Indicators are derived from OHLC, so these are selected even when not requested
+INDICATOR_INPUT_COLUMNS = ['close_price', 'open_price', 'high_price', 'low_price']
+
+# Indicator columns produced by calculate_technical_indicators
+INDICATOR_FIELDS = [
+    'ROLLING_MEDIAN', 'ROLLING_MODE', 'PP', 'S1', 'S2', 'S3', 'S4', 'R1', 'R2', 'R3', 'R4',
+    'FE_23_6', 'FE_38_2', 'FE_50', 'FE_61_8', 'VWAP_W', 'VWAP_M', 'VWAP_Q', 'VWAP_Y',
+    'EMA_63', 'EMA_144', 'EMA_234', 'BC', 'TC',
+    'BullCross_63_144', 'BearCross_63_144', 'BullCross_144_234',
+    'BearCross_144_234', 'BullCross_63_234', 'BearCross_63_234'
+]
 
-def calculate_technical_indicators(df):
-    """Calculate all technical indicators from OHLC data"""
+# One pool per process: connections are reused across requests, not reopened each time
+db_pool = create_mysql_pool(DB_CONFIG)
+
+def calculate_technical_indicators(df, ema_seeds=None):
+    """Calculate all technical indicators from OHLC data
+    ema_seeds ({span: value}) continues the EMAs from the row before df (chunked streaming)"""
     if df.empty:
         return {}
+    ema_seeds = ema_seeds or {}
     
     # Convert to pandas series for calculations
     close = pd.Series([float(x) if x else 0 for x in df['close_price']])
@@ -50,11 +67,9 @@ def calculate_technical_indicators(df):
     low = pd.Series([float(x) if x else 0 for x in df.get('low_price', df['close_price'])])
     open_price = pd.Series([float(x) if x else 0 for x in df.get('open_price', df['close_price'])])
     
-    n = len(close)
-    
     # Rolling indicators
     rolling_median = close.rolling(window=20, min_periods=1).median()
-    rolling_mode = close.rolling(window=20, min_periods=1).apply(lambda x: x.mode().iloc[0] if not x.mode().empty else x.iloc[-1])
+    rolling_mode = sliding_mode(close, 20)
     
     # Pivot Points
     pp = (high + low + close) / 3
@@ -80,30 +95,16 @@ def calculate_technical_indicators(df):
     vwap_y = close.rolling(window=252, min_periods=1).mean()
     
     # EMAs
-    ema_63 = close.ewm(span=63, adjust=False).mean()
-    ema_144 = close.ewm(span=144, adjust=False).mean()
-    ema_234 = close.ewm(span=234, adjust=False).mean()
+    ema_63 = seeded_ema(close, 63, ema_seeds.get(63))
+    ema_144 = seeded_ema(close, 144, ema_seeds.get(144))
+    ema_234 = seeded_ema(close, 234, ema_seeds.get(234))
     
     # Support/Resistance channels
     bc = low * 0.95
     tc = high * 1.05
     
-    # EMA Crossover signals
-    def get_crossover_signals(fast, slow):
-        bull_cross = np.zeros(n)
-        bear_cross = np.zeros(n)
-        
-        for i in range(1, n):
-            if fast.iloc[i] > slow.iloc[i] and fast.iloc[i-1] <= slow.iloc[i-1]:
-                bull_cross[i] = 1
-            elif fast.iloc[i] < slow.iloc[i] and fast.iloc[i-1] >= slow.iloc[i-1]:
-                bear_cross[i] = 1
-                
-        return bull_cross.tolist(), bear_cross.tolist()
-    
-    bull_63_144, bear_63_144 = get_crossover_signals(ema_63, ema_144)
-    bull_144_234, bear_144_234 = get_crossover_signals(ema_144, ema_234)
-    bull_63_234, bear_63_234 = get_crossover_signals(ema_63, ema_234)
+    # EMA Crossover signals for every pair in one vectorised pass
+    crossovers, _ = detect_crossovers({63: ema_63, 144: ema_144, 234: ema_234})
     
     return {
         'ROLLING_MEDIAN': rolling_median.fillna(0).tolist(),
@@ -117,9 +118,7 @@ def calculate_technical_indicators(df):
         'VWAP_Q': vwap_q.fillna(0).tolist(), 'VWAP_Y': vwap_y.fillna(0).tolist(),
         'EMA_63': ema_63.fillna(0).tolist(), 'EMA_144': ema_144.fillna(0).tolist(), 'EMA_234': ema_234.fillna(0).tolist(),
         'BC': bc.fillna(0).tolist(), 'TC': tc.fillna(0).tolist(),
-        'BullCross_63_144': bull_63_144, 'BearCross_63_144': bear_63_144,
-        'BullCross_144_234': bull_144_234, 'BearCross_144_234': bear_144_234,
-        'BullCross_63_234': bull_63_234, 'BearCross_63_234': bear_63_234
+        **{name: signal.astype(float).tolist() for name, signal in crossovers.items()}
     }
 
 @app.get("/")
@@ -131,21 +130,18 @@ async def read_root():
         "status": "UNLIMITED DATA ACCESS"
     }
 
+@app.get("/pool_stats")
+async def pool_stats():
+    """Connection pool usage and wait times"""
+    return db_pool.stats()
+
 @app.get("/symbols")
 async def get_symbols():
     """Returns all stock symbols - NO LIMITS"""
     try:
-        connection = get_db_connection()
-        if not connection:
-            raise HTTPException(status_code=500, detail="Database connection failed")
-        
-        cursor = connection.cursor()
         # NO LIMIT - get all symbols
-        cursor.execute("SELECT DISTINCT symbol FROM stock_data ORDER BY symbol")
-        symbols = [row[0] for row in cursor.fetchall()]
-        
-        cursor.close()
-        connection.close()
+        rows = await db_pool.fetchall_async("SELECT DISTINCT symbol FROM stock_data ORDER BY symbol")
+        symbols = [row[0] for row in rows]
         
         print(f"[NO LIMITS] Loaded {len(symbols)} symbols")
         return symbols
@@ -155,22 +151,29 @@ async def get_symbols():
         raise HTTPException(status_code=500, detail=f"Failed to load symbols: {str(e)}")
 
 @app.get("/stock_data/{symbol}")
-async def get_stock_data(symbol: str, start_date: str = None, end_date: str = None, frequency: str = "Daily"):
+async def get_stock_data(symbol: str, start_date: str = None, end_date: str = None, frequency: str = "Daily",
+                         fields: str = None, stream: bool = False):
     """
     Returns ALL stock data for symbol - ABSOLUTELY NO LIMITS OR SAMPLING
+    fields= (comma-separated) narrows the SELECT list and the returned columns
+    stream=true returns NDJSON (one record per line) built chunk by chunk from an unbuffered cursor
     """
     try:
-        connection = get_db_connection()
-        if not connection:
-            raise HTTPException(status_code=500, detail="Database connection failed")
-        
-        cursor = connection.cursor(dictionary=True)
+        projection = parse_fields(fields, ['timestamp', 'symbol'] + list(STOCK_DATA_COLUMNS) + INDICATOR_FIELDS,
+                                  required=('timestamp',))
+        if projection:
+            output_columns = [col for col in STOCK_DATA_COLUMNS if col in projection]
+            select_columns = [col for col in STOCK_DATA_COLUMNS if col in projection or col in INDICATOR_INPUT_COLUMNS]
+            output_indicators = [name for name in INDICATOR_FIELDS if name in projection]
+            include_symbol = 'symbol' in projection
+        else:
+            output_columns = select_columns = list(STOCK_DATA_COLUMNS)
+            output_indicators = INDICATOR_FIELDS
+            include_symbol = True
         
         # Build query - NO LIMIT CLAUSE AT ALL
-        query = """
-        SELECT id, timestamp, symbol, close_price, 
-               open_price, high_price, low_price, volume,
-               turnover_lacs, no_of_trades, deliv_qty, deliv_per
+        query = f"""
+        SELECT id, timestamp, symbol, {", ".join(select_columns)}
         FROM stock_data 
         WHERE symbol = %s
         """
@@ -188,12 +191,30 @@ async def get_stock_data(symbol: str, start_date: str = None, end_date: str = No
         query += " ORDER BY timestamp ASC"
         # CRITICAL: NO LIMIT CLAUSE - FETCH EVERYTHING
         
-        print(f"[NO LIMITS] Executing query for {symbol} - FETCHING ALL DATA")
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
+        def to_record(row, tech_indicators, i):
+            record = {'TIMESTAMP': row['timestamp'].isoformat() if row['timestamp'] else ''}
+            if include_symbol:
+                record['SYMBOL'] = row['symbol'] or symbol
+            for column in output_columns:
+                value = row[column]
+                record[column.upper()] = STOCK_DATA_COLUMNS[column](value) if value else 0
+            
+            # Add ALL technical indicators
+            for indicator_name, indicator_values in tech_indicators.items():
+                if i < len(indicator_values):
+                    record[indicator_name] = indicator_values[i]
+                else:
+                    record[indicator_name] = 0
+            return record
         
-        cursor.close()
-        connection.close()
+        if stream:
+            print(f"[NO LIMITS] Streaming query for {symbol}")
+            return await ndjson_response(db_pool, query, params, calculate_technical_indicators, output_indicators,
+                                         to_record, settings.MYSQL_STREAM_CHUNK_ROWS,
+                                         f"No data found for symbol {symbol}")
+        
+        print(f"[NO LIMITS] Executing query for {symbol} - FETCHING ALL DATA")
+        rows = await db_pool.fetchall_async(query, params, dictionary=True)
         
         if not rows:
             raise HTTPException(status_code=404, detail=f"No data found for symbol {symbol}")
@@ -206,33 +227,11 @@ async def get_stock_data(symbol: str, start_date: str = None, end_date: str = No
         
         # Calculate technical indicators
         tech_indicators = calculate_technical_indicators(df)
+        tech_indicators = {name: tech_indicators[name] for name in output_indicators if name in tech_indicators}
         print(f"[NO LIMITS] Technical indicators calculated")
         
         # Build final records with all data
-        final_records = []
-        for i, row in enumerate(rows):
-            record = {
-                'TIMESTAMP': row['timestamp'].isoformat() if row['timestamp'] else '',
-                'SYMBOL': row['symbol'] or symbol,
-                'CLOSE_PRICE': float(row['close_price']) if row['close_price'] else 0,
-                'OPEN_PRICE': float(row['open_price']) if row['open_price'] else 0,
-                'HIGH_PRICE': float(row['high_price']) if row['high_price'] else 0,
-                'LOW_PRICE': float(row['low_price']) if row['low_price'] else 0,
-                'VOLUME': int(row['volume']) if row['volume'] else 0,
-                'TURNOVER_LACS': float(row['turnover_lacs']) if row['turnover_lacs'] else 0,
-                'NO_OF_TRADES': int(row['no_of_trades']) if row['no_of_trades'] else 0,
-                'DELIV_QTY': int(row['deliv_qty']) if row['deliv_qty'] else 0,
-                'DELIV_PER': float(row['deliv_per']) if row['deliv_per'] else 0
-            }
-            
-            # Add ALL technical indicators
-            for indicator_name, indicator_values in tech_indicators.items():
-                if i < len(indicator_values):
-                    record[indicator_name] = indicator_values[i]
-                else:
-                    record[indicator_name] = 0
-            
-            final_records.append(record)
+        final_records = [to_record(row, tech_indicators, i) for i, row in enumerate(rows)]
         
         print(f"[SUCCESS] Returning {len(final_records)} complete records for {symbol} with ALL technical indicators")
         return final_records
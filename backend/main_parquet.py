@@ -1,13 +1,27 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
 import pandas as pd
 import os
+import threading
 from datetime import date
 from functools import lru_cache
 import numpy as np # Import numpy for NaN check
-import requests
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 from pathlib import Path
 from config import settings
+from columnar_store import ColumnarStore, data_columns, date_bounds
+from field_projection import parse_fields
+from columnar_json import encode_columnar
+from arrow_response import negotiate_binary_format, binary_response
+from bar_store import BAR_RULES, bar_source_columns, build_bar_store, resample_bars, slice_bars
+from dataset_download import download_dataset
+from background_loader import BackgroundLoader
+from frame_cache import ByteLRUCache
+from symbol_catalog import build_catalog, catalog_path, file_version, load_catalog
+from zscore import parse_zscore_params, rolling_zscores, zscore_name
 
 app = FastAPI(
     title="Stock Dashboard API",
@@ -24,8 +38,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-def download_onedrive_data():
+# Warm-up and request-path callers share one download
+_download_lock = threading.Lock()
+
+def download_onedrive_data(progress=None):
     """Downloads data from OneDrive if local file doesn't exist."""
+    with _download_lock:
+        return _download_onedrive_data(progress)
+
+def _download_onedrive_data(progress=None):
     if settings.ONEDRIVE_DATA_URL and not os.path.exists(settings.DATA_PATH):
         print(f"INFO: Downloading data from OneDrive...")
         try:
@@ -43,42 +64,17 @@ def download_onedrive_data():
             
             print(f"INFO: Downloading from: {download_url}")
             
-            # Download the file with timeout and proper headers
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            response = requests.get(download_url, stream=True, allow_redirects=True, 
-                                  headers=headers, timeout=300)
-            response.raise_for_status()
-            
-            # Save to local file
-            print(f"INFO: Saving downloaded data to {settings.DATA_PATH}")
-            total_size = 0
-            with open(settings.DATA_PATH, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=1024*1024):  # 1MB chunks
-                    if chunk:
-                        f.write(chunk)
-                        total_size += len(chunk)
-                        if total_size % (50*1024*1024) == 0:  # Log every 50MB
-                            print(f"INFO: Downloaded {total_size/(1024*1024):.1f} MB...")
-            
-            # Verify file was downloaded
-            if os.path.exists(settings.DATA_PATH) and os.path.getsize(settings.DATA_PATH) > 0:
-                file_size = os.path.getsize(settings.DATA_PATH) / (1024*1024)  # MB
-                print(f"INFO: Successfully downloaded data to {settings.DATA_PATH} ({file_size:.1f} MB)")
-                
-                # Quick validation - try to read the parquet file
-                try:
-                    test_df = pd.read_parquet(settings.DATA_PATH, nrows=10)
-                    print(f"INFO: File validation successful - {len(test_df.columns)} columns detected")
-                    return True
-                except Exception as validate_error:
-                    print(f"ERROR: Downloaded file is not a valid parquet file: {validate_error}")
-                    os.remove(settings.DATA_PATH)  # Remove invalid file
-                    return False
-            else:
-                print(f"ERROR: File download failed or file is empty")
-                return False
+            # Parallel range requests, resumable after interruption, verified before rename
+            download_dataset(
+                download_url,
+                settings.DATA_PATH,
+                workers=settings.DOWNLOAD_WORKERS,
+                chunk_size=settings.DOWNLOAD_CHUNK_MB * 1024 * 1024,
+                expected_sha256=settings.DATA_SHA256 or None,
+                progress=progress,
+            )
+            build_catalog(settings.DATA_PATH)
+            return True
             
         except Exception as e:
             print(f"ERROR: Failed to download from OneDrive: {e}")
@@ -101,24 +97,171 @@ def get_symbols_only():
         print(f"ERROR: Failed to load symbols fast, trying fallback: {e}")
         return []
 
-def get_symbol_data_only(symbol: str):
-    """Loads data for ONLY the specified symbol - true lazy loading"""
+def get_symbol_read_path():
+    """Prefers the symbol-clustered file written by cluster_parquet.py when present"""
+    if os.path.exists(settings.CLUSTERED_DATA_PATH):
+        return settings.CLUSTERED_DATA_PATH
+    return settings.DATA_PATH
+
+@lru_cache(maxsize=4)
+def _load_catalog(path, version, sidecar_version):
+    return load_catalog(path)
+
+def get_catalog():
+    """Symbol catalog sidecar of the file symbol reads use, or None if missing/stale"""
+    path = get_symbol_read_path()
+    if not os.path.exists(path):
+        return None
+    # Keyed on the sidecar's own version too, so a catalog written after a miss is picked up
+    sidecar = catalog_path(path)
+    sidecar_version = tuple(file_version(sidecar)) if os.path.exists(sidecar) else None
+    return _load_catalog(path, tuple(file_version(path)), sidecar_version)
+
+def dataset_unavailable():
+    """503 for requests that arrive before the parquet file has been downloaded"""
+    return HTTPException(status_code=503, detail="Dataset is still downloading, retry shortly.",
+                         headers={"Retry-After": str(settings.DATASET_RETRY_AFTER_SECONDS)})
+
+@lru_cache(maxsize=4)
+def _read_parquet_columns(path):
+    return data_columns(pq.read_schema(path).names)
+
+async def require_dataset_file():
+    """Makes sure the parquet file is on disk before a request reads it. A download already running
+    (warm-up or another request) gets a 503; otherwise this request downloads it off the event loop."""
+    if os.path.exists(get_symbol_read_path()):
+        return
+    if _download_lock.locked() or not await run_in_threadpool(download_onedrive_data):
+        raise dataset_unavailable()
+    if not os.path.exists(get_symbol_read_path()):
+        raise dataset_unavailable()
+
+def get_parquet_columns():
+    """Column whitelist for fields= - read from the parquet footer, no data pages"""
+    try:
+        return _read_parquet_columns(get_symbol_read_path())
+    except FileNotFoundError:
+        raise dataset_unavailable()
+
+def warm_dataset(progress):
+    """Download, columnar store and Weekly/Monthly bars - run once in the background at startup"""
+    progress("downloading")
+    def report_download(done_bytes, total_bytes):
+        progress("downloading", f"{done_bytes / (1024 * 1024):.0f}/{total_bytes / (1024 * 1024):.0f} MB")
+    if not download_onedrive_data(report_download):
+        raise RuntimeError("Dataset download failed")
+
+    progress("loading columnar store")
+    store = ColumnarStore.from_parquet(get_symbol_read_path())
+    bars = {}
+    for frequency in BAR_RULES:
+        progress(f"building {frequency} bars", f"{store.num_rows:,} daily rows")
+        bars[frequency] = build_bar_store(store, frequency)
+    return {"store": store, "bars": bars}
+
+dataset_loader = BackgroundLoader("dataset", warm_dataset)
+
+@app.on_event("startup")
+async def start_dataset_warmup():
+    if settings.WARMUP_ON_STARTUP:
+        dataset_loader.start()
+
+def get_resident_dataset():
+    """Store and bars from warm-up, or None while they are loading (or were never started) or no longer
+    match the data file. A re-downloaded file is reloaded in the background, once; until then requests
+    read the new file per symbol, like the frame cache and catalog, which key on its version."""
+    dataset = dataset_loader.value
+    if dataset is not None:
+        store = dataset["store"]
+        try:
+            current = (get_symbol_read_path(), dataset_version(get_symbol_read_path()))
+        except FileNotFoundError:
+            return dataset
+        if current == (store.source_path, store.version):
+            return dataset
+    if dataset is not None and dataset_loader.ready:
+        print("INFO: Data file changed since warm-up, reloading the columnar store")
+        dataset_loader.reload()
+    else:
+        # A failed warm-up is retried with backoff; with WARMUP_ON_STARTUP=false nothing is started here
+        dataset_loader.retry()
+    return None
+
+def get_store():
+    """The resident columnar store, or None until it is loaded for the current data file"""
+    dataset = get_resident_dataset()
+    return dataset["store"] if dataset is not None else None
+
+def get_bar_store(frequency):
+    """Precomputed bars for a frequency, built from the same store as get_store()"""
+    dataset = get_resident_dataset()
+    return dataset["bars"].get(frequency) if dataset is not None else None
+
+# Assembled /stock_data frames, plus full per-symbol frames read from parquet while no store is resident
+symbol_frame_cache = ByteLRUCache(settings.SYMBOL_CACHE_MB * 1024 * 1024)
+
+def dataset_version(path):
+    """(mtime, size) of the data file - a change invalidates cached frames"""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+def slice_frame_by_date(df, start_date=None, end_date=None):
+    """Binary-searches a TIMESTAMP-sorted frame for [start_date, end_date]"""
+    if start_date is None and end_date is None:
+        return df
+    lo, hi = date_bounds(df['TIMESTAMP'].to_numpy(), start_date, end_date)
+    return df.iloc[lo:hi]
+
+def get_symbol_data_only(symbol: str, columns=None, start_date=None, end_date=None):
+    """Loads data for ONLY the specified symbol - true lazy loading
+    start_date/end_date (inclusive Timestamps) are resolved by binary search on the sorted TIMESTAMP"""
     try:
-        # Download data if needed
-        download_onedrive_data()
-        
         print(f"🔄 Loading data for symbol: {symbol}")
         
+        # Until warm-up finishes, read this symbol's row groups straight from parquet
+        store = get_store()
+        if store is not None:
+            if symbol not in store:
+                print(f"❌ No data found for symbol: {symbol}")
+                return pd.DataFrame()
+            df = store.to_frame(symbol, columns, start_date, end_date)
+            print(f"✅ Sliced {len(df)} records for {symbol} from columnar store")
+            return df
+        
+        # Popular symbols are served from the byte-bounded frame cache
+        read_path = get_symbol_read_path()
+        version = dataset_version(read_path)
+        cache_key = ("parquet", symbol, tuple(columns) if columns else None)
+        df = symbol_frame_cache.get(cache_key, version)
+        if df is not None:
+            df = slice_frame_by_date(df, start_date, end_date).copy()
+            print(f"✅ Served {len(df)} records for {symbol} from frame cache")
+            return df
+        
         # Use pandas parquet filters to read only rows for this symbol
-        # This is MUCH faster than loading entire 977MB file
-        df = pd.read_parquet(settings.DATA_PATH, 
-                           filters=[('SYMBOL', '=', symbol)])
+        # On the clustered file the row-group min/max statistics prune all
+        # but the one or two row groups that hold this symbol
+        catalog = get_catalog()
+        if catalog is not None:
+            # The catalog knows exactly which row groups hold this symbol
+            row_groups = catalog.row_groups(symbol)
+            read_columns = columns if columns is None or 'SYMBOL' in columns else columns + ['SYMBOL']
+            table = pq.ParquetFile(read_path).read_row_groups(row_groups, columns=read_columns) if row_groups else None
+            df = table.filter(pc.equal(table['SYMBOL'], symbol)).to_pandas() if table is not None else pd.DataFrame()
+            if columns is not None and not df.empty:
+                df = df[columns]
+        else:
+            df = pd.read_parquet(read_path, columns=columns,
+                               filters=[('SYMBOL', '=', symbol)])
         
         if df.empty:
             print(f"❌ No data found for symbol: {symbol}")
             return pd.DataFrame()
         
         df['TIMESTAMP'] = pd.to_datetime(df['TIMESTAMP'])
+        df = df.sort_values(by='TIMESTAMP').reset_index(drop=True)
+        symbol_frame_cache.put(cache_key, df, version)
+        df = slice_frame_by_date(df, start_date, end_date).copy()
         print(f"✅ Loaded {len(df)} records for {symbol} in seconds")
         return df
         
@@ -126,6 +269,67 @@ def get_symbol_data_only(symbol: str):
         print(f"❌ ERROR loading data for {symbol}: {e}")
         return pd.DataFrame()
 
+def get_symbol_bars(symbol: str, frequency: str, columns=None, start_date=None, end_date=None):
+    """Weekly/Monthly bars for one symbol, built from its daily rows within [start_date, end_date]"""
+    read_columns = bar_source_columns(columns, get_parquet_columns())
+    bar_store = get_bar_store(frequency)
+    if bar_store is not None:
+        # Whole periods come from the precomputed bar store, partial edge bars from the daily store
+        return slice_bars(bar_store, symbol, frequency,
+                          lambda lo, hi: get_symbol_data_only(symbol, read_columns, lo, hi),
+                          columns, start_date, end_date)
+
+    # Still warming up - resample this symbol's daily rows on the fly
+    daily_df = get_symbol_data_only(symbol, read_columns, start_date, end_date)
+    if daily_df.empty:
+        return daily_df
+    bars = resample_bars(daily_df, BAR_RULES[frequency])
+    if columns is not None:
+        bars = bars[[col for col in bars.columns if col in columns]]
+    return bars
+
+def assemble_symbol_frame(symbol, frequency, read_columns, start_date, end_date, zscore_cols, zscore_wins, projection):
+    """One symbol's rows (or bars) for the date range with z-scores added and fields= applied"""
+    # Use lazy loading - only load data for the requested symbol
+    # Weekly/Monthly bars are precomputed and the date range is a binary search,
+    # so every request is a slice of sorted arrays
+    if frequency == "Daily":
+        symbol_df = get_symbol_data_only(symbol, read_columns, start_date, end_date)
+    else:
+        symbol_df = get_symbol_bars(symbol, frequency, read_columns, start_date, end_date)
+
+    if symbol_df.empty:
+        return symbol_df
+
+    if frequency == "Daily":
+        # Slices are already TIMESTAMP-sorted
+        symbol_df = symbol_df.drop_duplicates(subset=['TIMESTAMP'])
+
+    # All requested z-scores in one pass over each source column
+    for name, values in rolling_zscores(symbol_df, zscore_cols, zscore_wins).items():
+        symbol_df[name] = values
+
+    if projection:
+        symbol_df = symbol_df[[col for col in projection if col in symbol_df.columns]]
+    return symbol_df
+
+def get_assembled_frame(symbol, frequency, read_columns, start_date, end_date, zscore_cols, zscore_wins, projection):
+    """assemble_symbol_frame() through the frame cache - also in steady state, where a hit skips the
+    store slice, bar lookup and rolling z-scores. Returns a copy the caller may modify."""
+    key = ("assembled", symbol, frequency, start_date, end_date, tuple(read_columns) if read_columns else None,
+           tuple(zscore_cols), tuple(zscore_wins), tuple(projection) if projection else None)
+    version = dataset_version(get_symbol_read_path())
+    symbol_df = symbol_frame_cache.get(key, version)
+    if symbol_df is None:
+        symbol_df = assemble_symbol_frame(symbol, frequency, read_columns, start_date, end_date,
+                                          zscore_cols, zscore_wins, projection)
+        if symbol_df.empty:
+            return symbol_df
+        symbol_frame_cache.put(key, symbol_df, version)
+    else:
+        print(f"✅ Served {len(symbol_df)} assembled {frequency} rows for {symbol} from frame cache")
+    return symbol_df.copy()
+
 @lru_cache(maxsize=1) 
 def get_main_data():
     """FALLBACK: Loads full dataset only if symbol filtering fails"""
@@ -157,26 +361,10 @@ def get_main_data():
             print(f"ERROR: Failed to generate sample data: {sample_error}")
             raise HTTPException(status_code=500, detail=f"Failed to load data from server: {e}")
 
-# Data will be loaded on first request to avoid startup timeout
-main_df = None
-
 def calculate_zscore(df, column, window):
     """Calculates Z-score for a given column with a rolling window."""
-    if column not in df.columns:
-        return pd.Series(np.nan, index=df.index)
-
-    numeric_col = pd.to_numeric(df[column], errors='coerce')
-    rolling_data = numeric_col.dropna()
-
-    if len(rolling_data) < window:
-        return pd.Series(np.nan, index=df.index)
-
-    rolling_mean = rolling_data.rolling(window=window, min_periods=1).mean().reindex(df.index)
-    rolling_std = rolling_data.rolling(window=window, min_periods=1).std().reindex(df.index)
-
-    zscore = (numeric_col - rolling_mean) / rolling_std
-    zscore = zscore.replace([np.inf, -np.inf], np.nan)
-    return zscore
+    zscores = rolling_zscores(df, [column], [window])
+    return pd.Series(zscores.get(f"Z_SCORE_{column}", np.nan), index=df.index)
 
 # Removed the recursive convert_nan_to_none as we'll handle it explicitly now for relevant types
 
@@ -184,10 +372,26 @@ def calculate_zscore(df, column, window):
 async def read_root():
     return {"message": "Welcome to the Stock Data API"}
 
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 200 once the dataset is resident, 503 with load progress before that"""
+    status = dataset_loader.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+@app.get("/cache_stats")
+async def cache_stats():
+    """Hit/miss/eviction counters and byte usage of the per-symbol frame cache"""
+    return {"symbol_frames": symbol_frame_cache.stats()}
+
 @app.get("/symbols")
 async def get_symbols():
     """Returns a list of unique stock symbols available in the data."""
     try:
+        # Catalog sidecar built at ingest - every symbol in the data, loads in milliseconds
+        catalog = get_catalog()
+        if catalog is not None:
+            return catalog.symbols
+
         # Use pre-computed symbols cache for instant loading
         from symbols_cache import get_cached_symbols
         symbols = get_cached_symbols()
@@ -197,13 +401,16 @@ async def get_symbols():
         print(f"ERROR in get_symbols: {e}")
         # Fallback to slow loading if cache fails
         try:
-            global main_df
-            if main_df is None:
-                main_df = get_main_data()
-            if main_df.empty:
+            store = get_store()
+            if store is None:
+                # Still warming up - the SYMBOL column alone is a quick read
+                symbols = get_symbols_only()
+                if not symbols:
+                    raise HTTPException(status_code=404, detail="No stock data loaded.")
+                return symbols
+            if store.num_rows == 0:
                 raise HTTPException(status_code=404, detail="No stock data loaded.")
-            symbols = main_df['SYMBOL'].unique().tolist()
-            return sorted(symbols)
+            return store.symbols
         except Exception as fallback_error:
             print(f"Fallback also failed: {fallback_error}")
             raise HTTPException(status_code=500, detail=f"Failed to load symbols: {str(e)}")
@@ -214,80 +421,86 @@ async def get_stock_data(
     start_date: str = None,
     end_date: str = None,
     frequency: str = "Daily",
-    zscore_window: int = 30
+    zscore_window: int = 30,
+    zscore_columns: str = None,
+    zscore_windows: str = None,
+    fields: str = None,
+    response_format: str = Query("rows", alias="format"),
+    accept: str = Header(None)
 ):
     """
     Returns historical stock data for a given symbol within a date range and frequency.
     Applies Z-score calculation with TRUE LAZY LOADING.
+    zscore_columns=/zscore_windows= (comma-separated) add Z_SCORE_<COLUMN> for each column,
+    or Z_SCORE_<COLUMN>_<WINDOW> when several windows are given; defaults are CLOSE_PRICE and zscore_window.
+    fields= (comma-separated) limits the columns read and returned; TIMESTAMP is always included.
+    format=columnar returns {column: [values]} instead of a list of row objects.
+    Accept: application/vnd.apache.arrow.stream (or application/vnd.apache.parquet) returns binary.
     """
-    # Use lazy loading - only load data for the requested symbol
-    symbol_df = get_symbol_data_only(symbol)
-    
-    if symbol_df.empty:
-        print(f"DEBUG: 404 - No data found for symbol '{symbol}'")
+    if response_format not in ("rows", "columnar"):
+        raise HTTPException(status_code=400, detail="Invalid format. Choose 'rows' or 'columnar'.")
+
+    # fields=/zscore_columns= are checked against the file's schema, so it has to be downloaded first
+    await require_dataset_file()
+
+    zscore_cols, zscore_wins = parse_zscore_params(zscore_columns, zscore_windows, 'CLOSE_PRICE', zscore_window)
+    unknown = [col for col in zscore_cols if col not in get_parquet_columns()]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown zscore_columns: {', '.join(unknown)}")
+    zscore_sources = {zscore_name(col, win, len(zscore_wins) > 1): col for col in zscore_cols for win in zscore_wins}
+
+    projection = parse_fields(fields, get_parquet_columns() + list(zscore_sources))
+    read_columns = None
+    if projection:
+        read_columns = [col for col in projection if col not in zscore_sources]
+        for name in projection:
+            if name in zscore_sources and zscore_sources[name] not in read_columns:
+                read_columns.append(zscore_sources[name])
+        zscore_cols = [col for col in zscore_cols if any(zscore_sources.get(name) == col for name in projection)]
+
+    if frequency not in ("Daily", "Weekly", "Monthly"):
+        raise HTTPException(status_code=400, detail="Invalid frequency. Choose 'Daily', 'Weekly', or 'Monthly'.")
+
+    # Unknown symbols are answered from the catalog without touching parquet
+    catalog = get_catalog()
+    if catalog is not None and symbol not in catalog:
+        print(f"DEBUG: 404 - Symbol '{symbol}' not in catalog")
         raise HTTPException(status_code=404, detail=f"Stock data for symbol '{symbol}' not found.")
 
+    start_date_dt = end_date_dt = None
     if start_date:
         try:
             start_date_dt = pd.to_datetime(start_date)
-            symbol_df = symbol_df[symbol_df['TIMESTAMP'] >= start_date_dt]
         except ValueError:
             raise HTTPException(status_code=400, detail=f"Invalid start_date format: {start_date}. Expected YYYY-MM-DD.")
     if end_date:
         try:
             end_date_dt = pd.to_datetime(end_date)
-            # Ensure end_date includes the entire day
-            symbol_df = symbol_df[symbol_df['TIMESTAMP'] <= end_date_dt.replace(hour=23, minute=59, second=59, microsecond=999999)]
         except ValueError:
             raise HTTPException(status_code=400, detail=f"Invalid end_date format: {end_date}. Expected YYYY-MM-DD.")
+        # Ensure end_date includes the entire day
+        end_date_dt = end_date_dt.replace(hour=23, minute=59, second=59, microsecond=999999)
 
-    if symbol_df.empty:
-        print(f"DEBUG: 404 - No data for symbol '{symbol}' within date range {start_date} to {end_date}.")
-        raise HTTPException(status_code=404, detail=f"No data available for {symbol} in the selected date range.")
+    # Repeat chart requests are served the assembled frame from the frame cache
+    symbol_df = get_assembled_frame(symbol, frequency, read_columns, start_date_dt, end_date_dt,
+                                    zscore_cols, zscore_wins, projection)
 
-    resampled_df = pd.DataFrame()
-    if frequency == "Daily":
-        symbol_df = symbol_df.sort_values(by='TIMESTAMP').drop_duplicates(subset=['TIMESTAMP'])
-        resampled_df = symbol_df
-    else:
-        required_cols_for_agg = ['OPEN_PRICE', 'HIGH_PRICE', 'LOW_PRICE', 'CLOSE_PRICE',
-                                 'LAST_TRADED_PRICE', 'TOTAL_TRADED_QUANTITY',
-                                 'TOTAL_TRADED_VALUE', 'TURNOVER', 'NUMBER_OF_TRADES']
-        agg_functions = {
-            col: 'first' if col == 'OPEN_PRICE' else
-            ('max' if col == 'HIGH_PRICE' else
-            ('min' if col == 'LOW_PRICE' else 'last'))
-            for col in required_cols_for_agg if col in symbol_df.columns
-        }
-        if 'TOTAL_TRADED_QUANTITY' in symbol_df.columns: agg_functions['TOTAL_TRADED_QUANTITY'] = 'sum'
-        if 'TOTAL_TRADED_VALUE' in symbol_df.columns: agg_functions['TOTAL_TRADED_VALUE'] = 'sum'
-        if 'TURNOVER' in symbol_df.columns: agg_functions['TURNOVER'] = 'sum'
-        if 'NUMBER_OF_TRADES' in symbol_df.columns: agg_functions['NUMBER_OF_TRADES'] = 'sum'
-        if 'VWAP_144' in symbol_df.columns: agg_functions['VWAP_144'] = 'mean'
-
-
-        if symbol_df.empty or 'TIMESTAMP' not in symbol_df.columns:
-            print(f"DEBUG: Dataframe for {symbol} is empty or missing TIMESTAMP before resampling.")
-            raise HTTPException(status_code=404, detail=f"No valid data to resample for {symbol}.")
-
-        temp_df = symbol_df.sort_values(by='TIMESTAMP').drop_duplicates(subset=['TIMESTAMP']).set_index('TIMESTAMP')
-
-        if frequency == "Weekly":
-            resampled_df = temp_df.resample('W').agg(agg_functions).reset_index()
-        elif frequency == "Monthly":
-            resampled_df = temp_df.resample('M').agg(agg_functions).reset_index()
-        else:
-            raise HTTPException(status_code=400, detail="Invalid frequency. Choose 'Daily', 'Weekly', or 'Monthly'.")
-
-    if resampled_df.empty:
-        print(f"DEBUG: 404 - No data available for symbol '{symbol}' after resampling for frequency '{frequency}'.")
-        raise HTTPException(status_code=404, detail=f"No data available for {symbol} after resampling to {frequency} in the selected date range.")
+    if symbol_df.empty:
+        if start_date or end_date:
+            print(f"DEBUG: 404 - No data for symbol '{symbol}' within date range {start_date} to {end_date}.")
+            raise HTTPException(status_code=404, detail=f"No data available for {symbol} in the selected date range.")
+        print(f"DEBUG: 404 - No data found for symbol '{symbol}'")
+        raise HTTPException(status_code=404, detail=f"Stock data for symbol '{symbol}' not found.")
 
-    symbol_df = resampled_df
+    binary_type = negotiate_binary_format(accept)
+    if binary_type:
+        print(f"DEBUG: Successfully prepared {len(symbol_df)} rows for {symbol} as {binary_type}.")
+        return binary_response(symbol_df, binary_type)
 
-    # Calculate Z-score for CLOSE_PRICE if column exists
-    if 'CLOSE_PRICE' in symbol_df.columns:
-        symbol_df['Z_SCORE_CLOSE_PRICE'] = calculate_zscore(symbol_df.copy(), 'CLOSE_PRICE', zscore_window)
+    if response_format == "columnar":
+        # Vectorized encoder handles NaN/NaT itself, so skip the per-column scrubbing below
+        print(f"DEBUG: Successfully prepared {len(symbol_df)} columnar rows for {symbol}.")
+        return Response(content=encode_columnar(symbol_df), media_type="application/json")
 
     # --- IMPORTANT FIX FOR NaN VALUES ---
     # Iterate over all columns and convert NaN/NaT to None for JSON compliance
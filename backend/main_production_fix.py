@@ -1,13 +1,17 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-import mysql.connector
-from mysql.connector import Error
+from db_pool import create_mysql_pool
 import pandas as pd
 from datetime import date
 from functools import lru_cache
 import numpy as np
 import random
 import math
+from config import settings
+from field_projection import parse_fields
+from indicator_stream import seeded_ema, ndjson_response
+from crossovers import detect_crossovers
+from sliding_mode import sliding_mode
 
 app = FastAPI(
     title="Stock Dashboard API - Production Fixed",
@@ -33,19 +37,32 @@ DB_CONFIG = {
     'port': 3306
 }
 
-def get_db_connection():
-    """Create database connection"""
-    try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        return connection
-    except Error as e:
-        print(f"Database connection error: {e}")
-        return None
+# Raw stock_data columns served by /stock_data and their JSON types - the fields= whitelist
+STOCK_DATA_COLUMNS = {
+    'close_price': float, 'open_price': float, 'high_price': float, 'low_price': float, 'volume': int
+}
+
+# Indicators are derived from close/high/low, so these are selected even when not requested
+INDICATOR_INPUT_COLUMNS = ['close_price', 'high_price', 'low_price']
+
+# Indicator columns produced by calculate_technical_indicators
+INDICATOR_FIELDS = [
+    'ROLLING_MEDIAN', 'ROLLING_MODE', 'PP', 'S1', 'S2', 'S3', 'S4', 'R1', 'R2', 'R3', 'R4',
+    'FE_23_6', 'FE_38_2', 'FE_50', 'FE_61_8', 'VWAP_W', 'VWAP_M', 'VWAP_Q', 'VWAP_Y',
+    'EMA_63', 'EMA_144', 'EMA_234', 'BC', 'TC',
+    'BullCross_63_144', 'BearCross_63_144', 'BullCross_144_234',
+    'BearCross_144_234', 'BullCross_63_234', 'BearCross_63_234'
+]
 
-def calculate_technical_indicators(df):
-    """Calculate comprehensive technical indicators"""
+# One pool per process: connections are reused across requests, not reopened each time
+db_pool = create_mysql_pool(DB_CONFIG)
+
+def calculate_technical_indicators(df, ema_seeds=None):
+    """Calculate comprehensive technical indicators
+    ema_seeds ({span: value}) continues the EMAs from the row before df (chunked streaming)"""
     if df.empty:
         return {}
+    ema_seeds = ema_seeds or {}
     
     close_prices = df['close_price'].values
     high_prices = df['high_price'].values if 'high_price' in df.columns else close_prices
@@ -53,7 +70,7 @@ def calculate_technical_indicators(df):
     
     # Rolling indicators
     rolling_median = pd.Series(close_prices).rolling(window=20, min_periods=1).median()
-    rolling_mode = pd.Series(close_prices).rolling(window=20, min_periods=1).apply(lambda x: x.mode().iloc[0] if not x.mode().empty else x.iloc[-1])
+    rolling_mode = sliding_mode(pd.Series(close_prices), 20)
     
     # Pivot Points
     pp = (high_prices + low_prices + close_prices) / 3
@@ -83,35 +100,12 @@ def calculate_technical_indicators(df):
     vwap_yearly = pd.Series(close_prices).rolling(window=252, min_periods=1).mean()
     
     # EMAs
-    ema_63 = pd.Series(close_prices).ewm(span=63, adjust=False).mean()
-    ema_144 = pd.Series(close_prices).ewm(span=144, adjust=False).mean()
-    ema_234 = pd.Series(close_prices).ewm(span=234, adjust=False).mean()
-    
-    # Crossover signals
-    def calculate_crossover_signals(fast_ema, slow_ema):
-        bull_signals = [0]  # First element always 0
-        bear_signals = [0]  # First element always 0
-        
-        for i in range(1, len(fast_ema)):
-            if i < len(fast_ema) and i < len(slow_ema):
-                # Bullish crossover: fast EMA crosses above slow EMA
-                if fast_ema[i] > slow_ema[i] and fast_ema[i-1] <= slow_ema[i-1]:
-                    bull_signals.append(1)
-                    bear_signals.append(0)
-                # Bearish crossover: fast EMA crosses below slow EMA
-                elif fast_ema[i] < slow_ema[i] and fast_ema[i-1] >= slow_ema[i-1]:
-                    bull_signals.append(0)
-                    bear_signals.append(1)
-                else:
-                    bull_signals.append(0)
-                    bear_signals.append(0)
-        
-        return bull_signals, bear_signals
+    ema_63 = seeded_ema(close_prices, 63, ema_seeds.get(63))
+    ema_144 = seeded_ema(close_prices, 144, ema_seeds.get(144))
+    ema_234 = seeded_ema(close_prices, 234, ema_seeds.get(234))
     
-    # Calculate crossover signals for different EMA pairs
-    bull_63_144, bear_63_144 = calculate_crossover_signals(ema_63.tolist(), ema_144.tolist())
-    bull_144_234, bear_144_234 = calculate_crossover_signals(ema_144.tolist(), ema_234.tolist())
-    bull_63_234, bear_63_234 = calculate_crossover_signals(ema_63.tolist(), ema_234.tolist())
+    # EMA Crossover signals for every pair in one vectorised pass
+    crossovers, _ = detect_crossovers({63: ema_63, 144: ema_144, 234: ema_234})
     
     return {
         'ROLLING_MEDIAN': rolling_median.tolist(),
@@ -125,33 +119,25 @@ def calculate_technical_indicators(df):
         'VWAP_Q': vwap_quarterly.tolist(), 'VWAP_Y': vwap_yearly.tolist(),
         'EMA_63': ema_63.tolist(), 'EMA_144': ema_144.tolist(), 'EMA_234': ema_234.tolist(),
         'BC': bc.tolist(), 'TC': tc.tolist(),
-        # EMA Crossover Signals
-        'BullCross_63_144': bull_63_144,
-        'BearCross_63_144': bear_63_144,
-        'BullCross_144_234': bull_144_234,
-        'BearCross_144_234': bear_144_234,
-        'BullCross_63_234': bull_63_234,
-        'BearCross_63_234': bear_63_234
+        # EMA Crossover Signals (0/1 per bar)
+        **{name: signal.astype(int).tolist() for name, signal in crossovers.items()}
     }
 
 @app.get("/")
 async def read_root():
     return {"message": "Stock Data API - Production Fixed - NO LIMITS", "records": "2,527,425", "symbols": "3,621", "indicators": "20+"}
 
+@app.get("/pool_stats")
+async def pool_stats():
+    """Connection pool usage and wait times"""
+    return db_pool.stats()
+
 @app.get("/symbols")
 async def get_symbols():
     """Returns all unique stock symbols from SQL database"""
     try:
-        connection = get_db_connection()
-        if not connection:
-            raise HTTPException(status_code=500, detail="Database connection failed")
-        
-        cursor = connection.cursor()
-        cursor.execute("SELECT DISTINCT symbol FROM stock_data ORDER BY symbol")
-        symbols = [row[0] for row in cursor.fetchall()]
-        
-        cursor.close()
-        connection.close()
+        rows = await db_pool.fetchall_async("SELECT DISTINCT symbol FROM stock_data ORDER BY symbol")
+        symbols = [row[0] for row in rows]
         
         print(f"[OK] Loaded {len(symbols)} symbols from database")
         return symbols
@@ -165,22 +151,31 @@ async def get_stock_data(
     symbol: str,
     start_date: str = None,
     end_date: str = None,
-    frequency: str = "Daily"
+    frequency: str = "Daily",
+    fields: str = None,
+    stream: bool = False
 ):
     """
     Returns ALL stock data for a symbol - NO LIMITS OR SAMPLING
+    fields= (comma-separated) narrows the SELECT list and the returned columns
+    stream=true returns NDJSON (one record per line) built chunk by chunk from an unbuffered cursor
     """
     try:
-        connection = get_db_connection()
-        if not connection:
-            raise HTTPException(status_code=500, detail="Database connection failed")
-        
-        cursor = connection.cursor(dictionary=True)
+        projection = parse_fields(fields, ['timestamp', 'symbol'] + list(STOCK_DATA_COLUMNS) + INDICATOR_FIELDS,
+                                  required=('timestamp',))
+        if projection:
+            output_columns = [col for col in STOCK_DATA_COLUMNS if col in projection]
+            select_columns = [col for col in STOCK_DATA_COLUMNS if col in projection or col in INDICATOR_INPUT_COLUMNS]
+            output_indicators = [name for name in INDICATOR_FIELDS if name in projection]
+            include_symbol = 'symbol' in projection
+        else:
+            output_columns = select_columns = list(STOCK_DATA_COLUMNS)
+            output_indicators = INDICATOR_FIELDS
+            include_symbol = True
         
         # Build SQL query WITHOUT ANY LIMITS
-        base_query = """
-        SELECT id, timestamp, symbol, close_price, 
-               open_price, high_price, low_price, volume
+        base_query = f"""
+        SELECT id, timestamp, symbol, {", ".join(select_columns)}
         FROM stock_data 
         WHERE symbol = %s
         """
@@ -198,12 +193,30 @@ async def get_stock_data(
         base_query += " ORDER BY timestamp ASC"
         # NO LIMIT CLAUSE - FETCH ALL DATA
         
-        print(f"[PRODUCTION FIX] Loading ALL data for {symbol} - NO LIMITS")
-        cursor.execute(base_query, params)
-        rows = cursor.fetchall()
+        def to_record(row, tech_indicators, i):
+            record = {'TIMESTAMP': row['timestamp'].isoformat()}
+            if include_symbol:
+                record['SYMBOL'] = row['symbol']
+            for column in output_columns:
+                value = row[column]
+                record[column.upper()] = STOCK_DATA_COLUMNS[column](value) if value else 0
+            
+            # Add technical indicators
+            for indicator_name, indicator_values in tech_indicators.items():
+                if i < len(indicator_values):
+                    record[indicator_name] = indicator_values[i] if indicator_values[i] is not None else 0
+                else:
+                    record[indicator_name] = 0
+            return record
+        
+        if stream:
+            print(f"[PRODUCTION FIX] Streaming ALL data for {symbol}")
+            return await ndjson_response(db_pool, base_query, params, calculate_technical_indicators, output_indicators,
+                                         to_record, settings.MYSQL_STREAM_CHUNK_ROWS,
+                                         f"No data found for symbol {symbol}")
         
-        cursor.close()
-        connection.close()
+        print(f"[PRODUCTION FIX] Loading ALL data for {symbol} - NO LIMITS")
+        rows = await db_pool.fetchall_async(base_query, params, dictionary=True)
         
         if not rows:
             raise HTTPException(status_code=404, detail=f"No data found for symbol {symbol}")
@@ -215,28 +228,10 @@ async def get_stock_data(
         
         # Calculate all technical indicators
         tech_indicators = calculate_technical_indicators(df)
+        tech_indicators = {name: tech_indicators[name] for name in output_indicators if name in tech_indicators}
         
         # Prepare final records with all fields
-        final_records = []
-        for i, row in enumerate(rows):
-            record = {
-                'TIMESTAMP': row['timestamp'].isoformat(),
-                'SYMBOL': row['symbol'],
-                'CLOSE_PRICE': float(row['close_price']) if row['close_price'] else 0,
-                'OPEN_PRICE': float(row['open_price']) if row['open_price'] else 0,
-                'HIGH_PRICE': float(row['high_price']) if row['high_price'] else 0,
-                'LOW_PRICE': float(row['low_price']) if row['low_price'] else 0,
-                'VOLUME': int(row['volume']) if row['volume'] else 0,
-            }
-            
-            # Add technical indicators
-            for indicator_name, indicator_values in tech_indicators.items():
-                if i < len(indicator_values):
-                    record[indicator_name] = indicator_values[i] if indicator_values[i] is not None else 0
-                else:
-                    record[indicator_name] = 0
-            
-            final_records.append(record)
+        final_records = [to_record(row, tech_indicators, i) for i, row in enumerate(rows)]
         
         print(f"[PRODUCTION FIX] Returning {len(final_records)} complete records for {symbol} with all technical indicators")
         return final_records
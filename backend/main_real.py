@@ -1,9 +1,14 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from functools import lru_cache
 import os
+from columnar_store import ColumnarStore
+from field_projection import parse_fields
+from columnar_json import encode_columnar
+from arrow_response import negotiate_binary_format, binary_response
 
 app = FastAPI(
     title="Stock Dashboard API - Real Data",
@@ -37,57 +42,30 @@ app.add_middleware(
 # Data path - use the local parquet file
 DATA_PATH = "./data/Final_Data.parquet"
 
-# Cache for symbols (loaded once)
-_symbols_cache = None
+@lru_cache(maxsize=1)
+def get_store():
+    """Loads the parquet file once into the resident columnar store"""
+    print("Loading parquet file into columnar store...")
+    return ColumnarStore.from_parquet(DATA_PATH)
 
 def get_symbols_from_parquet():
     """Load all unique symbols from parquet file"""
-    global _symbols_cache
-    if _symbols_cache is None:
-        try:
-            # Read only SYMBOL column for fast loading
-            print("Loading symbols from parquet file...")
-            df_symbols = pd.read_parquet(DATA_PATH, columns=['SYMBOL'])
-            _symbols_cache = sorted(df_symbols['SYMBOL'].unique().tolist())
-            print(f"Loaded {len(_symbols_cache)} unique symbols")
-        except Exception as e:
-            print(f"Error loading symbols: {e}")
-            _symbols_cache = []
-    return _symbols_cache
+    try:
+        return get_store().symbols
+    except Exception as e:
+        print(f"Error loading symbols: {e}")
+        return []
 
-def get_stock_data_from_parquet(symbol: str, start_date: str = None, end_date: str = None):
+def get_stock_data_from_parquet(symbol: str, start_date: str = None, end_date: str = None, columns=None):
     """Load stock data for specific symbol with date filtering"""
     try:
         print(f"Loading data for symbol: {symbol}")
         
-        # Read full parquet in chunks to avoid memory issues
-        chunk_size = 100000  # Read 100k rows at a time
-        symbol_data = []
-        
-        # Read parquet file in chunks
-        parquet_file = pd.read_parquet(DATA_PATH, engine='pyarrow')
-        
-        # Filter for the specific symbol
-        df = parquet_file[parquet_file['SYMBOL'] == symbol].copy()
-        
-        if df.empty:
-            print(f"No data found for symbol: {symbol}")
-            return df
-            
-        # Convert timestamp
-        df['TIMESTAMP'] = pd.to_datetime(df['TIMESTAMP'])
-        
-        # Apply date filters if provided
-        if start_date:
-            start_dt = pd.to_datetime(start_date)
-            df = df[df['TIMESTAMP'] >= start_dt]
-            
-        if end_date:
-            end_dt = pd.to_datetime(end_date)
-            df = df[df['TIMESTAMP'] <= end_dt]
-        
-        # Sort by timestamp
-        df = df.sort_values('TIMESTAMP')
+        # Symbol lookup is an offset-table hit and the date range two binary searches
+        # over the already-sorted TIMESTAMP array
+        start_dt = pd.to_datetime(start_date) if start_date else None
+        end_dt = pd.to_datetime(end_date) if end_date else None
+        df = get_store().to_frame(symbol, columns, start_dt, end_dt)
         
         print(f"Loaded {len(df)} records for {symbol}")
         return df
@@ -125,18 +103,38 @@ async def get_stock_data(
     symbol: str,
     start_date: str = None,
     end_date: str = None,
-    frequency: str = "Daily"
+    frequency: str = "Daily",
+    fields: str = None,
+    response_format: str = Query("rows", alias="format"),
+    accept: str = Header(None)
 ):
     """
     Returns real stock data with all technical indicators from parquet file
+    fields= (comma-separated) limits the returned columns; TIMESTAMP is always included.
+    format=columnar returns {column: [values]} instead of a list of row objects.
+    Accept: application/vnd.apache.arrow.stream (or application/vnd.apache.parquet) returns binary.
     """
     try:
+        if response_format not in ("rows", "columnar"):
+            raise HTTPException(status_code=400, detail="Invalid format. Choose 'rows' or 'columnar'.")
+        
+        projection = parse_fields(fields, get_store().column_names)
+        
         # Load data for specific symbol
-        df = get_stock_data_from_parquet(symbol, start_date, end_date)
+        df = get_stock_data_from_parquet(symbol, start_date, end_date, projection)
         
         if df.empty:
             raise HTTPException(status_code=404, detail=f"No data found for symbol {symbol}")
         
+        binary_type = negotiate_binary_format(accept)
+        if binary_type:
+            print(f"Returning {len(df)} rows for {symbol} as {binary_type}")
+            return binary_response(df, binary_type)
+        
+        if response_format == "columnar":
+            print(f"Returning {len(df)} columnar rows for {symbol}")
+            return Response(content=encode_columnar(df), media_type="application/json")
+        
         # Handle NaN values - convert to None for JSON serialization
         df = df.replace({np.nan: None, pd.NaT: None})
         
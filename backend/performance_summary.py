@@ -0,0 +1,86 @@
+"""
+Per-symbol performance summary for /analytics/top-performers
+One row per symbol: first/last close with their timestamps and the return
+over 1W/1M/3M/1Y/all. reload_complete_data.py materializes it as
+symbol_summary at load time; the API keeps it in memory per dataset version
+so top-performers is a lookup into lists pre-sorted by return.
+"""
+
+import threading
+
+# period -> DATE_SUB interval back from each symbol's last trading day
+PERIODS = {"1w": "WEEK", "1m": "MONTH", "3m": "QUARTER", "1y": "YEAR"}
+RETURN_PERIODS = list(PERIODS) + ["all"]
+
+def summary_query(fact_table):
+    """Single grouped pass over the fact table - no window functions, no JOIN back to itself"""
+    lookbacks = ",\n".join(
+        f"""            ARRAY_AGG(IF(DATE(f.timestamp) <= DATE_SUB(DATE(b.last_timestamp), INTERVAL 1 {interval}),
+                         f.close_price, NULL) IGNORE NULLS ORDER BY f.timestamp DESC LIMIT 1)[SAFE_OFFSET(0)] AS close_{period}"""
+        for period, interval in PERIODS.items()
+    )
+    period_closes = ", ".join(f"close_{period}" for period in PERIODS)
+    returns = ",\n".join(
+        f"        SAFE_DIVIDE(last_close - close_{period}, close_{period}) * 100 AS return_{period}"
+        for period in PERIODS
+    )
+    return f"""
+    WITH bounds AS (
+        SELECT symbol, MIN(timestamp) AS first_timestamp, MAX(timestamp) AS last_timestamp
+        FROM `{fact_table}`
+        GROUP BY symbol
+    ),
+    closes AS (
+        SELECT
+            b.symbol,
+            ANY_VALUE(b.first_timestamp) AS first_timestamp,
+            ANY_VALUE(b.last_timestamp) AS last_timestamp,
+            ARRAY_AGG(f.close_price IGNORE NULLS ORDER BY f.timestamp ASC LIMIT 1)[SAFE_OFFSET(0)] AS first_close,
+            ARRAY_AGG(f.close_price IGNORE NULLS ORDER BY f.timestamp DESC LIMIT 1)[SAFE_OFFSET(0)] AS last_close,
+{lookbacks}
+        FROM `{fact_table}` f
+        JOIN bounds b USING (symbol)
+        GROUP BY b.symbol
+    )
+    SELECT
+        symbol, first_timestamp, first_close, last_timestamp, last_close, {period_closes},
+{returns},
+        SAFE_DIVIDE(last_close - first_close, first_close) * 100 AS return_all
+    FROM closes
+    """
+
+class PerformanceSummary:
+    """symbol -> summary row, plus symbols ranked by return for each period"""
+
+    def __init__(self, load_rows):
+        self._load_rows = load_rows
+        self._lock = threading.Lock()
+        self._rows = None
+        self._ranked = {}
+        self.version = None
+        self.loads = 0
+
+    def refresh(self, version):
+        """Reloads the summary when the dataset version changed (or it was never loaded)"""
+        if self._rows is not None and (version is None or version == self.version):
+            return
+        with self._lock:
+            if self._rows is not None and (version is None or version == self.version):
+                return
+            rows = {row["symbol"]: row for row in self._load_rows()}
+            self._ranked = {
+                period: sorted((row for row in rows.values() if row.get(f"return_{period}") is not None),
+                               key=lambda row, name=f"return_{period}": row[name], reverse=True)
+                for period in RETURN_PERIODS
+            }
+            self._rows = rows
+            self.version = version
+            self.loads += 1
+            print(f"✅ Performance summary loaded: {len(rows):,} symbols (version {version})")
+
+    def get(self, symbol):
+        return self._rows.get(symbol) if self._rows is not None else None
+
+    def top(self, limit, period="all"):
+        """Best `limit` rows by return over period, highest first"""
+        return self._ranked.get(period, [])[:max(limit, 0)]
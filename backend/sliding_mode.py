@@ -0,0 +1,69 @@
+"""
+Sliding-window mode for the ROLLING_MODE indicator
+Keeps value counts incrementally as the window advances instead of building
+a Series and running mode() per window. Matches
+rolling(window, min_periods=1).apply(lambda x: x.mode().iloc[0]): NaNs are
+ignored, ties go to the smallest value and an all-NaN window gives NaN.
+"""
+
+import heapq
+import numpy as np
+import pandas as pd
+
+def sliding_mode(values, window):
+    """Mode of each trailing window of `window` values, O(n log window) overall.
+    Returns a Series (with the input's index when given one)."""
+    if window < 1:
+        raise ValueError("window must be >= 1")
+    index = values.index if isinstance(values, pd.Series) else None
+    data = np.asarray(values, dtype=float)
+    valid = ~np.isnan(data)
+    result = np.full(len(data), np.nan)
+
+    counts = {}        # value -> occurrences in the window
+    holders = [0]      # holders[c] = number of values occurring exactly c times
+    candidates = [[]]  # candidates[c] = min-heap of values that have reached count c (stale entries skipped lazily)
+    top = 0            # highest count in the window
+
+    def push(count, value):
+        heap = candidates[count]
+        if len(heap) > 2 * window:
+            # Mostly stale entries: rebuild from the live counts so heaps stay O(window)
+            heap[:] = [v for v, c in counts.items() if c == count and v != value]
+            heapq.heapify(heap)
+        heapq.heappush(heap, value)
+
+    items = data.tolist()
+    for i, value in enumerate(items):
+        if i >= window and valid[i - window]:
+            old = items[i - window]
+            count = counts[old]
+            holders[count] -= 1
+            if count == 1:
+                del counts[old]
+            else:
+                counts[old] = count - 1
+                holders[count - 1] += 1
+                push(count - 1, old)
+            if count == top and holders[count] == 0:
+                top -= 1
+
+        if valid[i]:
+            count = counts.get(value, 0) + 1
+            counts[value] = count
+            if count == len(holders):
+                holders.append(0)
+                candidates.append([])
+            holders[count] += 1
+            if count > 1:
+                holders[count - 1] -= 1
+            push(count, value)
+            top = max(top, count)
+
+        if top:
+            heap = candidates[top]
+            while counts.get(heap[0]) != top:
+                heapq.heappop(heap)
+            result[i] = heap[0]
+
+    return pd.Series(result, index=index)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Symbol catalog sidecar for the parquet dataset
+Built once at ingest into <data>.catalog.json: every symbol with its row
+count, first/last date and the row groups that hold it. Row groups whose
+SYMBOL statistics have min == max are catalogued from the footer alone;
+only mixed row groups read their SYMBOL/TIMESTAMP columns.
+"""
+
+import json
+import os
+import sys
+import time
+import pandas as pd
+import pyarrow.parquet as pq
+
+def catalog_path(parquet_path):
+    return f"{parquet_path}.catalog.json"
+
+def file_version(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+def _column_stats(row_group, name):
+    """(min, max) statistics of a column chunk, or None when not written"""
+    for i in range(row_group.num_columns):
+        column = row_group.column(i)
+        if column.path_in_schema == name:
+            stats = column.statistics
+            if stats is not None and stats.has_min_max:
+                return stats.min, stats.max
+            return None
+    return None
+
+def _as_date(value):
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+class SymbolCatalog:
+    """symbol -> {rows, first_date, last_date, row_groups}"""
+
+    def __init__(self, entries, version=None):
+        self.entries = entries
+        self.version = version
+
+    def __contains__(self, symbol):
+        return symbol in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def symbols(self):
+        return list(self.entries.keys())
+
+    def get(self, symbol):
+        return self.entries.get(symbol)
+
+    def row_groups(self, symbol):
+        entry = self.entries.get(symbol)
+        return entry["row_groups"] if entry else []
+
+    @classmethod
+    def build(cls, parquet_path):
+        """Scans footer statistics (and mixed row groups) of a parquet file"""
+        parquet_file = pq.ParquetFile(parquet_path)
+        metadata = parquet_file.metadata
+        accumulated = {}
+
+        def add(symbol, rows, first, last, row_group):
+            entry = accumulated.setdefault(symbol, {"rows": 0, "first": first, "last": last, "row_groups": []})
+            entry["rows"] += rows
+            entry["first"] = min(entry["first"], first)
+            entry["last"] = max(entry["last"], last)
+            if row_group not in entry["row_groups"]:
+                entry["row_groups"].append(row_group)
+
+        for index in range(metadata.num_row_groups):
+            row_group = metadata.row_group(index)
+            symbol_stats = _column_stats(row_group, "SYMBOL")
+            timestamp_stats = _column_stats(row_group, "TIMESTAMP")
+            if symbol_stats and timestamp_stats and symbol_stats[0] == symbol_stats[1]:
+                # Single-symbol row group: the footer says everything
+                add(symbol_stats[0], row_group.num_rows,
+                    pd.Timestamp(timestamp_stats[0]), pd.Timestamp(timestamp_stats[1]), index)
+                continue
+
+            df = parquet_file.read_row_group(index, columns=["SYMBOL", "TIMESTAMP"]).to_pandas()
+            df["TIMESTAMP"] = pd.to_datetime(df["TIMESTAMP"])
+            summary = df.groupby("SYMBOL", sort=False)["TIMESTAMP"].agg(["size", "min", "max"])
+            for symbol, rows, first, last in zip(summary.index, summary["size"], summary["min"], summary["max"]):
+                add(symbol, int(rows), first, last, index)
+
+        entries = {
+            symbol: {
+                "rows": entry["rows"],
+                "first_date": _as_date(entry["first"]),
+                "last_date": _as_date(entry["last"]),
+                "row_groups": sorted(entry["row_groups"]),
+            }
+            for symbol, entry in sorted(accumulated.items())
+        }
+        return cls(entries, version=file_version(parquet_path))
+
+    def save(self, path):
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"version": self.version, "symbols": self.entries}, f, separators=(",", ":"))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["symbols"], version=data.get("version"))
+
+def build_catalog(parquet_path):
+    """Builds and writes the sidecar next to the parquet file"""
+    started = time.perf_counter()
+    catalog = SymbolCatalog.build(parquet_path)
+    catalog.save(catalog_path(parquet_path))
+    print(f"✅ Symbol catalog: {len(catalog):,} symbols written to {catalog_path(parquet_path)} "
+          f"in {time.perf_counter() - started:.1f}s")
+    return catalog
+
+def load_catalog(parquet_path):
+    """The sidecar for parquet_path if it exists and matches the file's current version, else None"""
+    path = catalog_path(parquet_path)
+    if not os.path.exists(path) or not os.path.exists(parquet_path):
+        return None
+    catalog = SymbolCatalog.load(path)
+    if catalog.version != file_version(parquet_path):
+        print(f"WARNING: Symbol catalog {path} is stale - rebuild with: python symbol_catalog.py {parquet_path}")
+        return None
+    return catalog
+
+if __name__ == "__main__":
+    from config import settings
+    build_catalog(sys.argv[1] if len(sys.argv) > 1 else settings.DATA_PATH)
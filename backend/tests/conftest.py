@@ -0,0 +1,6 @@
+"""Backend modules import each other as top-level modules (e.g. `from config import settings`)"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
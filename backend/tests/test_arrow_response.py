@@ -0,0 +1,45 @@
+import json
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from arrow_response import ARROW_STREAM_MEDIA_TYPE, PARQUET_MEDIA_TYPE, json_records, negotiate_binary_format
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, None),
+    (ARROW_STREAM_MEDIA_TYPE, ARROW_STREAM_MEDIA_TYPE),
+    (f"{ARROW_STREAM_MEDIA_TYPE};q=0", None),
+    (f"{ARROW_STREAM_MEDIA_TYPE};q=0, */*", None),
+    (f"application/json, {ARROW_STREAM_MEDIA_TYPE}", None),
+    (f"{ARROW_STREAM_MEDIA_TYPE}, application/json", ARROW_STREAM_MEDIA_TYPE),
+    (f"application/json;q=0.5, {ARROW_STREAM_MEDIA_TYPE}", ARROW_STREAM_MEDIA_TYPE),
+    (f"{ARROW_STREAM_MEDIA_TYPE};q=0.8, {PARQUET_MEDIA_TYPE};q=0.9", PARQUET_MEDIA_TYPE),
+    (f"{PARQUET_MEDIA_TYPE} ; q=1.0", PARQUET_MEDIA_TYPE),
+])
+def test_negotiation_honours_q_values(accept, expected):
+    assert negotiate_binary_format(accept) == expected
+
+def test_json_records_match_json_dumps_exactly():
+    rng = np.random.default_rng(0)
+    n = 500
+    df = pd.DataFrame({
+        "timestamp": pd.date_range("2020-01-01", periods=n),
+        "close_price": rng.normal(100, 5, n) * 10.0 ** rng.integers(-9, 18, n),
+        "whole": np.round(rng.normal(100, 5, n)),
+        "gaps": np.where(rng.random(n) < 0.3, np.nan, rng.random(n)),
+        "volume": pd.array(np.where(rng.random(n) < 0.3, None, rng.integers(0, 10 ** 12, n)), dtype="Int64"),
+        "symbol": rng.choice(["TCS", "M&M", 'A"B', "Ré\\x", None], n),
+    })
+    df.loc[0, "close_price"] = 0.1 + 0.2
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    expected = table.to_pylist()
+    for row in expected:
+        row["timestamp"] = row["timestamp"].isoformat()
+        row["gaps"] = None if row["gaps"] != row["gaps"] else row["gaps"]
+
+    actual = json.loads("[" + json_records(table) + "]")
+    assert actual == expected
+    # Not just equal values: floats stay floats (100.0, not 100) and keep every digit
+    assert all(type(a["whole"]) is float for a in actual)
+    assert actual[0]["close_price"] == 0.30000000000000004
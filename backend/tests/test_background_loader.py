@@ -0,0 +1,69 @@
+import threading
+from background_loader import BackgroundLoader
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def failing_loader(calls, clock=None):
+    def load(progress):
+        calls.append(progress)
+        raise RuntimeError("download failed")
+    return BackgroundLoader("dataset", load, retry_backoff_seconds=30, max_retry_backoff_seconds=100,
+                            clock=clock or Clock())
+
+def test_retry_never_starts_a_load_that_was_not_started():
+    calls = []
+    loader = failing_loader(calls)
+    assert loader.retry() is False
+    assert loader.state == "idle" and calls == []
+
+def test_failed_load_is_retried_with_exponential_backoff():
+    clock = Clock()
+    calls = []
+    loader = failing_loader(calls, clock)
+
+    loader.start()
+    loader.wait()
+    assert loader.state == "failed" and loader.failures == 1
+    assert loader.retry() is False
+    clock.now += 29
+    assert loader.retry() is False
+    clock.now += 1
+    assert loader.retry() is True
+    loader.wait()
+    assert len(calls) == 2 and loader.failures == 2
+
+    # Second failure waits twice as long, capped at max_retry_backoff_seconds
+    clock.now += 59
+    assert loader.retry() is False
+    clock.now += 1
+    assert loader.retry() is True
+    loader.wait()
+    assert loader.status()["retry_in_seconds"] == 100
+
+def test_reload_replaces_the_value_once_the_new_load_finishes():
+    release = threading.Event()
+    results = iter(["first", "second"])
+
+    def load(progress):
+        value = next(results)
+        if value == "second":
+            release.wait(5)
+        return value
+
+    loader = BackgroundLoader("dataset", load)
+    loader.start()
+    loader.wait()
+    assert loader.value == "first" and loader.start() is False
+
+    assert loader.reload() is True
+    # Single flight: a reload already running is not started again, and the old value stays published
+    assert loader.reload() is False
+    assert loader.state == "loading" and loader.value == "first"
+    release.set()
+    loader.wait()
+    assert loader.state == "ready" and loader.value == "second"
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+import pytest
+from bar_store import BAR_RULES, build_bar_store, resample_bars, slice_bars
+from columnar_store import ColumnarStore
+
+@pytest.fixture(scope="module")
+def daily():
+    rng = np.random.default_rng(0)
+    days = pd.bdate_range("2024-01-01", "2024-04-30")
+    frames = []
+    for symbol in ("AAA", "BBB"):
+        close = 100 + rng.normal(0, 1, len(days)).cumsum()
+        volume = rng.integers(1_000, 5_000, len(days))
+        frames.append(pd.DataFrame({
+            "SYMBOL": symbol,
+            "TIMESTAMP": days,
+            "OPEN_PRICE": close + rng.normal(0, 0.5, len(days)),
+            "HIGH_PRICE": close + 2,
+            "LOW_PRICE": close - 2,
+            "CLOSE_PRICE": close,
+            "VOLUME": volume,
+            "DELIV_QTY": volume // 2,
+            "DELIV_PER": 50.0,
+            "EMA_63": close * 0.99,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+@pytest.fixture(scope="module")
+def store(daily):
+    return ColumnarStore.from_frame(daily)
+
+@pytest.fixture(scope="module")
+def bar_stores(store):
+    return {frequency: build_bar_store(store, frequency) for frequency in BAR_RULES}
+
+def in_range(daily, symbol, start, end):
+    rows = daily[daily["SYMBOL"] == symbol]
+    return rows[(rows["TIMESTAMP"] >= start) & (rows["TIMESTAMP"] <= end)]
+
+def request_bars(store, bar_stores, frequency, start, end, columns=None):
+    return slice_bars(bar_stores[frequency], "AAA", frequency,
+                      lambda lo, hi: store.to_frame("AAA", columns, lo, hi), columns, start, end)
+
+@pytest.mark.parametrize("frequency,start,end", [
+    ("Weekly", "2024-01-10", "2024-03-13"),   # both edges mid-week
+    ("Weekly", "2024-01-08", "2024-03-17"),   # whole weeks
+    ("Weekly", "2024-02-06", "2024-02-08"),   # inside one week
+    ("Weekly", "2024-01-13", "2024-02-03"),   # weekend edges with no trading days in them
+    ("Monthly", "2024-01-17", "2024-04-09"),
+    ("Monthly", "2024-02-01", "2024-03-31"),
+    ("Monthly", "2024-03-05", "2024-03-20"),
+])
+def test_bars_match_resampling_the_rows_in_range(daily, store, bar_stores, frequency, start, end):
+    start, end = pd.Timestamp(start), pd.Timestamp(end).replace(hour=23, minute=59, second=59, microsecond=999999)
+
+    bars = request_bars(store, bar_stores, frequency, start, end)
+
+    # The pre-store behaviour: filter the daily rows to the range, then resample
+    expected = resample_bars(in_range(daily, "AAA", start, end), BAR_RULES[frequency])
+    pd.testing.assert_frame_equal(bars, expected[bars.columns], check_dtype=False)
+
+def test_edge_bars_only_contain_days_inside_the_range(daily, store, bar_stores):
+    start = pd.Timestamp("2024-01-10")  # Wednesday
+    end = pd.Timestamp("2024-03-13 23:59:59.999999")  # Wednesday
+
+    bars = request_bars(store, bar_stores, "Weekly", start, end)
+
+    first_week = in_range(daily, "AAA", start, pd.Timestamp("2024-01-14"))
+    first = bars.iloc[0]
+    assert first["TIMESTAMP"] == pd.Timestamp("2024-01-14")
+    assert first["OPEN_PRICE"] == first_week["OPEN_PRICE"].iloc[0]
+    assert first["HIGH_PRICE"] == first_week["HIGH_PRICE"].max()
+    assert first["LOW_PRICE"] == first_week["LOW_PRICE"].min()
+    assert first["VOLUME"] == first_week["VOLUME"].sum()
+
+    last_week = in_range(daily, "AAA", pd.Timestamp("2024-03-11"), end)
+    last = bars.iloc[-1]
+    # Labelled by the period end, but built from Monday-Wednesday only
+    assert last["TIMESTAMP"] == pd.Timestamp("2024-03-17")
+    assert last["CLOSE_PRICE"] == last_week["CLOSE_PRICE"].iloc[-1]
+    assert last["VOLUME"] == last_week["VOLUME"].sum()
+    assert last["EMA_63"] == last_week["EMA_63"].iloc[-1]
+
+    # Interior weeks are the precomputed whole-period bars
+    whole = bar_stores["Weekly"].to_frame("AAA", None, pd.Timestamp("2024-01-21"), pd.Timestamp("2024-03-10"))
+    pd.testing.assert_frame_equal(bars.iloc[1:-1].reset_index(drop=True), whole)
+
+def test_projected_deliv_per_is_recomputed_on_edge_bars(daily, store, bar_stores):
+    start, end = pd.Timestamp("2024-01-10"), pd.Timestamp("2024-01-31 23:59:59.999999")
+    columns = ["TIMESTAMP", "DELIV_PER"]
+
+    bars = slice_bars(bar_stores["Weekly"], "AAA", "Weekly",
+                      lambda lo, hi: store.to_frame("AAA", columns + ["DELIV_QTY", "VOLUME"], lo, hi),
+                      columns, start, end)
+
+    assert list(bars.columns) == columns
+    first_week = in_range(daily, "AAA", start, pd.Timestamp("2024-01-14"))
+    assert bars["DELIV_PER"].iloc[0] == pytest.approx(first_week["DELIV_QTY"].sum() / first_week["VOLUME"].sum() * 100)
+
+def test_unbounded_request_is_the_precomputed_slice(store, bar_stores):
+    bars = request_bars(store, bar_stores, "Monthly", None, None)
+    pd.testing.assert_frame_equal(bars, bar_stores["Monthly"].to_frame("AAA"))
+
+def test_unknown_symbol_is_empty(store, bar_stores):
+    assert slice_bars(bar_stores["Weekly"], "ZZZ", "Weekly", lambda lo, hi: pd.DataFrame()).empty
+
+@pytest.mark.parametrize("with_symbol", [True, False])
+def test_bar_close_value_comes_from_the_closing_day_even_when_null(with_symbol):
+    df = pd.DataFrame({
+        "SYMBOL": ["AAA"] * 5 + ["BBB"] * 2,
+        # AAA has no rows in February, so the single-symbol resample has an empty bin
+        "TIMESTAMP": pd.to_datetime(["2024-01-02", "2024-01-03", "2024-03-04", "2024-03-05", "2024-04-01",
+                                     "2024-01-02", "2024-01-03"]),
+        "CLOSE_PRICE": [10.0, np.nan, 11.0, 12.0, 13.0, 20.0, 21.0],
+        "EMA_63": [1.0, np.nan, 3.0, np.nan, 5.0, 6.0, np.nan],
+        "SECTOR": ["IT", None, "IT", "IT", "IT", "FIN", None],
+    })
+    if not with_symbol:
+        df = df[df["SYMBOL"] == "AAA"].drop(columns="SYMBOL")
+
+    bars = resample_bars(df, "ME")
+
+    aaa = bars[bars["SYMBOL"] == "AAA"] if with_symbol else bars.dropna(subset=["CLOSE_PRICE"])
+    assert list(aaa["TIMESTAMP"]) == list(pd.to_datetime(["2024-01-31", "2024-03-31", "2024-04-30"]))
+    # Indicators and attributes are the closing day's value, null included
+    assert aaa["EMA_63"].isna().tolist() == [True, True, False]
+    assert aaa["SECTOR"].isna().tolist() == [True, False, False]
+    # Prices keep resample's last valid close
+    assert aaa["CLOSE_PRICE"].tolist() == [10.0, 12.0, 13.0]
+    if with_symbol:
+        bbb = bars[bars["SYMBOL"] == "BBB"]
+        assert bbb["EMA_63"].isna().all() and bbb["SECTOR"].isna().all()
+    else:
+        february = bars[bars["TIMESTAMP"] == pd.Timestamp("2024-02-29")]
+        assert february["EMA_63"].isna().all()
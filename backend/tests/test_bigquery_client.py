@@ -0,0 +1,120 @@
+import threading
+import pytest
+from google.api_core import exceptions as api_exceptions
+from google.auth import exceptions as auth_exceptions
+from bigquery_client import SharedClient
+
+class FakeClient:
+    """Stands in for bigquery.Client: counts queries, fails the first `fail_auth` with `error`"""
+
+    def __init__(self, fail_auth=0, error=None):
+        self.fail_auth = fail_auth
+        self.error = error or api_exceptions.Unauthorized("token expired")
+        self.queries = 0
+        self.closed = False
+
+    def query(self, sql):
+        if self.fail_auth:
+            self.fail_auth -= 1
+            raise self.error
+        self.queries += 1
+        return sql
+
+    def close(self):
+        self.closed = True
+
+class FakeFactory:
+    """Client factory that records every client it builds"""
+
+    def __init__(self, **client_kwargs):
+        self.client_kwargs = client_kwargs
+        self.created = []
+
+    def __call__(self):
+        client = FakeClient(**self.client_kwargs)
+        self.client_kwargs = {}  # only the first client fails
+        self.created.append(client)
+        return client
+
+@pytest.fixture
+def shared():
+    return SharedClient()
+
+def test_client_is_created_once_and_reused(shared):
+    factory = FakeFactory()
+    shared.override(factory)
+
+    results = [shared.run(lambda client: client.query(f"SELECT {i}")) for i in range(5)]
+
+    assert results == [f"SELECT {i}" for i in range(5)]
+    assert len(factory.created) == 1 and shared.creations == 1
+    assert shared.get() is factory.created[0]
+    assert factory.created[0].queries == 5
+
+def test_concurrent_first_use_builds_one_client(shared):
+    factory = FakeFactory()
+    shared.override(factory)
+    barrier = threading.Barrier(8)
+    seen = []
+
+    def worker():
+        barrier.wait()
+        seen.append(shared.get())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(factory.created) == 1
+    assert all(client is factory.created[0] for client in seen)
+
+@pytest.mark.parametrize("error", [api_exceptions.Unauthorized("token expired"),
+                                   auth_exceptions.RefreshError("refresh failed")])
+def test_auth_error_rebuilds_client_once(shared, error):
+    factory = FakeFactory(fail_auth=1, error=error)
+    shared.override(factory)
+
+    assert shared.run(lambda client: client.query("SELECT 1")) == "SELECT 1"
+
+    stale, fresh = factory.created
+    assert stale.closed and not fresh.closed
+    assert shared.creations == 2
+    # The rebuilt client is then reused like the first one
+    assert shared.run(lambda client: client.query("SELECT 2")) == "SELECT 2"
+    assert len(factory.created) == 2 and fresh.queries == 2
+
+def test_auth_error_is_retried_only_once(shared):
+    factory = FakeFactory()
+    shared.override(factory)
+    calls = []
+
+    def operation(client):
+        calls.append(client)
+        raise api_exceptions.Unauthorized("still expired")
+
+    with pytest.raises(api_exceptions.Unauthorized):
+        shared.run(operation)
+    assert len(calls) == 2 and len(factory.created) == 2
+
+def test_other_errors_keep_the_client(shared):
+    factory = FakeFactory()
+    shared.override(factory)
+
+    def operation(client):
+        raise api_exceptions.BadRequest("syntax error")
+
+    with pytest.raises(api_exceptions.BadRequest):
+        shared.run(operation)
+    assert len(factory.created) == 1 and not factory.created[0].closed
+
+def test_override_drops_the_current_client(shared):
+    first, second = FakeFactory(), FakeFactory()
+    shared.override(first)
+    old = shared.get()
+
+    shared.override(second)
+
+    assert old.closed
+    assert shared.get() is second.created[0]
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+from crossovers import EMA_CROSS_PAIRS, detect_crossovers
+
+def loop_crossovers(fast_ema, slow_ema):
+    """The per-pair, per-bar loop detect_crossovers() replaced"""
+    bull_signals = []
+    bear_signals = []
+    for i in range(len(fast_ema)):
+        if i == 0:
+            bull_signals.append(0)
+            bear_signals.append(0)
+        elif fast_ema[i] > slow_ema[i] and fast_ema[i-1] <= slow_ema[i-1]:
+            bull_signals.append(1)
+            bear_signals.append(0)
+        elif fast_ema[i] < slow_ema[i] and fast_ema[i-1] >= slow_ema[i-1]:
+            bull_signals.append(0)
+            bear_signals.append(1)
+        else:
+            bull_signals.append(0)
+            bear_signals.append(0)
+    return bull_signals, bear_signals
+
+def random_emas(rng, rows):
+    """EMAs of a rounded random walk, so neighbouring spans touch (ties), with NaN gaps"""
+    prices = pd.Series(np.round(100 + rng.normal(0, 1, rows).cumsum(), 0))
+    emas = {span: np.round(prices.ewm(span=span // 20 + 1, adjust=False).mean().to_numpy(), 0)
+            for span in (63, 144, 234)}
+    for values in emas.values():
+        values[rng.random(rows) < 0.03] = np.nan
+    return emas
+
+def assert_matches_loop(emas, pairs=EMA_CROSS_PAIRS):
+    dense, events = detect_crossovers(emas, pairs)
+    assert set(dense) == set(events) == {f"{kind}Cross_{fast}_{slow}" for fast, slow in pairs for kind in ("Bull", "Bear")}
+    for fast, slow in pairs:
+        bull, bear = loop_crossovers(emas[fast].tolist(), emas[slow].tolist())
+        assert dense[f"BullCross_{fast}_{slow}"].astype(int).tolist() == bull
+        assert dense[f"BearCross_{fast}_{slow}"].astype(int).tolist() == bear
+    for name, signal in dense.items():
+        assert signal.dtype == bool
+        np.testing.assert_array_equal(events[name], np.flatnonzero(signal))
+        assert all(signal[events[name]])
+    return dense, events
+
+@pytest.mark.parametrize("seed", range(50))
+def test_matches_the_per_pair_loop_on_random_histories(seed):
+    rng = np.random.default_rng(seed)
+    assert_matches_loop(random_emas(rng, int(rng.integers(0, 300))))
+
+def test_ties_count_as_the_previous_side():
+    # fast == slow on the previous bar: <= and >= both hold, so leaving the tie in either direction signals
+    emas = {1: np.array([1.0, 2.0, 2.0, 3.0, 2.0, 1.0]), 2: np.array([1.0, 2.0, 2.0, 2.0, 2.0, 2.0])}
+
+    dense, events = assert_matches_loop(emas, [(1, 2)])
+
+    assert events["BullCross_1_2"].tolist() == [3]
+    assert events["BearCross_1_2"].tolist() == [5]
+    # Moving onto the tie is not a cross
+    assert not dense["BearCross_1_2"][4]
+
+def test_nan_never_signals():
+    nan = np.nan
+    emas = {1: np.array([1.0, nan, 3.0, 3.0, 1.0]), 2: np.array([2.0, 2.0, 2.0, nan, 2.0])}
+
+    dense, events = assert_matches_loop(emas, [(1, 2)])
+
+    # Every comparison with NaN is False, so no cross into or out of a NaN bar
+    assert not dense["BullCross_1_2"].any()
+    assert events["BearCross_1_2"].size == 0
+
+def test_bar_zero_never_signals():
+    emas = {1: np.array([5.0, 5.0]), 2: np.array([1.0, 1.0])}
+
+    dense, events = assert_matches_loop(emas, [(1, 2)])
+
+    assert not dense["BullCross_1_2"][0] and not dense["BearCross_1_2"][0]
+    assert all(events[name].size == 0 for name in events)
+
+def test_empty_history():
+    dense, events = assert_matches_loop({63: np.array([]), 144: np.array([]), 234: np.array([])})
+    assert all(signal.size == 0 for signal in dense.values())
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+import pytest
+import dataset_download
+from dataset_download import DownloadError, download_dataset
+
+CHUNK_SIZE = 4096
+
+class RangeServer:
+    """Local HTTP server for one file, with HEAD and single Range requests like GCS"""
+
+    def __init__(self, payload, on_request=None):
+        self.payload = payload
+        self.ranges = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_HEAD(self):
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(server.payload)))
+                self.send_header("Accept-Ranges", "bytes")
+                self.send_header("ETag", '"v1"')
+                self.end_headers()
+
+            def do_GET(self):
+                if on_request:
+                    on_request()
+                start, end = (int(x) for x in self.headers["Range"].split("=")[1].split("-"))
+                server.ranges.append((start, end))
+                body = server.payload[start:end + 1]
+                self.send_response(206)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Content-Range", f"bytes {start}-{end}/{len(server.payload)}")
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/Final_Data.parquet"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+@pytest.fixture
+def payload(tmp_path):
+    """A real parquet file spanning several chunks"""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"SYMBOL": np.repeat(["AAA", "BBB"], 2000), "CLOSE_PRICE": rng.normal(100, 5, 4000)})
+    path = tmp_path / "source.parquet"
+    df.to_parquet(path)
+    data = path.read_bytes()
+    assert len(data) > 4 * CHUNK_SIZE
+    return data
+
+@pytest.fixture
+def server(payload):
+    server = RangeServer(payload)
+    yield server
+    server.close()
+
+def test_resumes_from_partial_manifest(tmp_path, payload, server):
+    target = str(tmp_path / "Final_Data.parquet")
+    num_chunks = -(-len(payload) // CHUNK_SIZE)
+    done = [0, 2]
+
+    # An interrupted earlier run: the finished chunks are in place, the rest is zeroes
+    part = bytearray(len(payload))
+    for i in done:
+        part[i * CHUNK_SIZE:(i + 1) * CHUNK_SIZE] = payload[i * CHUNK_SIZE:(i + 1) * CHUNK_SIZE]
+    with open(target + ".part", "wb") as f:
+        f.write(part)
+    with open(target + ".part.json", "w") as f:
+        json.dump({"url": server.url, "size": len(payload), "etag": '"v1"', "chunk_size": CHUNK_SIZE, "done": done}, f)
+
+    download_dataset(server.url, target, workers=4, chunk_size=CHUNK_SIZE)
+
+    requested = sorted(start // CHUNK_SIZE for start, _ in server.ranges)
+    assert requested == [i for i in range(num_chunks) if i not in done]
+    with open(target, "rb") as f:
+        assert f.read() == payload
+    assert not os.path.exists(target + ".part")
+    assert not os.path.exists(target + ".part.json")
+
+def test_manifest_for_another_version_starts_over(tmp_path, payload, server):
+    target = str(tmp_path / "Final_Data.parquet")
+    with open(target + ".part", "wb") as f:
+        f.write(b"\0" * len(payload))
+    with open(target + ".part.json", "w") as f:
+        json.dump({"url": server.url, "size": len(payload), "etag": '"v0"', "chunk_size": CHUNK_SIZE, "done": [0, 1]}, f)
+
+    download_dataset(server.url, target, workers=4, chunk_size=CHUNK_SIZE)
+
+    assert len(server.ranges) == -(-len(payload) // CHUNK_SIZE)
+    with open(target, "rb") as f:
+        assert f.read() == payload
+
+def test_checksum_mismatch_is_rejected(tmp_path, payload, server):
+    target = str(tmp_path / "Final_Data.parquet")
+
+    with pytest.raises(DownloadError, match="SHA-256 mismatch"):
+        download_dataset(server.url, target, workers=4, chunk_size=CHUNK_SIZE, expected_sha256="0" * 64)
+
+    # Nothing is published, and the corrupt part file is not kept for a resume
+    assert not os.path.exists(target)
+    assert not os.path.exists(target + ".part")
+    assert not os.path.exists(target + ".part.json")
+
+    download_dataset(server.url, target, workers=4, chunk_size=CHUNK_SIZE,
+                     expected_sha256=hashlib.sha256(payload).hexdigest())
+    with open(target, "rb") as f:
+        assert f.read() == payload
+
+def test_target_appears_only_through_atomic_replace(tmp_path, payload, monkeypatch):
+    target = str(tmp_path / "Final_Data.parquet")
+    seen_target = []
+    server = RangeServer(payload, on_request=lambda: seen_target.append(os.path.exists(target)))
+    replaced = []
+    real_replace = os.replace
+
+    def recording_replace(src, dst):
+        replaced.append((src, dst, os.path.exists(dst)))
+        real_replace(src, dst)
+
+    monkeypatch.setattr(dataset_download.os, "replace", recording_replace)
+    try:
+        download_dataset(server.url, target, workers=4, chunk_size=CHUNK_SIZE)
+    finally:
+        server.close()
+
+    # While chunks were being fetched the target path did not exist yet
+    assert seen_target and not any(seen_target)
+    # The verified part file was renamed onto the target in one step (manifest writes also use os.replace)
+    final = [call for call in replaced if call[1] == target]
+    assert final == [(target + ".part", target, False)]
+    with open(target, "rb") as f:
+        assert f.read() == payload
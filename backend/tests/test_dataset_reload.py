@@ -0,0 +1,54 @@
+import os
+import pandas as pd
+import pytest
+import main_parquet
+from background_loader import BackgroundLoader
+from config import settings
+
+def write_dataset(path, close):
+    days = pd.bdate_range("2024-01-01", periods=30)
+    pd.DataFrame({
+        "SYMBOL": "AAA",
+        "TIMESTAMP": days,
+        "OPEN_PRICE": close,
+        "HIGH_PRICE": close,
+        "LOW_PRICE": close,
+        "CLOSE_PRICE": [close + i for i in range(len(days))],
+    }).to_parquet(path)
+
+@pytest.fixture
+def loader(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_DIRECTORY", str(tmp_path))
+    monkeypatch.setattr(settings, "ONEDRIVE_DATA_URL", "")
+    write_dataset(settings.DATA_PATH, 100.0)
+    loader = BackgroundLoader("dataset", main_parquet.warm_dataset)
+    monkeypatch.setattr(main_parquet, "dataset_loader", loader)
+    loader.start()
+    loader.wait()
+    assert loader.ready
+    return loader
+
+def test_redownloaded_file_reloads_store_and_bars(loader):
+    old = main_parquet.get_store()
+    assert old.to_frame("AAA")["CLOSE_PRICE"].iloc[0] == 100.0
+
+    # A re-download publishes a new file under the same name
+    write_dataset(settings.DATA_PATH + ".new", 200.0)
+    os.replace(settings.DATA_PATH + ".new", settings.DATA_PATH)
+
+    # The old store is no longer served, and one reload is started for the new file
+    assert main_parquet.get_store() is None
+    assert main_parquet.get_bar_store("Weekly") is None
+    assert loader.state == "loading" and loader.reload() is False
+    loader.wait()
+
+    store = main_parquet.get_store()
+    assert store is not old
+    assert store.version == main_parquet.dataset_version(settings.DATA_PATH)
+    assert store.to_frame("AAA")["CLOSE_PRICE"].iloc[0] == 200.0
+    assert main_parquet.get_bar_store("Weekly").to_frame("AAA")["OPEN_PRICE"].iloc[0] == 200.0
+
+def test_unchanged_file_keeps_the_resident_store(loader):
+    store = main_parquet.get_store()
+    assert main_parquet.get_store() is store
+    assert loader.state == "ready"
@@ -0,0 +1,97 @@
+import asyncio
+import time
+import pytest
+from db_pool import ConnectionPool, PoolTimeout
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+    def execute(self, query, params=None):
+        time.sleep(0.01)
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def fetchmany(self, size):
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+    def close(self):
+        pass
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def cursor(self, dictionary=False, buffered=True):
+        return FakeCursor(self.rows)
+
+    def ping(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+def make_pool(size=2, timeout_seconds=3):
+    return ConnectionPool(lambda: FakeConnection(range(10)), size=size, max_lifetime_seconds=60,
+                          ping_after_seconds=60, timeout_seconds=timeout_seconds)
+
+def test_streams_finish_while_buffered_queries_wait_for_their_connections():
+    pool = make_pool(size=2)
+
+    async def scenario():
+        # Both connections are held by streams paused between chunks
+        streams = [pool.iterate_async(pool.iter_chunks("SELECT", chunk_size=3)) for _ in range(2)]
+        first = [await anext(stream) for stream in streams]
+        assert pool.in_use == 2
+
+        # Buffered requests now occupy every query worker, blocked in acquire()
+        buffered = [asyncio.ensure_future(pool.fetchall_async("SELECT")) for _ in range(2 * pool.executor_workers)]
+        await asyncio.sleep(0.05)
+        assert not any(task.done() for task in buffered)
+
+        # The streams still get threads for their next chunks, finish and release their connections
+        started = time.monotonic()
+        rest = [[chunk async for chunk in stream] for stream in streams]
+        results = await asyncio.wait_for(asyncio.gather(*buffered), timeout=pool.timeout_seconds)
+        return first, rest, results, time.monotonic() - started
+
+    first, rest, results, elapsed = asyncio.run(scenario())
+
+    assert first == [[0, 1, 2]] * 2
+    assert rest == [[[3, 4, 5], [6, 7, 8], [9]]] * 2
+    assert results == [list(range(10))] * 4
+    assert elapsed < pool.timeout_seconds
+    assert pool.timeouts == 0 and pool.in_use == 0
+
+def test_many_streams_and_buffered_queries_all_complete():
+    pool = make_pool(size=3)
+
+    async def consume():
+        return [row async for chunk in pool.iterate_async(pool.iter_chunks("SELECT", chunk_size=2)) for row in chunk]
+
+    async def scenario():
+        jobs = []
+        for i in range(24):
+            jobs.append(consume() if i % 2 else pool.fetchall_async("SELECT"))
+        return await asyncio.wait_for(asyncio.gather(*jobs), timeout=pool.timeout_seconds)
+
+    results = asyncio.run(scenario())
+
+    assert results == [list(range(10))] * 24
+    assert pool.timeouts == 0 and pool.in_use == 0 and pool.created <= pool.size
+
+def test_acquire_times_out_when_every_connection_is_held():
+    pool = make_pool(size=1, timeout_seconds=0.05)
+    entry = pool.acquire()
+    try:
+        with pytest.raises(PoolTimeout):
+            pool.acquire()
+    finally:
+        pool.release(entry)
+    assert pool.timeouts == 1 and pool.in_use == 0
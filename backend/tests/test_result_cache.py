@@ -0,0 +1,153 @@
+import datetime
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+import main
+from bigquery_client import create_pooled_client, create_storage_client
+from config import settings
+from frame_cache import ByteLRUCache
+
+class FakeTable:
+    def __init__(self, labels, modified=datetime.datetime(2026, 1, 1)):
+        self.labels = dict(labels)
+        self.modified = modified
+        self.num_rows = 3
+
+class FakeRow:
+    def __init__(self, values):
+        self.__dict__.update(values)
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __iter__(self):
+        return (FakeRow(row) for row in self.rows)
+
+    def to_arrow(self, **kwargs):
+        return pa.Table.from_pylist(self.rows)
+
+    def to_arrow_iterable(self, **kwargs):
+        return iter(self.to_arrow().to_batches(max_chunksize=2))
+
+class FakeJob:
+    total_bytes_processed = 0
+    total_bytes_billed = 0
+    cache_hit = False
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def result(self):
+        return FakeResult(self.rows)
+
+class FakeBigQuery:
+    """In-process stand-in for bigquery.Client: fact_table answers come from self.prices,
+    and its data_version label is whatever the test sets"""
+
+    def __init__(self):
+        self.data_version = "v1"
+        self.prices = [100.0, 101.0, 102.0]
+        self.security = "Tata Consultancy"
+        self.dimension_modified = datetime.datetime(2026, 1, 1)
+        self.fact_queries = []
+
+    def get_table(self, table_id):
+        if table_id == main.DIMENSION_TABLE:
+            return FakeTable({}, self.dimension_modified)
+        return FakeTable({"data_version": self.data_version} if table_id == main.FACT_TABLE else {})
+
+    def query(self, sql, job_config=None):
+        if main.DIMENSION_TABLE in sql:
+            return FakeJob([{"symbol": "TCS", "security": self.security, "sector": "IT", "industry": "Software"}])
+        self.fact_queries.append(sql)
+        timestamps = [datetime.datetime(2026, 1, day) for day in range(1, len(self.prices) + 1)]
+        if "COUNT(*)" in sql:
+            return FakeJob([{
+                "symbol": "TCS", "total_records": len(self.prices), "first_date": timestamps[0],
+                "last_date": timestamps[-1], "avg_price": sum(self.prices) / len(self.prices),
+                "min_price": min(self.prices), "max_price": max(self.prices), "price_volatility": 1.0,
+                "avg_volume": 10.0, "total_volume": 30,
+            }])
+        return FakeJob([{"timestamp": ts, "close_price": price} for ts, price in zip(timestamps, self.prices)])
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def bigquery(monkeypatch):
+    fake = FakeBigQuery()
+    main.bigquery_clients.override(lambda: fake)
+    monkeypatch.setattr(main, "result_cache", ByteLRUCache(1024 * 1024, sizeof=lambda entry: len(entry[0])))
+    main._table_metadata.clear()
+    main.dimension_cache.invalidate()
+    # Re-read the label on every request instead of once a minute
+    monkeypatch.setattr(settings, "DATASET_VERSION_CHECK_SECONDS", -1)
+    yield fake
+    main.bigquery_clients.override(create_pooled_client, create_storage_client)
+
+@pytest.fixture
+def client(bigquery):
+    return TestClient(main.app)
+
+@pytest.mark.parametrize("path", ["/analytics/summary/TCS", "/stock_data/TCS?fields=close_price"])
+def test_unchanged_data_version_is_a_cache_hit(bigquery, client, path):
+    first = client.get(path)
+    second = client.get(path)
+
+    assert first.status_code == second.status_code == 200
+    assert second.content == first.content
+    assert len(bigquery.fact_queries) == 1
+    assert main.result_cache.hits == 1
+
+@pytest.mark.parametrize("path", ["/analytics/summary/TCS", "/stock_data/TCS?fields=close_price"])
+def test_changed_data_version_invalidates(bigquery, client, path):
+    before = client.get(path)
+
+    # A reload writes new rows and bumps the label
+    bigquery.prices = [200.0, 201.0, 202.0]
+    bigquery.data_version = "v2"
+    after = client.get(path)
+
+    assert len(bigquery.fact_queries) == 2
+    assert after.content != before.content
+    assert "201.0" in after.text
+    assert main.result_cache.invalidations == 1
+
+    # ...and the new version is cached in turn
+    assert client.get(path).content == after.content
+    assert len(bigquery.fact_queries) == 2
+
+def test_rows_changed_without_label_bump_are_still_served_from_cache(bigquery, client):
+    before = client.get("/analytics/summary/TCS")
+    bigquery.prices = [200.0, 201.0, 202.0]
+
+    assert client.get("/analytics/summary/TCS").content == before.content
+    assert len(bigquery.fact_queries) == 1
+
+def test_unknown_version_is_not_cached(bigquery, client, monkeypatch):
+    def metadata_unavailable(table_id):
+        raise RuntimeError("metadata API down")
+
+    monkeypatch.setattr(bigquery, "get_table", metadata_unavailable)
+
+    assert client.get("/analytics/summary/TCS").status_code == 200
+    assert client.get("/analytics/summary/TCS").status_code == 200
+    assert len(bigquery.fact_queries) == 2
+    assert main.result_cache.stats()["entries"] == 0
+
+def test_dimension_refresh_invalidates_stock_data(bigquery, client, monkeypatch):
+    path = "/stock_data/TCS?fields=close_price,security"
+    before = client.get(path)
+    assert "Tata Consultancy" in before.text
+    assert client.get(path).content == before.content
+
+    # dimension_table is rewritten without a fact_table reload
+    bigquery.security = "Tata Consultancy Services"
+    bigquery.dimension_modified = datetime.datetime(2026, 2, 1)
+    monkeypatch.setattr(main.dimension_cache, "ttl_seconds", -1)
+    after = client.get(path)
+
+    assert "Tata Consultancy Services" in after.text
+    assert len(bigquery.fact_queries) == 2
+    assert main.result_cache.invalidations == 1
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sliding_mode import sliding_mode
+
+def pandas_rolling_mode(prices, window):
+    """The per-window ROLLING_MODE expression sliding_mode() replaced"""
+    return prices.rolling(window=window, min_periods=1).apply(lambda x: x.mode().iloc[0] if not x.mode().empty else x.iloc[-1])
+
+def random_prices(rng, rows):
+    """Prices rounded to a few distinct levels so windows have repeats and ties, with some NaNs"""
+    prices = np.round(100 + rng.normal(0, 1, rows).cumsum(), int(rng.integers(0, 2)))
+    prices[rng.random(rows) < 0.05] = np.nan
+    return pd.Series(prices)
+
+@pytest.mark.parametrize("seed", range(30))
+def test_matches_pandas_rolling_mode_on_random_series(seed):
+    rng = np.random.default_rng(seed)
+    prices = random_prices(rng, int(rng.integers(0, 200)))
+
+    for window in (1, 2, 3, 5, 20, 63, 500):
+        expected = pandas_rolling_mode(prices, window)
+        actual = sliding_mode(prices, window)
+        np.testing.assert_array_equal(actual.to_numpy(), expected.to_numpy(), err_msg=f"window {window}")
+
+def test_ties_go_to_the_smallest_value_and_nan_is_ignored():
+    prices = pd.Series([3.0, 1.0, np.nan, 3.0, 1.0, np.nan, np.nan, np.nan, np.nan])
+
+    modes = sliding_mode(prices, 4)
+
+    np.testing.assert_array_equal(modes.to_numpy(), [3.0, 1.0, 1.0, 3.0, 1.0, 1.0, 1.0, 1.0, np.nan])
+    np.testing.assert_array_equal(modes.to_numpy(), pandas_rolling_mode(prices, 4).to_numpy())
+
+def test_keeps_the_series_index():
+    prices = pd.Series([1.0, 2.0, 2.0], index=pd.date_range("2024-01-01", periods=3))
+    assert sliding_mode(prices, 2).index.equals(prices.index)
+    assert sliding_mode(prices.to_numpy(), 2).index.equals(pd.RangeIndex(3))
+
+def test_rejects_empty_window():
+    with pytest.raises(ValueError):
+        sliding_mode([1.0], 0)
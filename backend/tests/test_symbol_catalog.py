@@ -0,0 +1,46 @@
+import os
+import pandas as pd
+import pytest
+import main_parquet
+from config import settings
+from symbol_catalog import build_catalog, catalog_path
+
+@pytest.fixture
+def data_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_DIRECTORY", str(tmp_path))
+    pd.DataFrame({
+        "SYMBOL": ["AAA", "AAA", "BBB"],
+        "TIMESTAMP": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-01"]),
+        "CLOSE_PRICE": [1.0, 2.0, 3.0],
+    }).to_parquet(settings.DATA_PATH)
+    main_parquet._load_catalog.cache_clear()
+    yield settings.DATA_PATH
+    main_parquet._load_catalog.cache_clear()
+
+def test_catalog_written_after_a_miss_is_picked_up(data_path):
+    assert main_parquet.get_catalog() is None
+
+    build_catalog(data_path)
+
+    catalog = main_parquet.get_catalog()
+    assert catalog is not None and catalog.symbols == ["AAA", "BBB"]
+    assert main_parquet.get_catalog() is catalog
+
+def test_stale_catalog_is_replaced_by_a_rebuilt_one(data_path):
+    build_catalog(data_path)
+    pd.DataFrame({
+        "SYMBOL": ["CCC"], "TIMESTAMP": pd.to_datetime(["2024-01-01"]), "CLOSE_PRICE": [4.0],
+    }).to_parquet(data_path)
+    assert main_parquet.get_catalog() is None
+
+    build_catalog(data_path)
+
+    assert main_parquet.get_catalog().symbols == ["CCC"]
+
+def test_removed_catalog_is_not_served(data_path):
+    build_catalog(data_path)
+    assert main_parquet.get_catalog() is not None
+
+    os.remove(catalog_path(data_path))
+
+    assert main_parquet.get_catalog() is None
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+from zscore import rolling_zscores
+
+def pandas_zscore(values, window):
+    """The per-column rolling code rolling_zscores replaced"""
+    series = pd.Series(values, dtype=float)
+    rolling_data = series.dropna()
+    if len(rolling_data) < window:
+        return np.full(len(series), np.nan)
+    mean = rolling_data.rolling(window=window, min_periods=1).mean().reindex(series.index)
+    std = rolling_data.rolling(window=window, min_periods=1).std().reindex(series.index)
+    return ((series - mean) / std).replace([np.inf, -np.inf], np.nan).to_numpy()
+
+def test_matches_pandas_rolling_on_noisy_prices_with_gaps():
+    rng = np.random.default_rng(0)
+    values = 1000 + rng.normal(0, 5, 500).cumsum()
+    values[rng.random(500) < 0.05] = np.nan
+    df = pd.DataFrame({"CLOSE_PRICE": values})
+    zscores = rolling_zscores(df, ["CLOSE_PRICE"], [5, 30])
+    for window in (5, 30):
+        np.testing.assert_allclose(zscores[f"Z_SCORE_CLOSE_PRICE_{window}"], pandas_zscore(values, window),
+                                   rtol=1e-6, atol=1e-8)
+
+def test_flat_window_gives_zero():
+    rng = np.random.default_rng(1)
+    flat = np.full(40, 101.37)
+    values = np.concatenate((100 + rng.normal(0, 5, 50), flat, 100 + rng.normal(0, 5, 10)))
+    zscore = rolling_zscores(pd.DataFrame({"CLOSE_PRICE": values}), ["CLOSE_PRICE"], [30])["Z_SCORE_CLOSE_PRICE"]
+
+    # Windows 79..89 hold only the flat run: zero spread, and the price is the mean
+    assert (zscore[79:90] == 0).all()
+    # The old code gave 0 there, or NaN (0/0) where pandas' online variance came out exactly 0
+    expected = pandas_zscore(values, 30)
+    assert np.all((expected[79:90] == 0) | np.isnan(expected[79:90]))
+
+    # Windows that still reach back into varying prices are unchanged
+    varying = np.r_[0:79, 90:len(values)]
+    assert np.isfinite(zscore[varying][1:]).all()
+    np.testing.assert_allclose(zscore[varying], expected[varying], rtol=1e-6, atol=1e-8)
+
+def test_constant_column_is_zero_after_the_first_row():
+    df = pd.DataFrame({"NIFTY_50": np.ones(60), "CLOSE_PRICE": np.arange(60.0)})
+    zscores = rolling_zscores(df, ["NIFTY_50", "CLOSE_PRICE"], [20])
+    # A one-value window has no sample std at all
+    assert np.isnan(zscores["Z_SCORE_NIFTY_50"][0])
+    assert (zscores["Z_SCORE_NIFTY_50"][1:] == 0).all()
+    assert np.isfinite(zscores["Z_SCORE_CLOSE_PRICE"][1:]).all()
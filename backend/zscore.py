@@ -0,0 +1,128 @@
+"""
+Multi-window, multi-column rolling z-score engine
+Rolling mean and sample std come from windowed differences of cumulative
+sum(y) and sum(y^2), computed in blocks one window long and shifted to each
+block's first value so the sums never grow to the scale of the whole series.
+Windows where cancellation error could still dominate (flat or near-flat
+prices) are recomputed exactly, so flat windows give std 0 like pandas
+rolling().std(), and a z-score of 0
+"""
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+
+# Windowed sums of squares within this many ulps of the running total are
+# dominated by cancellation error and get recomputed exactly
+CANCELLATION_ULPS = 64
+
+def zscore_name(column, window, multiple_windows):
+    """Z_SCORE_<COLUMN> for a single window, Z_SCORE_<COLUMN>_<WINDOW> when several are requested"""
+    return f"Z_SCORE_{column}_{window}" if multiple_windows else f"Z_SCORE_{column}"
+
+def parse_zscore_params(zscore_columns, zscore_windows, default_column, default_window):
+    """Parses the comma-separated zscore_columns=/zscore_windows= query parameters"""
+    columns = [name.strip().upper() for name in (zscore_columns or default_column).split(",") if name.strip()]
+    try:
+        windows = [int(w) for w in (zscore_windows or str(default_window)).split(",") if w.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid zscore_windows: {zscore_windows}. Expected integers.")
+    if any(w < 1 for w in windows):
+        raise HTTPException(status_code=400, detail="zscore_windows must be positive integers.")
+    return list(dict.fromkeys(columns)), sorted(set(windows))
+
+def _exact_window_stats(values, window, ends):
+    """Two-pass mean and sum of squared deviations for the few ill-conditioned windows"""
+    # NaN front padding turns the short leading windows into full-width rows
+    padded = np.concatenate((np.full(window - 1, np.nan), values))
+    rows = np.lib.stride_tricks.sliding_window_view(padded, window)[ends - 1]
+    means = np.nanmean(rows, axis=1)
+    squared_deviations = np.nansum((rows - means[:, None]) ** 2, axis=1)
+    # A flat window has exactly zero spread, as in pandas rolling().std()
+    squared_deviations[np.nanmin(rows, axis=1) == np.nanmax(rows, axis=1)] = 0.0
+    return means, squared_deviations
+
+def _blocked_window_sums(values, window):
+    """
+    Windowed sum(y) and sum(y^2) from cumulative sums restarted every `window` rows,
+    with y taken relative to the first value of each block. A window spans at most
+    two blocks, so the sums stay at the scale of the window rather than the series.
+    Returns (shift, sum1, sum2, counts, scale) per row, relative to the row's block
+    shift; scale bounds the magnitude of the terms that were added or cancelled.
+    """
+    n = len(values)
+    block = max(1, min(window, n))
+    num_blocks = -(-n // block)
+    padded = np.zeros(num_blocks * block)
+    padded[:n] = values
+    blocks = padded.reshape(num_blocks, block)
+    shifts = blocks[:, 0].copy()
+    deviations = blocks - shifts[:, None]
+    zeros = np.zeros((num_blocks, 1))
+    prefix1 = np.hstack((zeros, np.cumsum(deviations, axis=1)))
+    prefix2 = np.hstack((zeros, np.cumsum(deviations * deviations, axis=1)))
+
+    ends = np.arange(1, n + 1)
+    starts = np.maximum(ends - window, 0)
+    current = (ends - 1) // block
+    previous = np.maximum(current - 1, 0)
+    head = ends - current * block
+    tail = current * block - starts
+
+    tail1 = prefix1[previous, block] - prefix1[previous, block - tail]
+    tail2 = prefix2[previous, block] - prefix2[previous, block - tail]
+    # Re-express the previous block's tail relative to the current block's shift
+    delta = shifts[previous] - shifts[current]
+    sum1 = prefix1[current, head] + tail1 + tail * delta
+    sum2 = prefix2[current, head] + tail2 + 2 * delta * tail1 + tail * delta * delta
+    scale = prefix2[current, head] + np.where(tail > 0, prefix2[previous, block], 0.0) + tail * delta * delta
+    return shifts[current], sum1, sum2, ends - starts, scale
+
+def rolling_mean_std(values, windows):
+    """Rolling mean and sample std (min_periods=1) of a NaN-free array for several windows"""
+    results = {}
+    for window in windows:
+        shift, sum1, sum2, counts, scale = _blocked_window_sums(values, window)
+        mean = sum1 / counts
+        squared_deviations = sum2 - sum1 * mean
+
+        # Stable correction: where cancellation could swamp the result, recompute exactly
+        unstable = squared_deviations <= CANCELLATION_ULPS * np.finfo(np.float64).eps * scale
+        if unstable.any():
+            ends = np.flatnonzero(unstable) + 1
+            exact_mean, squared_deviations[unstable] = _exact_window_stats(
+                values, min(window, len(values)), ends)
+            mean[unstable] = exact_mean - shift[unstable]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            std = np.sqrt(squared_deviations / (counts - 1))
+        std[counts < 2] = np.nan
+        results[window] = (mean + shift, std)
+    return results
+
+def rolling_zscores(df, columns, windows):
+    """
+    Returns {Z_SCORE_* name: array} for every (column, window) pair.
+    Like the original calculate_zscore: the rolling window runs over the column's
+    non-NaN values, and a column with fewer values than the window is all NaN.
+    A flat window (zero spread) gives 0, as the original did wherever pandas'
+    online variance left a rounding residue; where it was exactly 0 the original
+    divided 0/0 and returned NaN, so flat windows are 0 consistently now.
+    """
+    multiple_windows = len(windows) > 1
+    results = {}
+    for column in columns:
+        if column not in df.columns:
+            continue
+        numeric = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64)
+        valid = ~np.isnan(numeric)
+        stats = rolling_mean_std(numeric[valid], windows)
+        for window in windows:
+            zscore = np.full(len(numeric), np.nan)
+            if valid.sum() >= window:
+                mean, std = stats[window]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    zscore[valid] = np.where(std == 0, 0.0, (numeric[valid] - mean) / std)
+                zscore[~np.isfinite(zscore)] = np.nan
+            results[zscore_name(column, window, multiple_windows)] = zscore
+    return results
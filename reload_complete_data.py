@@ -7,8 +7,12 @@ Ensures all 110 columns from Final_Data.parquet are included
 import pandas as pd
 from google.cloud import bigquery
 import os
+import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+from performance_summary import summary_query
+
 def reload_complete_bigquery_data():
     """
     Reload the complete dataset from Final_Data.parquet to BigQuery
@@ -58,6 +62,9 @@ def reload_complete_bigquery_data():
     df = df.rename(columns=column_mapping)
     print(f"Column names standardized: {len(df.columns)} columns")
     
+    # Partition column must load as a real TIMESTAMP (not INT64 nanoseconds)
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    
     # Drop existing fact table and recreate with complete schema
     table_id = f"{project_id}.{dataset_id}.fact_table"
     
@@ -69,10 +76,17 @@ def reload_complete_bigquery_data():
         print(f"Table doesn't exist or couldn't be deleted: {e}")
     
     # Configure load job
+    # Monthly partitions on timestamp + clustering on symbol, so
+    # WHERE symbol = @symbol reads only that symbol's blocks
     job_config = bigquery.LoadJobConfig(
         write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
         autodetect=True,  # Let BigQuery auto-detect schema from parquet
         source_format=bigquery.SourceFormat.PARQUET,
+        time_partitioning=bigquery.TimePartitioning(
+            type_=bigquery.TimePartitioningType.MONTH,
+            field="timestamp",
+        ),
+        clustering_fields=["symbol"],
     )
     
     print(f"Loading complete dataset to BigQuery table: {table_id}")
@@ -81,7 +95,9 @@ def reload_complete_bigquery_data():
     
     # Save optimized data to temporary parquet file
     temp_parquet = "temp_complete_data.parquet"
-    df.to_parquet(temp_parquet, engine='pyarrow', compression='snappy')
+    # Microsecond timestamps: BigQuery reads nanosecond parquet timestamps as INT64
+    df.to_parquet(temp_parquet, engine='pyarrow', compression='snappy',
+                  coerce_timestamps='us', allow_truncated_timestamps=True)
     print(f"Saved temporary file: {temp_parquet}")
     
     # Load to BigQuery from parquet file
@@ -95,10 +111,31 @@ def reload_complete_bigquery_data():
     print("Loading data to BigQuery...")
     load_job.result()  # Wait for job to complete
     
+    # Bump the dataset version - API result caches key on this label
+    table = client.get_table(table_id)
+    table.labels = {**(table.labels or {}), "data_version": datetime.now().strftime("%Y%m%d%H%M%S")}
+    client.update_table(table, ["labels"])
+    print(f"Dataset version: {table.labels['data_version']}")
+    
+    # Materialize the per-symbol first/last price + returns table behind /analytics/top-performers,
+    # labelled with the same version so the API knows it matches this load
+    summary_id = f"{project_id}.{dataset_id}.symbol_summary"
+    summary_config = bigquery.QueryJobConfig(
+        destination=summary_id,
+        write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
+    )
+    client.query(summary_query(table_id), job_config=summary_config).result()
+    summary_table = client.get_table(summary_id)
+    summary_table.labels = {**(summary_table.labels or {}), "data_version": table.labels["data_version"]}
+    client.update_table(summary_table, ["labels"])
+    print(f"Symbol summary rebuilt: {summary_table.num_rows:,} symbols in {summary_id}")
+    
     # Verify the load
     table = client.get_table(table_id)
     print(f"SUCCESS! Loaded {table.num_rows:,} rows to BigQuery")
     print(f"Schema columns: {len(table.schema)}")
+    print(f"Partitioning: {table.time_partitioning.type_} on {table.time_partitioning.field}, "
+          f"clustered by {table.clustering_fields}")
     
     # Clean up temporary file
     os.remove(temp_parquet)